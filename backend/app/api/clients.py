@@ -1,21 +1,20 @@
-from typing import List
+from typing import Iterable, List
 import re
 
 from datetime import date
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_tenant_id, require_tenant_roles
 from app.db.session import get_db
 from app.models.client import Client
+from app.models.declaration_rollup import DeclarationDailyRollup
 from app.models.tariff import Tariff
 from app.models.tariff_group import TariffGroup
 from app.models.tenant import Tenant
-from app.models.tour import Tour
-from app.models.tour_item import TourItem
 from app.schemas.client import (
     ClientWithCategories,
     CategoryRead,
@@ -25,6 +24,8 @@ from app.schemas.client import (
     CategoryUpdate,
     ClientHistoryEntry,
 )
+from app.services.catalog import etag_matches, get_catalog
+from app.services.tariffs import TariffIndex, get_tariff_index
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
@@ -33,6 +34,34 @@ def slugify(text: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
 
 
+def _build_client(
+    client: Client,
+    groups: Iterable[TariffGroup],
+    tariffs: TariffIndex,
+    today: date,
+) -> ClientWithCategories:
+    categories: list[CategoryRead] = []
+    for g in groups:
+        tariff = tariffs.resolve(g.id, today)
+        price = tariff.price_ex_vat if tariff else Decimal("0")
+        margin = tariff.margin_ex_vat if tariff else Decimal("0")
+        categories.append(
+            CategoryRead(
+                id=g.id,
+                name=g.display_name,
+                unit_price_ex_vat=price,
+                margin_ex_vat=margin,
+            )
+        )
+
+    return ClientWithCategories(
+        id=client.id,
+        name=client.name,
+        isActive=client.is_active,
+        categories=categories,
+    )
+
+
 def _serialize_client(
     db: Session,
     tenant_id: int,
@@ -56,77 +85,75 @@ def _serialize_client(
         .scalars()
         .all()
     )
-    today = date.today()
-    categories: list[CategoryRead] = []
-    for g in groups:
-        tariff = (
-            db.execute(
-                select(Tariff)
-                .where(
-                    Tariff.tariff_group_id == g.id,
-                    Tariff.effective_from <= today,
-                    or_(Tariff.effective_to.is_(None), Tariff.effective_to >= today),
-                )
-                .order_by(Tariff.effective_from.desc())
-            )
-            .scalars()
-            .first()
-        )
-        price = tariff.price_ex_vat if tariff else Decimal("0")
-        margin = tariff.margin_ex_vat if tariff else Decimal("0")
-        categories.append(
-            CategoryRead(
-                id=g.id,
-                name=g.display_name,
-                unit_price_ex_vat=price,
-                margin_ex_vat=margin,
-            )
-        )
+    return _build_client(client, groups, get_tariff_index(db, tenant_id), date.today())
 
-    return ClientWithCategories(
-        id=client.id,
-        name=client.name,
-        isActive=client.is_active,
-        categories=categories,
-    )
+
+def _load_catalog(
+    db: Session, tenant_id: int, include_inactive: bool
+) -> List[ClientWithCategories]:
+    client_filters = [Client.tenant_id == tenant_id]
+    if not include_inactive:
+        client_filters.append(Client.is_active.is_(True))
+    group_join = [
+        TariffGroup.client_id == Client.id,
+        TariffGroup.tenant_id == tenant_id,
+    ]
+    if not include_inactive:
+        group_join.append(TariffGroup.is_active.is_(True))
+
+    # One round trip for clients and their groups; current tariffs come from
+    # the tenant's tariff index, so the query count does not grow with the
+    # number of clients or categories.
+    rows = db.execute(
+        select(Client, TariffGroup)
+        .outerjoin(TariffGroup, and_(*group_join))
+        .where(*client_filters)
+        .order_by(Client.name, Client.id, TariffGroup.order)
+    ).all()
+
+    groups_by_client: dict[int, tuple[Client, list[TariffGroup]]] = {}
+    for client, group in rows:
+        _, groups = groups_by_client.setdefault(client.id, (client, []))
+        if group is not None:
+            groups.append(group)
+
+    tariffs = get_tariff_index(db, tenant_id)
+    today = date.today()
+    return [
+        _build_client(client, groups, tariffs, today)
+        for client, groups in groups_by_client.values()
+    ]
 
 
 @router.get("", response_model=List[ClientWithCategories], include_in_schema=False)
 @router.get("/", response_model=List[ClientWithCategories])
 def list_clients(
+    request: Request,
     include_inactive: bool = False,
     db: Session = Depends(get_db),  # noqa: B008
     tenant_id: int = Depends(get_tenant_id),  # noqa: B008
     user: dict = Depends(require_tenant_roles("ADMIN", "CHAUFFEUR")),  # noqa: B008
-) -> List[ClientWithCategories]:
+) -> Response:
     """Return clients with their tariff categories.
 
     By default only active clients are returned. Pass ``include_inactive=true``
     to also include inactive ones, which is useful when displaying historical
     data that still references them.
+
+    The serialized catalog is cached per tenant and carries an ``ETag``; a
+    request whose ``If-None-Match`` matches gets ``304 Not Modified``.
     """
-    client_filters = [Client.tenant_id == tenant_id]
-    if not include_inactive:
-        client_filters.append(Client.is_active.is_(True))
-    clients = (
-        db.execute(
-            select(Client)
-            .where(*client_filters)
-            .order_by(Client.name)
-        )
-        .scalars()
-        .all()
+    catalog = get_catalog(
+        tenant_id,
+        include_inactive,
+        lambda: _load_catalog(db, tenant_id, include_inactive),
+    )
+    headers = {"ETag": catalog.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=catalog.body, media_type="application/json", headers=headers
     )
-
-    return [
-        _serialize_client(
-            db,
-            tenant_id,
-            client,
-            include_inactive_groups=include_inactive,
-        )
-        for client in clients
-    ]
 
 
 @router.get("/history", response_model=List[ClientHistoryEntry])
@@ -138,16 +165,14 @@ def list_client_history(
     history_rows = (
         db.query(
             Client,
-            func.count(TourItem.id).label("declaration_count"),
-            func.max(Tour.date).label("last_declaration"),
+            func.sum(DeclarationDailyRollup.item_count).label("declaration_count"),
+            func.max(DeclarationDailyRollup.date).label("last_declaration"),
         )
-        .join(Tour, Tour.client_id == Client.id)
-        .join(TourItem, TourItem.tour_id == Tour.id)
+        .join(DeclarationDailyRollup, DeclarationDailyRollup.client_id == Client.id)
         .filter(Client.tenant_id == tenant_id)
-        .filter(Tour.tenant_id == tenant_id)
-        .filter(TourItem.tenant_id == tenant_id)
+        .filter(DeclarationDailyRollup.tenant_id == tenant_id)
         .group_by(Client.id)
-        .order_by(func.max(Tour.date).desc(), Client.name)
+        .order_by(func.max(DeclarationDailyRollup.date).desc(), Client.name)
         .all()
     )
 
@@ -376,19 +401,8 @@ def update_category(
     group.display_name = payload.name
 
     today = date.today()
-    active_tariff = (
-        db.execute(
-            select(Tariff)
-            .where(
-                Tariff.tariff_group_id == group.id,
-                Tariff.effective_from <= today,
-                or_(Tariff.effective_to.is_(None), Tariff.effective_to >= today),
-            )
-            .order_by(Tariff.effective_from.desc())
-        )
-        .scalars()
-        .first()
-    )
+    current = get_tariff_index(db, tenant_id).resolve(group.id, today)
+    active_tariff = db.get(Tariff, current.id) if current else None
 
     if payload.unit_price_ex_vat is not None or payload.margin_ex_vat is not None:
         if active_tariff:
@@ -1,7 +1,6 @@
 import re
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
@@ -11,6 +10,8 @@ from app.db.session import get_db
 from app.models.tenant import Tenant
 from app.models.user import User
 from app.services import billing
+from app.services.memberships import has_active_membership, invalidate_membership
+from app.services.tenants import resolve_tenant_slug, tenant_exists
 
 
 ROLE_ALIASES = {
@@ -74,10 +75,7 @@ def get_tenant_id(
     if not tenant_identifier:
         raise HTTPException(status_code=400, detail="Missing tenant header")
 
-    slug = tenant_identifier.lower()
-    tenant_id = db.execute(
-        select(Tenant.id).where(func.lower(Tenant.slug) == slug)
-    ).scalar_one_or_none()
+    tenant_id = resolve_tenant_slug(db, tenant_identifier)
     if tenant_id is not None:
         return tenant_id
 
@@ -144,10 +142,7 @@ def require_tenant_roles(*required_roles: str):
         if "GLOBAL_SUPERVISION" in roles:
             return user
 
-        tenant_exists = db.execute(
-            select(Tenant.id).where(Tenant.id == tenant_id)
-        ).scalar_one_or_none()
-        if tenant_exists is None:
+        if not tenant_exists(db, tenant_id):
             raise HTTPException(status_code=404, detail="Tenant not found")
 
         sub = user.get("sub")
@@ -157,15 +152,7 @@ def require_tenant_roles(*required_roles: str):
                 detail="User not associated with tenant",
             )
 
-        membership = db.execute(
-            select(User.id).where(
-                User.auth0_sub == sub,
-                User.tenant_id == tenant_id,
-                User.is_active.is_(True),
-            )
-        ).scalar_one_or_none()
-
-        if membership is None:
+        if not has_active_membership(db, sub, tenant_id):
             auto_provisioned = _auto_provision_membership(
                 db=db,
                 tenant_id=tenant_id,
@@ -271,15 +258,11 @@ def _auto_provision_membership(
     db.add(new_user)
     try:
         db.commit()
-        return True
     except IntegrityError:
         db.rollback()
-        existing = db.execute(
-            select(User.id).where(
-                User.auth0_sub == sub,
-                User.tenant_id == tenant_id,
-                User.is_active.is_(True),
-            )
-        ).scalar_one_or_none()
-        return existing is not None
+        # Another request may have provisioned the same membership meanwhile.
+        invalidate_membership(sub, tenant_id)
+        return has_active_membership(db, sub, tenant_id)
+    invalidate_membership(sub, tenant_id)
+    return True
 
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_tenant_id, require_tenant_roles
+from app.core.xlsx import XLSX_MEDIA_TYPE
+from app.db.session import get_db
+from app.models.export import Export
+from app.schemas.export import ExportCreate, ExportRead
+from app.services.exports import (
+    ExportNotFoundError,
+    ExportNotReadyError,
+    ExportService,
+    InvalidExportError,
+)
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+EXPORT_MEDIA_TYPES = {
+    Export.FORMAT_CSV: "text/csv",
+    Export.FORMAT_XLSX: XLSX_MEDIA_TYPE,
+}
+
+
+def _serialize_export(export: Export) -> ExportRead:
+    download_url = (
+        f"/exports/{export.id}/download"
+        if export.status == Export.STATUS_COMPLETED
+        else None
+    )
+    return ExportRead(
+        id=export.id,
+        type=export.type,
+        format=export.format,
+        status=export.status,
+        date_from=export.periode_debut,
+        date_to=export.periode_fin,
+        client_id=export.client_id,
+        driver_id=export.driver_id,
+        error=export.error,
+        created_at=export.created_at,
+        completed_at=export.completed_at,
+        download_url=download_url,
+    )
+
+
+@router.post(
+    "", response_model=ExportRead, status_code=status.HTTP_202_ACCEPTED
+)
+@router.post(
+    "/",
+    response_model=ExportRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    include_in_schema=False,
+)
+def create_export(
+    export_in: ExportCreate,
+    db: Session = Depends(get_db),  # noqa: B008
+    tenant_id: int = Depends(get_tenant_id),  # noqa: B008
+    user: dict = Depends(require_tenant_roles("ADMIN")),  # noqa: B008
+):
+    """Queue an export; the export worker renders the file in the background."""
+    service = ExportService(db, tenant_id)
+    try:
+        export = service.create(export_in)
+    except InvalidExportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _serialize_export(export)
+
+
+@router.get("/{export_id}", response_model=ExportRead)
+def get_export(
+    export_id: int,
+    db: Session = Depends(get_db),  # noqa: B008
+    tenant_id: int = Depends(get_tenant_id),  # noqa: B008
+    user: dict = Depends(require_tenant_roles("ADMIN")),  # noqa: B008
+):
+    service = ExportService(db, tenant_id)
+    try:
+        export = service.get(export_id)
+    except ExportNotFoundError:
+        raise HTTPException(status_code=404, detail="Export not found") from None
+    return _serialize_export(export)
+
+
+@router.get("/{export_id}/download")
+def download_export(
+    export_id: int,
+    db: Session = Depends(get_db),  # noqa: B008
+    tenant_id: int = Depends(get_tenant_id),  # noqa: B008
+    user: dict = Depends(require_tenant_roles("ADMIN")),  # noqa: B008
+):
+    service = ExportService(db, tenant_id)
+    try:
+        export, path = service.file_path(export_id)
+    except ExportNotFoundError:
+        raise HTTPException(status_code=404, detail="Export not found") from None
+    except ExportNotReadyError:
+        raise HTTPException(status_code=409, detail="Export not ready") from None
+
+    filename = (
+        f"{export.type}-{export.periode_debut.isoformat()}-"
+        f"{export.periode_fin.isoformat()}.{export.format}"
+    )
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES.get(export.format, "application/octet-stream"),
+        filename=filename,
+    )
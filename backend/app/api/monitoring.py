@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from app.api.deps import get_tenant_id, require_roles
 from app.db.session import get_db
 from app.schemas.monitoring import MonitoringOverview
-from app.services.monitoring import MonitoringService
+from app.services.monitoring import monitoring_overviews
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
 
@@ -15,5 +15,4 @@ def get_monitoring_overview(
     tenant_id: int = Depends(get_tenant_id),  # noqa: B008
     _: dict = Depends(require_roles("GLOBAL_SUPERVISION")),  # noqa: B008
 ) -> MonitoringOverview:
-    service = MonitoringService(db, tenant_id)
-    return service.get_overview()
+    return monitoring_overviews.get(db, tenant_id)
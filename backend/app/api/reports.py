@@ -1,107 +1,67 @@
-import csv
+import base64
 from datetime import date
-from io import BytesIO, StringIO
 from typing import List, Optional
 
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_tenant_id, require_tenant_roles
+from app.core.xlsx import XLSX_MEDIA_TYPE
 from app.db.session import get_db
 from app.models.chauffeur import Chauffeur
 from app.models.client import Client
-from app.models.tariff import Tariff
 from app.models.tariff_group import TariffGroup
 from app.models.tour import Tour
 from app.models.tour_item import TourItem
-from openpyxl import Workbook
 from app.schemas.tour import (
+    DeclarationAggregateLine,
     DeclarationReportCreate,
     DeclarationReportLine,
     DeclarationReportUpdate,
 )
+from app.services.declarations import (
+    AGGREGATE_DIMENSIONS,
+    DATE_BUCKETS,
+    DeclarationCursor,
+    aggregate_declarations,
+    declarations_query,
+    iter_declarations,
+    iter_declarations_xlsx,
+    serialize_declaration,
+    stream_declarations_csv,
+)
+from app.services.rollups import refresh_declaration_rollups, rollup_slice
+from app.services.tariffs import get_tariff_index
 
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
-DECLARATIONS_EXPORT_HEADER = [
-    "Date",
-    "Chauffeur",
-    "Client donneur d'ordre",
-    "Catégorie de groupe tarifaire",
-    "Nombre de colis récupérés",
-    "Nombre de colis livrés",
-    "Écart",
-    "Montant estimé (€)",
-    "Marge (€)",
-]
+DECLARATIONS_PAGE_MAX_LIMIT = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 
-def _format_declaration_export_row(
-    declaration: DeclarationReportLine,
-) -> list[str | int]:
-    return [
-        declaration.date.isoformat(),
-        declaration.driver_name,
-        declaration.client_name,
-        declaration.tariff_group_display_name,
-        declaration.pickup_quantity,
-        declaration.delivery_quantity,
-        declaration.difference_quantity,
-        f"{declaration.estimated_amount_eur:.2f}",
-        f"{declaration.margin_amount_eur:.2f}",
-    ]
+def _encode_declarations_cursor(declaration: DeclarationReportLine) -> str:
+    item_id = "" if declaration.tour_item_id is None else str(declaration.tour_item_id)
+    raw = f"{declaration.date.isoformat()}|{declaration.tour_id}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
 
 
-def _serialize_declaration(
-    item: TourItem | None,
-    tour: Tour,
-    driver: Chauffeur,
-    client: Client,
-    tg: TariffGroup | None,
-) -> DeclarationReportLine:
-    pickup_qty = item.pickup_quantity or 0 if item else 0
-    delivery_qty = item.delivery_quantity or 0 if item else 0
-    estimated_amount = (
-        item.amount_ex_vat_snapshot if item and item.amount_ex_vat_snapshot else None
-    )
-    unit_price = (
-        item.unit_price_ex_vat_snapshot if item and item.unit_price_ex_vat_snapshot else None
-    )
-    unit_margin = (
-        item.unit_margin_ex_vat_snapshot if item and item.unit_margin_ex_vat_snapshot else None
-    )
-    margin_amount = (
-        item.margin_ex_vat_snapshot if item and item.margin_ex_vat_snapshot else None
-    )
-    estimated_amount_value = (estimated_amount or Decimal("0")).quantize(
-        Decimal("0.01")
-    )
-    unit_price_value = (unit_price or Decimal("0")).quantize(Decimal("0.01"))
-    unit_margin_value = (unit_margin or Decimal("0")).quantize(Decimal("0.01"))
-    margin_amount_value = (margin_amount or Decimal("0")).quantize(
-        Decimal("0.01")
-    )
-    return DeclarationReportLine(
-        tour_id=tour.id,
-        tour_item_id=item.id if item else None,
-        date=tour.date,
-        driver_name=driver.display_name,
-        client_name=client.name,
-        tariff_group_display_name=tg.display_name if tg else "—",
-        pickup_quantity=pickup_qty,
-        delivery_quantity=delivery_qty,
-        difference_quantity=pickup_qty - delivery_qty,
-        estimated_amount_eur=estimated_amount_value,
-        unit_price_ex_vat=unit_price_value,
-        unit_margin_ex_vat=unit_margin_value,
-        margin_amount_eur=margin_amount_value,
-        status=tour.status,
-    )
+def _decode_declarations_cursor(cursor: str) -> DeclarationCursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        date_part, tour_part, item_part = raw.split("|")
+        return (
+            date.fromisoformat(date_part),
+            int(tour_part),
+            int(item_part) if item_part else None,
+        )
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
 
 
 def _query_declarations(
@@ -111,42 +71,19 @@ def _query_declarations(
     date_to: Optional[date],
     client_id: Optional[int],
     driver_id: Optional[int],
+    after: Optional[DeclarationCursor] = None,
+    limit: Optional[int] = None,
 ) -> List[DeclarationReportLine]:
-    query = (
-        db.query(Tour, TourItem, Chauffeur, Client, TariffGroup)
-        .join(Chauffeur, Tour.driver_id == Chauffeur.id)
-        .join(Client, Tour.client_id == Client.id)
-        .outerjoin(TourItem, TourItem.tour_id == Tour.id)
-        .outerjoin(TariffGroup, TourItem.tariff_group_id == TariffGroup.id)
-        .filter(Tour.tenant_id == tenant_id)
-        .filter(
-            Tour.status.in_([Tour.STATUS_COMPLETED, Tour.STATUS_IN_PROGRESS])
-        )
+    query = declarations_query(
+        db, tenant_id, date_from, date_to, client_id, driver_id, after
     )
+    if limit is not None:
+        query = query.limit(limit)
 
-    if date_from:
-        query = query.filter(Tour.date >= date_from)
-    if date_to:
-        query = query.filter(Tour.date <= date_to)
-    if client_id:
-        query = query.filter(Tour.client_id == client_id)
-    if driver_id:
-        query = query.filter(Tour.driver_id == driver_id)
-
-    query = query.order_by(Tour.date.desc(), Tour.id.desc(), TourItem.id.asc())
-
-    rows = []
-    for tour, item, driver, client, tg in query.all():
-        rows.append(_serialize_declaration(item, tour, driver, client, tg))
-    if len(rows) > 1:
-        rows.sort(
-            key=lambda r: (
-                -r.date.toordinal(),
-                -r.tour_id,
-                r.tour_item_id if r.tour_item_id is not None else -1,
-            )
-        )
-    return rows
+    return [
+        serialize_declaration(item, tour, driver, client, tg)
+        for tour, item, driver, client, tg in query.all()
+    ]
 
 
 def _get_single_declaration(
@@ -171,6 +108,51 @@ def _get_single_declaration(
 )
 @router.get("/declarations", response_model=List[DeclarationReportLine])
 def report_declarations(
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    client_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    limit: Optional[int] = Query(
+        default=None, ge=1, le=DECLARATIONS_PAGE_MAX_LIMIT
+    ),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),  # noqa: B008
+    tenant_id: int = Depends(get_tenant_id),  # noqa: B008
+    user: dict = Depends(require_tenant_roles("ADMIN")),  # noqa: B008
+):
+    """List declarations, newest first.
+
+    Without ``limit`` every matching declaration is returned. With ``limit``
+    the list is paginated by keyset on ``(date, tour_id, tour_item_id)``: when
+    more rows remain, the ``X-Next-Cursor`` header carries the opaque cursor
+    to pass back as ``cursor`` to fetch the next page.
+    """
+    after = _decode_declarations_cursor(cursor) if cursor else None
+    rows = _query_declarations(
+        db,
+        tenant_id,
+        date_from,
+        date_to,
+        client_id,
+        driver_id,
+        after=after,
+        limit=limit + 1 if limit is not None else None,
+    )
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_declarations_cursor(rows[-1])
+    return rows
+
+
+@router.get(
+    "/declarations/aggregate/",
+    response_model=List[DeclarationAggregateLine],
+    include_in_schema=False,
+)
+@router.get("/declarations/aggregate", response_model=List[DeclarationAggregateLine])
+def report_declarations_aggregate(
+    group_by: List[str] = Query(default=[]),  # noqa: B008
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     client_id: Optional[int] = None,
@@ -179,7 +161,25 @@ def report_declarations(
     tenant_id: int = Depends(get_tenant_id),  # noqa: B008
     user: dict = Depends(require_tenant_roles("ADMIN")),  # noqa: B008
 ):
-    return _query_declarations(db, tenant_id, date_from, date_to, client_id, driver_id)
+    """Aggregate declarations by any combination of ``group_by`` dimensions.
+
+    ``group_by`` may be repeated and accepts one date bucket (``day``,
+    ``week`` or ``month``) plus ``client``, ``driver`` and ``tariff_group``.
+    Without ``group_by`` a single line totals the whole selection.
+    """
+    dimensions = list(dict.fromkeys(group_by))
+    unknown = [value for value in dimensions if value not in AGGREGATE_DIMENSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid group_by: {', '.join(unknown)}"
+        )
+    if sum(value in DATE_BUCKETS for value in dimensions) > 1:
+        raise HTTPException(
+            status_code=400, detail="Only one date bucket can be used in group_by"
+        )
+    return aggregate_declarations(
+        db, tenant_id, dimensions, date_from, date_to, client_id, driver_id
+    )
 
 
 @router.post(
@@ -260,16 +260,8 @@ def create_declaration(
             )
         tour.status = Tour.STATUS_COMPLETED
 
-    tariff = (
-        db.query(Tariff)
-        .filter(
-            Tariff.tariff_group_id == tg.id,
-            Tariff.effective_from <= declaration_create.date,
-            (Tariff.effective_to.is_(None))
-            | (Tariff.effective_to >= declaration_create.date),
-        )
-        .order_by(Tariff.effective_from.desc())
-        .first()
+    tariff = get_tariff_index(db, tenant_id).resolve(
+        tg.id, declaration_create.date
     )
     unit_price = tariff.price_ex_vat if tariff else Decimal("0")
     unit_margin = tariff.margin_ex_vat if tariff else Decimal("0")
@@ -294,13 +286,14 @@ def create_declaration(
     )
     db.add(tour_item)
     db.flush()
+    refresh_declaration_rollups(db, tenant_id, [rollup_slice(tour)])
     db.commit()
 
     created = _get_single_declaration(db, tenant_id, tour_item.id)
     if created is None:
         raise HTTPException(status_code=404, detail="Declaration not found")
     item, tour, driver, client, tg = created
-    return _serialize_declaration(item, tour, driver, client, tg)
+    return serialize_declaration(item, tour, driver, client, tg)
 
 
 @router.put(
@@ -358,13 +351,15 @@ def update_declaration(
     unit_margin = item.unit_margin_ex_vat_snapshot or Decimal("0")
     item.margin_ex_vat_snapshot = unit_margin * (item.delivery_quantity or 0)
 
+    db.flush()
+    refresh_declaration_rollups(db, tenant_id, [rollup_slice(tour)])
     db.commit()
 
     updated = _get_single_declaration(db, tenant_id, tour_item_id)
     if updated is None:
         raise HTTPException(status_code=404, detail="Declaration not found")
     item, tour, driver, client, tg = updated
-    return _serialize_declaration(item, tour, driver, client, tg)
+    return serialize_declaration(item, tour, driver, client, tg)
 
 
 @router.delete("/declarations/{tour_item_id}", status_code=204)
@@ -392,9 +387,12 @@ def delete_declaration(
         .filter(TourItem.tour_id == tour.id, TourItem.tenant_id == tenant_id)
         .count()
     )
+    affected_slice = rollup_slice(tour)
     if remaining == 0:
         db.delete(tour)
 
+    db.flush()
+    refresh_declaration_rollups(db, tenant_id, [affected_slice])
     db.commit()
 
 
@@ -409,14 +407,11 @@ def report_declarations_csv(
     tenant_id: int = Depends(get_tenant_id),  # noqa: B008
     user: dict = Depends(require_tenant_roles("ADMIN")),  # noqa: B008
 ):
-    rows = _query_declarations(db, tenant_id, date_from, date_to, client_id, driver_id)
-    output = StringIO()
-    writer = csv.writer(output, delimiter=";")
-    writer.writerow(DECLARATIONS_EXPORT_HEADER)
-    for r in rows:
-        writer.writerow(_format_declaration_export_row(r))
-    return Response(
-        content=output.getvalue(),
+    declarations = iter_declarations(
+        db, tenant_id, date_from, date_to, client_id, driver_id
+    )
+    return StreamingResponse(
+        stream_declarations_csv(declarations),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=declarations.csv"},
     )
@@ -433,18 +428,11 @@ def report_declarations_excel(
     tenant_id: int = Depends(get_tenant_id),  # noqa: B008
     user: dict = Depends(require_tenant_roles("ADMIN")),  # noqa: B008
 ):
-    rows = _query_declarations(db, tenant_id, date_from, date_to, client_id, driver_id)
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Declarations"
-    sheet.append(DECLARATIONS_EXPORT_HEADER)
-    for row in rows:
-        sheet.append(_format_declaration_export_row(row))
-    output = BytesIO()
-    workbook.save(output)
-    output.seek(0)
+    declarations = iter_declarations(
+        db, tenant_id, date_from, date_to, client_id, driver_id
+    )
     return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        iter_declarations_xlsx(declarations),
+        media_type=XLSX_MEDIA_TYPE,
         headers={"Content-Disposition": "attachment; filename=declarations.xlsx"},
     )
@@ -1,14 +1,14 @@
-from datetime import date, datetime
+from datetime import date
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
 
 from app.api.deps import get_tenant_id, require_roles, require_tenant_roles
 from app.db.session import get_db
 from app.models.chauffeur import Chauffeur
 from app.models.client import Client
-from app.models.tariff import Tariff
 from app.models.tariff_group import TariffGroup
 from app.models.tour import Tour
 from app.models.tour_item import TourItem
@@ -22,9 +22,15 @@ from app.schemas.tour import (
     TourRead,
     TourTotals,
 )
+from app.services.last_seen import last_seen_tracker
+from app.services.rollups import refresh_declaration_rollups, rollup_slice
+from app.services.tariffs import get_tariff_index
 
 router = APIRouter(prefix="/tours", tags=["tours"])
 
+_ZERO = Decimal("0.00")
+_CENT = Decimal("0.01")
+
 
 @router.get("/activity-summary", response_model=TourActivitySummary)
 def list_tour_activity_summary(
@@ -41,54 +47,86 @@ def list_tour_activity_summary(
     if period_start > period_end:
         raise HTTPException(status_code=400, detail="Invalid date range")
 
-    tours = (
-        db.query(Tour)
-        .filter(
-            Tour.tenant_id == tenant_id,
-            Tour.date >= period_start,
-            Tour.date <= period_end,
+    in_range = (
+        Tour.tenant_id == tenant_id,
+        Tour.date >= period_start,
+        Tour.date <= period_end,
+    )
+    closed = _tour_quantities(in_range, Tour.STATUS_COMPLETED)
+    in_progress_totals = _tour_quantities(in_range, Tour.STATUS_IN_PROGRESS)
+
+    # Returns are counted per tour: an over-delivered item offsets a short one.
+    closed_count, return_total = db.execute(
+        select(
+            func.count(Tour.id),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            closed.c.pickup > closed.c.delivery,
+                            closed.c.pickup - closed.c.delivery,
+                        ),
+                        else_=0,
+                    )
+                ),
+                0,
+            ),
         )
-        .options(
-            joinedload(Tour.driver),
-            joinedload(Tour.client),
-            selectinload(Tour.items),
+        .select_from(Tour)
+        .outerjoin(closed, closed.c.tour_id == Tour.id)
+        .where(*in_range, Tour.status == Tour.STATUS_COMPLETED)
+    ).one()
+
+    rows = db.execute(
+        select(
+            Tour.id,
+            Tour.date,
+            Chauffeur.display_name,
+            Client.name,
+            func.coalesce(in_progress_totals.c.pickup, 0),
+            func.coalesce(in_progress_totals.c.delivery, 0),
         )
-        .all()
-    )
-
-    in_progress: list[TourActivityInProgress] = []
-    closed_count = 0
-    return_total = 0
-
-    for tour in tours:
-        pickup_total = sum((item.pickup_quantity or 0) for item in tour.items)
-        delivery_total = sum((item.delivery_quantity or 0) for item in tour.items)
-
-        if tour.status == Tour.STATUS_IN_PROGRESS:
-            in_progress.append(
-                TourActivityInProgress(
-                    tour_id=tour.id,
-                    date=tour.date,
-                    driver_name=(tour.driver.display_name if tour.driver else "—"),
-                    client_name=(tour.client.name if tour.client else "—"),
-                    total_pickup=pickup_total,
-                    total_delivery=delivery_total,
-                )
-            )
-        elif tour.status == Tour.STATUS_COMPLETED:
-            closed_count += 1
-            if pickup_total > delivery_total:
-                return_total += pickup_total - delivery_total
-
-    in_progress.sort(key=lambda tour_summary: (tour_summary.date, tour_summary.tour_id))
+        .select_from(Tour)
+        .outerjoin(Chauffeur, Chauffeur.id == Tour.driver_id)
+        .outerjoin(Client, Client.id == Tour.client_id)
+        .outerjoin(in_progress_totals, in_progress_totals.c.tour_id == Tour.id)
+        .where(*in_range, Tour.status == Tour.STATUS_IN_PROGRESS)
+        .order_by(Tour.date, Tour.id)
+    ).all()
 
     return TourActivitySummary(
-        in_progress=in_progress,
+        in_progress=[
+            TourActivityInProgress(
+                tour_id=tour_id,
+                date=tour_date,
+                driver_name=driver_name or "—",
+                client_name=client_name or "—",
+                total_pickup=pickup,
+                total_delivery=delivery,
+            )
+            for tour_id, tour_date, driver_name, client_name, pickup, delivery in rows
+        ],
         closed_count=closed_count,
         return_count=return_total,
     )
 
 
+def _tour_quantities(in_range, status: str):
+    """Picked up and delivered quantities per tour of ``status`` in the range."""
+
+    return (
+        select(
+            TourItem.tour_id,
+            func.coalesce(func.sum(TourItem.pickup_quantity), 0).label("pickup"),
+            func.coalesce(func.sum(TourItem.delivery_quantity), 0).label("delivery"),
+        )
+        .join(Tour, Tour.id == TourItem.tour_id)
+        .where(*in_range, Tour.status == status)
+        .group_by(TourItem.tour_id)
+        .subquery()
+    )
+
+
 def _get_driver_from_user(db: Session, tenant_id: int, user_sub: str) -> Chauffeur:
     user = (
         db.query(User)
@@ -100,78 +138,123 @@ def _get_driver_from_user(db: Session, tenant_id: int, user_sub: str) -> Chauffe
     chauffeur = db.query(Chauffeur).filter(Chauffeur.user_id == user.id).first()
     if chauffeur is None:
         raise HTTPException(status_code=403, detail="Driver not found")
-    chauffeur.last_seen_at = datetime.utcnow()
-    db.commit()
-    db.refresh(chauffeur)
+    last_seen_tracker.touch(db, chauffeur.id)
     return chauffeur
 
 
-def _serialize_tour(tour: Tour) -> TourRead:
-    driver = tour.driver
-    client = tour.client
-
-    items_read: list[TourItemRead] = []
-    total_pickup = 0
-    total_delivery = 0
-    total_amount = Decimal("0")
-    total_margin = Decimal("0")
-
-    # Keep a deterministic order for readability
-    sorted_items = sorted(
-        tour.items,
-        key=lambda item: item.tariff_group.display_name
-        if item.tariff_group
-        else item.tariff_group_id,
+def _item_read(
+    tariff_group_id: int,
+    display_name: str | None,
+    pickup_quantity: int | None,
+    delivery_quantity: int | None,
+    unit_price: Decimal | None,
+    amount: Decimal | None,
+    unit_margin: Decimal | None,
+    margin_amount: Decimal | None,
+) -> TourItemRead:
+    pickup_qty = pickup_quantity or 0
+    delivery_qty = delivery_quantity or 0
+    return TourItemRead(
+        tariff_group_id=tariff_group_id,
+        display_name=display_name if display_name is not None else str(tariff_group_id),
+        pickup_quantity=pickup_qty,
+        delivery_quantity=delivery_qty,
+        difference=pickup_qty - delivery_qty,
+        unit_price_ex_vat=unit_price or Decimal("0"),
+        amount_ex_vat=amount or Decimal("0"),
+        unit_margin_ex_vat=unit_margin or Decimal("0"),
+        margin_amount_ex_vat=margin_amount or Decimal("0"),
     )
 
-    for item in sorted_items:
-        pickup_qty = item.pickup_quantity or 0
-        delivery_qty = item.delivery_quantity or 0
-        diff = pickup_qty - delivery_qty
-        unit_price = item.unit_price_ex_vat_snapshot or Decimal("0")
-        amount = item.amount_ex_vat_snapshot or Decimal("0")
-        unit_margin = item.unit_margin_ex_vat_snapshot or Decimal("0")
-        margin_amount = item.margin_ex_vat_snapshot or Decimal("0")
 
-        items_read.append(
-            TourItemRead(
-                tariff_group_id=item.tariff_group_id,
-                display_name=item.tariff_group.display_name
-                if item.tariff_group
-                else str(item.tariff_group_id),
-                pickup_quantity=pickup_qty,
-                delivery_quantity=delivery_qty,
-                difference=diff,
-                unit_price_ex_vat=unit_price,
-                amount_ex_vat=amount,
-                unit_margin_ex_vat=unit_margin,
-                margin_amount_ex_vat=margin_amount,
-            )
-        )
-        total_pickup += pickup_qty
-        total_delivery += delivery_qty
-        total_amount += amount
-        total_margin += margin_amount
+def _tour_read(
+    tour_id: int,
+    tour_date: date,
+    status: str,
+    driver: dict,
+    client: dict,
+    items: list[TourItemRead],
+) -> TourRead:
+    # Keep a deterministic order for readability
+    items.sort(key=lambda item: item.display_name)
 
+    total_pickup = sum(item.pickup_quantity for item in items)
+    total_delivery = sum(item.delivery_quantity for item in items)
     totals = TourTotals(
         pickup_qty=total_pickup,
         delivery_qty=total_delivery,
         difference_qty=total_pickup - total_delivery,
-        amount_ex_vat=total_amount,
-        margin_amount_ex_vat=total_margin,
+        amount_ex_vat=sum((item.amount_ex_vat for item in items), Decimal("0")),
+        margin_amount_ex_vat=sum(
+            (item.margin_amount_ex_vat for item in items), Decimal("0")
+        ),
     )
 
     return TourRead(
-        tour_id=tour.id,
-        date=tour.date,
-        status=tour.status,
-        driver={"id": driver.id, "name": driver.display_name},
-        client={"id": client.id, "name": client.name},
-        items=items_read,
+        tour_id=tour_id,
+        date=tour_date,
+        status=status,
+        driver=driver,
+        client=client,
+        items=items,
         totals=totals,
     )
 
 
+def _load_tour_reads(db: Session, *criteria) -> list[TourRead]:
+    """Tours matching ``criteria``, by date, with their items, in two queries."""
+
+    tours = db.execute(
+        select(
+            Tour.id,
+            Tour.date,
+            Tour.status,
+            Tour.driver_id,
+            Chauffeur.display_name,
+            Tour.client_id,
+            Client.name,
+        )
+        .join(Chauffeur, Chauffeur.id == Tour.driver_id)
+        .join(Client, Client.id == Tour.client_id)
+        .where(*criteria)
+        .order_by(Tour.date, Tour.id)
+    ).all()
+    if not tours:
+        return []
+
+    items_by_tour: dict[int, list[TourItemRead]] = {tour.id: [] for tour in tours}
+    item_rows = db.execute(
+        select(
+            TourItem.tour_id,
+            TourItem.tariff_group_id,
+            TariffGroup.display_name,
+            TourItem.pickup_quantity,
+            TourItem.delivery_quantity,
+            TourItem.unit_price_ex_vat_snapshot,
+            TourItem.amount_ex_vat_snapshot,
+            TourItem.unit_margin_ex_vat_snapshot,
+            TourItem.margin_ex_vat_snapshot,
+        )
+        .outerjoin(TariffGroup, TariffGroup.id == TourItem.tariff_group_id)
+        .where(TourItem.tour_id.in_(list(items_by_tour)))
+        .order_by(TourItem.id)
+    )
+    for tour_id, *values in item_rows:
+        items_by_tour[tour_id].append(_item_read(*values))
+
+    return [
+        _tour_read(
+            tour.id,
+            tour.date,
+            tour.status,
+            {"id": tour.driver_id, "name": tour.display_name},
+            {"id": tour.client_id, "name": tour.name},
+            items_by_tour[tour.id],
+        )
+        for tour in tours
+    ]
+
+
 @router.post("/pickup", response_model=TourRead, status_code=201)
 @router.post("/pickup/", response_model=TourRead, status_code=201, include_in_schema=False)
 def create_tour_pickup(
@@ -189,6 +272,29 @@ def create_tour_pickup(
     if not tour_in.items:
         raise HTTPException(status_code=400, detail="At least one item is required")
 
+    # One query for every requested category, validated in payload order.
+    group_ids = {item.tariff_group_id for item in tour_in.items}
+    groups = {
+        group.id: group
+        for group in db.execute(
+            select(
+                TariffGroup.id,
+                TariffGroup.tenant_id,
+                TariffGroup.client_id,
+                TariffGroup.display_name,
+            ).where(TariffGroup.id.in_(group_ids))
+        )
+    }
+    for item in tour_in.items:
+        tg = groups.get(item.tariff_group_id)
+        if tg is None or tg.tenant_id != tenant_id:
+            raise HTTPException(status_code=404, detail="Tariff group not found")
+        if tg.client_id is not None and tg.client_id != client.id:
+            raise HTTPException(
+                status_code=400,
+                detail="Tariff group not available for this client",
+            )
+
     tour = Tour(
         tenant_id=tenant_id,
         driver_id=driver.id,
@@ -199,45 +305,55 @@ def create_tour_pickup(
     db.add(tour)
     db.flush()
 
+    tariffs = get_tariff_index(db, tenant_id)
+    item_rows = []
+    items_read = []
     for item in tour_in.items:
-        tg = db.get(TariffGroup, item.tariff_group_id)
-        if tg is None or tg.tenant_id != tenant_id:
-            raise HTTPException(status_code=404, detail="Tariff group not found")
-        if tg.client_id is not None and tg.client_id != client.id:
-            raise HTTPException(
-                status_code=400,
-                detail="Tariff group not available for this client",
-            )
-        tariff = (
-            db.query(Tariff)
-            .filter(
-                Tariff.tariff_group_id == tg.id,
-                Tariff.effective_from <= tour_in.date,
-                (Tariff.effective_to.is_(None)) | (Tariff.effective_to >= tour_in.date),
-            )
-            .order_by(Tariff.effective_from.desc())
-            .first()
+        tariff = tariffs.resolve(item.tariff_group_id, tour_in.date)
+        # Quantized like the values read back from the Numeric(10, 2) columns.
+        unit_price = (tariff.price_ex_vat if tariff else _ZERO).quantize(_CENT)
+        unit_margin = (tariff.margin_ex_vat if tariff else _ZERO).quantize(_CENT)
+        item_rows.append(
+            {
+                "tenant_id": tenant_id,
+                "tour_id": tour.id,
+                "tariff_group_id": item.tariff_group_id,
+                "pickup_quantity": item.pickup_quantity,
+                "delivery_quantity": 0,
+                "unit_price_ex_vat_snapshot": unit_price,
+                "amount_ex_vat_snapshot": _ZERO,
+                "unit_margin_ex_vat_snapshot": unit_margin,
+                "margin_ex_vat_snapshot": _ZERO,
+            }
         )
-        unit_price = tariff.price_ex_vat if tariff else Decimal("0")
-        unit_margin = tariff.margin_ex_vat if tariff else Decimal("0")
-
-        tour_item = TourItem(
-            tenant_id=tenant_id,
-            tour_id=tour.id,
-            tariff_group_id=tg.id,
-            pickup_quantity=item.pickup_quantity,
-            delivery_quantity=0,
-            unit_price_ex_vat_snapshot=unit_price,
-            amount_ex_vat_snapshot=Decimal("0"),
-            unit_margin_ex_vat_snapshot=unit_margin,
-            margin_ex_vat_snapshot=Decimal("0"),
+        items_read.append(
+            _item_read(
+                item.tariff_group_id,
+                groups[item.tariff_group_id].display_name,
+                item.pickup_quantity,
+                0,
+                unit_price,
+                _ZERO,
+                unit_margin,
+                _ZERO,
+            )
         )
-        db.add(tour_item)
-
+    # Core executemany: no per-item ORM objects to flush or reload.
+    db.execute(insert(TourItem.__table__), item_rows)
+
+    refresh_declaration_rollups(db, tenant_id, [rollup_slice(tour)])
+    # Built before the commit expires the instances, so nothing is re-read.
+    response = _tour_read(
+        tour.id,
+        tour.date,
+        tour.status,
+        {"id": driver.id, "name": driver.display_name},
+        {"id": client.id, "name": client.name},
+        items_read,
+    )
     db.commit()
-    db.refresh(tour)
 
-    return _serialize_tour(tour)
+    return response
 
 
 @router.get("/pending", response_model=list[TourRead])
@@ -249,19 +365,13 @@ def list_pending_tours(
 ):
     driver = _get_driver_from_user(db, tenant_id, user.get("sub"))
 
-    tours = (
-        db.query(Tour)
-        .filter(
-            Tour.tenant_id == tenant_id,
-            Tour.driver_id == driver.id,
-            Tour.status == Tour.STATUS_IN_PROGRESS,
-        )
-        .order_by(Tour.date)
-        .all()
+    return _load_tour_reads(
+        db,
+        Tour.tenant_id == tenant_id,
+        Tour.driver_id == driver.id,
+        Tour.status == Tour.STATUS_IN_PROGRESS,
     )
 
-    return [_serialize_tour(t) for t in tours]
-
 
 @router.put("/{tour_id}/delivery", response_model=TourRead)
 @router.put(
@@ -320,7 +430,8 @@ def submit_tour_delivery(
             ti.margin_ex_vat_snapshot = Decimal("0")
 
     tour.status = Tour.STATUS_COMPLETED
+    db.flush()
+    refresh_declaration_rollups(db, tenant_id, [rollup_slice(tour)])
     db.commit()
-    db.refresh(tour)
 
-    return _serialize_tour(tour)
+    return _load_tour_reads(db, Tour.id == tour.id)[0]
@@ -1,3 +1,8 @@
+import copy
+import hashlib
+import logging
+import threading
+import time
 from typing import Optional
 from jose import jwt
 from jose.exceptions import JWTError
@@ -5,39 +10,170 @@ import requests
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from .cache import MISSING, TTLCache
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 bearer_scheme = HTTPBearer()
 
 
 class JWKSCache:
-    _jwks = None
+    """Signing keys of the identity provider, refreshed without stampedes.
+
+    * keys are cached for ``ttl`` seconds and refreshed in a background thread
+      once less than ``refresh_ahead`` seconds remain, so requests never wait
+      on a routine refresh;
+    * concurrent refreshes are coalesced: threads arriving while a fetch is in
+      flight wait for it instead of issuing their own;
+    * an unknown ``kid`` (key rotation) triggers at most one refresh every
+      ``min_refresh_interval`` seconds and is remembered as unknown for that
+      long, so random ``kid`` values cannot force a fetch per request;
+    * when a refresh fails the previous keys are kept and the next attempt
+      waits ``min_refresh_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        ttl: Optional[float] = None,
+        refresh_ahead: Optional[float] = None,
+        min_refresh_interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self._url = url
+        self.ttl = settings.jwks_cache_ttl_seconds if ttl is None else ttl
+        self.refresh_ahead = (
+            settings.jwks_refresh_ahead_seconds
+            if refresh_ahead is None
+            else refresh_ahead
+        )
+        self.min_refresh_interval = (
+            settings.jwks_min_refresh_interval_seconds
+            if min_refresh_interval is None
+            else min_refresh_interval
+        )
+        self.timeout = (
+            settings.jwks_fetch_timeout_seconds if timeout is None else timeout
+        )
+        self._keys: Optional[dict[str, dict]] = None
+        self._fetched_at = float("-inf")
+        self._last_attempt = float("-inf")
+        self._attempts = 0
+        self._state_lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._background_refresh: Optional[threading.Thread] = None
+        self._unknown_kids: TTLCache[str, bool] = TTLCache(
+            maxsize=1024, ttl=self.min_refresh_interval
+        )
+
+    @property
+    def url(self) -> str:
+        return (
+            self._url
+            or settings.jwks_url
+            or f"https://{settings.auth0_domain}/.well-known/jwks.json"
+        )
+
+    def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        """Return the JWK whose ``kid`` matches, or ``None``."""
+
+        now = time.monotonic()
+        age = now - self._fetched_at
+        may_refresh = now - self._last_attempt >= self.min_refresh_interval
+        if self._keys is None:
+            # Join a fetch in flight (e.g. the startup warm-up), but do not
+            # hammer a provider that just failed.
+            if may_refresh or self._fetch_lock.locked():
+                self.refresh()
+        elif age >= self.ttl and may_refresh:
+            self.refresh()
+        elif age >= self.ttl - self.refresh_ahead and may_refresh:
+            self.refresh_in_background()
+        if self._keys is None:
+            raise requests.ConnectionError(f"JWKS unavailable from {self.url}")
+
+        key = self._keys.get(kid)
+        if key is not None or kid is None:
+            return key
+        if self._unknown_kids.get(kid, False):
+            return None
+
+        # Maybe the provider rotated its keys; refresh unless we just did.
+        if time.monotonic() - self._last_attempt >= self.min_refresh_interval:
+            self.refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            self._unknown_kids.set(kid, True)
+        return key
+
+    def refresh(self) -> None:
+        """Fetch the key set, or wait for the fetch already in flight."""
+
+        attempts_seen = self._attempts
+        with self._fetch_lock:
+            if self._attempts != attempts_seen:
+                # Another thread fetched while we were waiting for the lock.
+                return
+            self._last_attempt = time.monotonic()
+            try:
+                response = requests.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                keys = {
+                    key["kid"]: key
+                    for key in response.json().get("keys", [])
+                    if key.get("kid")
+                }
+            except (requests.RequestException, ValueError):
+                self._attempts += 1
+                if self._keys is None:
+                    raise
+                logger.warning(
+                    "JWKS refresh failed, keeping cached keys", exc_info=True
+                )
+                return
+            with self._state_lock:
+                self._keys = keys
+                self._fetched_at = time.monotonic()
+            self._unknown_kids.clear()
+            self._attempts += 1
+
+    def refresh_in_background(self) -> None:
+        with self._state_lock:
+            if (
+                self._background_refresh is not None
+                and self._background_refresh.is_alive()
+            ):
+                return
+            self._background_refresh = threading.Thread(
+                target=self._refresh_quietly, name="jwks-refresh", daemon=True
+            )
+            self._background_refresh.start()
+
+    def warm_up(self) -> None:
+        """Load the keys ahead of the first request without failing startup."""
+
+        self.refresh_in_background()
 
-    @classmethod
-    def get_jwks(cls, force_refresh: bool = False):
-        if cls._jwks is None or force_refresh:
-            jwks_url = f"https://{settings.auth0_domain}/.well-known/jwks.json"
-            response = requests.get(jwks_url, timeout=5)
-            response.raise_for_status()
-            cls._jwks = response.json()
-        return cls._jwks
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.warning("Unable to fetch JWKS from %s", self.url, exc_info=True)
+
+
+jwks_cache = JWKSCache()
 
 
 def decode_token(token: str) -> dict:
     header = jwt.get_unverified_header(token)
-    jwks = JWKSCache.get_jwks()
-    key = next(
-        (k for k in jwks.get("keys", []) if k.get("kid") == header.get("kid")),
-        None,
-    )
-
-    # Si la clé n'est pas trouvée, on force un refresh du JWKS (rotation de clés)
-    if key is None:
-        jwks = JWKSCache.get_jwks(force_refresh=True)
-        key = next(
-            (k for k in jwks.get("keys", []) if k.get("kid") == header.get("kid")),
-            None,
-        )
+    try:
+        key = jwks_cache.get_key(header.get("kid"))
+    except (requests.RequestException, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Unable to fetch signing keys",
+        ) from exc
 
     if key is None:
         raise HTTPException(
@@ -54,12 +190,42 @@ def decode_token(token: str) -> dict:
     )
 
 
+# Verified claims keyed by a digest of the raw token. Each entry expires with
+# the token itself; the digest avoids keeping bearer tokens in memory.
+_verified_claims: TTLCache[str, dict] = TTLCache(
+    maxsize=settings.jwt_claims_cache_max_entries, ttl=0
+)
+
+
+def verify_token(token: str) -> dict:
+    """Return the claims of ``token``, verifying its signature once per token.
+
+    Tokens without an ``exp`` claim are verified on every call.
+    """
+
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = _verified_claims.get(key)
+    if claims is MISSING:
+        claims = decode_token(token)
+        expires_at = claims.get("exp")
+        if isinstance(expires_at, (int, float)):
+            remaining = expires_at - time.time()
+            if remaining > 0:
+                _verified_claims.set(key, claims, ttl=remaining)
+    # Callers own the returned claims; keep the cached copy pristine.
+    return copy.deepcopy(claims)
+
+
+def clear_verified_claims() -> None:
+    _verified_claims.clear()
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),  # noqa: B008
 ) -> dict:
     token = credentials.credentials
     try:
-        payload = decode_token(token)
+        payload = verify_token(token)
     except JWTError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)
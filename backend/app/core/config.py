@@ -49,6 +49,19 @@ class Settings(BaseSettings):
     auth0_audience: str = "https://delivops-codex.api/"
     auth0_issuer: str = "https://dev-or3c4n80x1rba26g.eu.auth0.com/"
     auth0_algorithms: str = "RS256"
+    jwks_url: str | None = Field(default=None, validation_alias="JWKS_URL")
+    jwks_cache_ttl_seconds: float = Field(
+        default=3600.0, validation_alias="JWKS_CACHE_TTL_SECONDS"
+    )
+    jwks_refresh_ahead_seconds: float = Field(
+        default=300.0, validation_alias="JWKS_REFRESH_AHEAD_SECONDS"
+    )
+    jwks_min_refresh_interval_seconds: float = Field(
+        default=30.0, validation_alias="JWKS_MIN_REFRESH_INTERVAL_SECONDS"
+    )
+    jwks_fetch_timeout_seconds: float = Field(
+        default=5.0, validation_alias="JWKS_FETCH_TIMEOUT_SECONDS"
+    )
     tenant_header_name: str = "X-Tenant-Id"
     dev_fake_auth: bool = False
     loki_url: str | None = None
@@ -82,6 +95,62 @@ class Settings(BaseSettings):
     )
     billing_read_only_after_days: int = Field(default=10)
     billing_strict_suspension_after_days: int = Field(default=20)
+    export_storage_dir: str = Field(
+        default="exports", validation_alias="EXPORT_STORAGE_DIR"
+    )
+    export_worker_poll_interval_seconds: float = Field(
+        default=2.0, validation_alias="EXPORT_WORKER_POLL_INTERVAL_SECONDS"
+    )
+    export_job_timeout_seconds: float = Field(
+        default=1800.0, validation_alias="EXPORT_JOB_TIMEOUT_SECONDS"
+    )
+    tariff_index_ttl_seconds: float = Field(
+        default=300.0, validation_alias="TARIFF_INDEX_TTL_SECONDS"
+    )
+    catalog_cache_ttl_seconds: float = Field(
+        default=300.0, validation_alias="CATALOG_CACHE_TTL_SECONDS"
+    )
+    tenant_cache_ttl_seconds: float = Field(
+        default=60.0, validation_alias="TENANT_CACHE_TTL_SECONDS"
+    )
+    tenant_cache_max_entries: int = Field(
+        default=1024, validation_alias="TENANT_CACHE_MAX_ENTRIES"
+    )
+    membership_cache_ttl_seconds: float = Field(
+        default=30.0, validation_alias="MEMBERSHIP_CACHE_TTL_SECONDS"
+    )
+    membership_cache_max_entries: int = Field(
+        default=4096, validation_alias="MEMBERSHIP_CACHE_MAX_ENTRIES"
+    )
+    audit_queue_max_size: int = Field(
+        default=10000, validation_alias="AUDIT_QUEUE_MAX_SIZE"
+    )
+    audit_batch_size: int = Field(default=500, validation_alias="AUDIT_BATCH_SIZE")
+    audit_flush_interval_seconds: float = Field(
+        default=1.0, validation_alias="AUDIT_FLUSH_INTERVAL_SECONDS"
+    )
+    last_seen_flush_interval_seconds: float = Field(
+        default=5.0, validation_alias="LAST_SEEN_FLUSH_INTERVAL_SECONDS"
+    )
+    jwt_claims_cache_max_entries: int = Field(
+        default=10000, validation_alias="JWT_CLAIMS_CACHE_MAX_ENTRIES"
+    )
+    server_timing_enabled: bool = Field(
+        default=False, validation_alias="SERVER_TIMING_ENABLED"
+    )
+    sql_debug: bool = Field(default=False, validation_alias="SQL_DEBUG")
+    sql_repeated_statement_threshold: int = Field(
+        default=10, validation_alias="SQL_REPEATED_STATEMENT_THRESHOLD"
+    )
+    monitoring_overview_fresh_seconds: float = Field(
+        default=15.0, validation_alias="MONITORING_OVERVIEW_FRESH_SECONDS"
+    )
+    monitoring_overview_stale_seconds: float = Field(
+        default=300.0, validation_alias="MONITORING_OVERVIEW_STALE_SECONDS"
+    )
+    monitoring_overview_cache_max_entries: int = Field(
+        default=1024, validation_alias="MONITORING_OVERVIEW_CACHE_MAX_ENTRIES"
+    )
 
     @field_validator("cors_allow_origins", mode="before")
     @classmethod
@@ -0,0 +1,104 @@
+"""Prometheus metrics exposed on ``/metrics``."""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import anyio.to_thread
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    ProcessCollector,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.db.session import engine
+
+registry = CollectorRegistry()
+ProcessCollector(registry=registry)
+
+REQUEST_LABELS = ("method", "route", "status")
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status.",
+    REQUEST_LABELS,
+    registry=registry,
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests, body streaming included.",
+    REQUEST_LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=registry,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled.",
+    registry=registry,
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one HTTP request.",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    registry=registry,
+)
+db_query_seconds_per_request = Histogram(
+    "db_query_seconds_per_request",
+    "Time spent in SQL statements while handling one HTTP request.",
+    ("method", "route"),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    registry=registry,
+)
+
+
+class RuntimeCollector(Collector):
+    """Read the threadpool and connection pool state at scrape time."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        try:
+            limiter = anyio.to_thread.current_default_thread_limiter()
+        except RuntimeError:
+            # Scraped outside of the event loop (tests, scripts).
+            limiter = None
+        if limiter is not None:
+            yield GaugeMetricFamily(
+                "threadpool_threads_in_use",
+                "Worker threads running synchronous endpoints and dependencies.",
+                value=limiter.borrowed_tokens,
+            )
+            yield GaugeMetricFamily(
+                "threadpool_threads_capacity",
+                "Maximum number of worker threads.",
+                value=limiter.total_tokens,
+            )
+            yield GaugeMetricFamily(
+                "threadpool_tasks_waiting",
+                "Tasks waiting for a free worker thread.",
+                value=limiter.statistics().tasks_waiting,
+            )
+
+        pool = engine.pool
+        for name, documentation, attribute in (
+            ("db_pool_size", "Configured size of the connection pool.", "size"),
+            (
+                "db_pool_checked_out",
+                "Connections currently checked out.",
+                "checkedout",
+            ),
+            (
+                "db_pool_overflow",
+                "Connections opened beyond the pool size.",
+                "overflow",
+            ),
+        ):
+            read = getattr(pool, attribute, None)
+            if read is not None:
+                yield GaugeMetricFamily(name, documentation, value=read())
+
+
+registry.register(RuntimeCollector())
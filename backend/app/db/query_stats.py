@@ -0,0 +1,92 @@
+"""Per-request accounting of the SQL statements sent to the database."""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Expanded ``IN`` lists render one placeholder per value (``?``, ``%(x_1)s``,
+# ``$1``); collapse them so the shape does not depend on the list length.
+_PLACEHOLDER = r"(?:\?|%\([^)]*\)s|\$\d+)"
+_PLACEHOLDER_LIST_RE = re.compile(
+    rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)"
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Return ``statement`` with whitespace and placeholder lists normalized."""
+
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST_RE.sub("(?)", shape)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    record_shapes: bool = False
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed more than ``threshold`` times."""
+
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(record_shapes: bool = False) -> Iterator[QueryStats]:
+    """Count the statements executed in the current context.
+
+    The stats object is shared with the threads started from this context
+    (``run_in_threadpool`` copies the context), so synchronous endpoints and
+    dependencies are accounted for. ``record_shapes`` additionally counts each
+    statement shape, to spot N+1 patterns.
+    """
+
+    stats = QueryStats(record_shapes=record_shapes)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+_STARTED_KEY = "query_stats_started"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get(_STARTED_KEY)
+    if stats is None or not started:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - started.pop()
+    if stats.record_shapes:
+        stats.shapes[statement_shape(statement)] += 1
@@ -1,7 +1,8 @@
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.api.admin import router as admin_router
 from app.api.chauffeurs import router as chauffeurs_router
@@ -9,15 +10,21 @@ from app.api.tarifs import router as tarifs_router
 from app.api.tournees import router as tournees_router
 from app.api.saisies import router as saisies_router
 from app.api.tours import router as tours_router
-from app.api.reports import router as reports_router
+from app.api.reports import NEXT_CURSOR_HEADER, router as reports_router
 from app.api.clients import router as clients_router
+from app.api.exports import router as exports_router
 from app.api.monitoring import router as monitoring_router
 from app.api.shopify import router as shopify_router
 from app.api.billing import router as billing_router, webhook_router as stripe_webhook_router
 from app.api.deps import get_tenant_id, auth_dependency
+from app.core.auth import jwks_cache
 from app.core.config import settings
-from app.middleware.audit import AuditMiddleware
+from app.core.metrics import registry as metrics_registry
+from app.middleware.audit import AuditMiddleware, audit_writer
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
 from app.db.migrations import run_migrations
+from app.services.last_seen import last_seen_tracker
 from app.core.logging import setup_logging
 
 setup_logging()
@@ -28,7 +35,15 @@ async def lifespan(_: FastAPI):
     """Run startup tasks before the application begins serving traffic."""
 
     run_migrations()
-    yield
+    if not settings.dev_fake_auth:
+        jwks_cache.warm_up()
+    audit_writer.start()
+    last_seen_tracker.start()
+    try:
+        yield
+    finally:
+        await last_seen_tracker.stop()
+        await audit_writer.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -40,8 +55,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 app.add_middleware(AuditMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Outermost: the middlewares above read the statements it counts.
+app.add_middleware(QueryStatsMiddleware)
 
 for router in (
     admin_router,
@@ -51,6 +70,7 @@ for router in (
     saisies_router,
     tours_router,
     reports_router,
+    exports_router,
     clients_router,
     monitoring_router,
     shopify_router,
@@ -76,3 +96,18 @@ def root():
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
+
+
+@app.get("/healthz/audit")
+def healthz_audit():
+    """Expose the audit writer queue depth and dropped/written counters."""
+    return audit_writer.metrics()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint.
+
+    Declared ``async`` so the threadpool gauges are read from the event loop.
+    """
+    return Response(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,71 +1,117 @@
 import logging
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.db.session import SessionLocal
-from app.models.audit import AuditLog
-from app.models.user import User
 from app.core.config import settings
 from app.api import deps
+from app.services.audit import (
+    AuditEvent,
+    AuditWriter,
+    create_audit_writer,
+    normalize_path,
+    route_template,
+)
 
 logger = logging.getLogger("audit")
 
+# Started and flushed by the application lifespan.
+audit_writer = create_audit_writer(SessionLocal)
+
+
+class AuditMiddleware:
+    """Record an audit event for every HTTP request carrying a tenant header.
+
+    Plain ASGI middleware: messages are passed through untouched, so streamed
+    bodies are never buffered. The status code is read from the
+    ``http.response.start`` message, the route template from the route the
+    router stored in the scope, and the event is queued once the response has
+    been sent.
+    """
+
+    def __init__(self, app: ASGIApp, writer: Optional[AuditWriter] = None) -> None:
+        self.app = app
+        self.writer = writer if writer is not None else audit_writer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
+        headers = Headers(scope=scope)
+        tenant_id = headers.get(settings.tenant_header_name)
+        if not tenant_id:
+            await self.app(scope, receive, send)
+            return
 
-        tenant_id = request.headers.get(settings.tenant_header_name)
-        if tenant_id:
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self._record(scope, headers, tenant_id, status_code, duration_ms)
+
+    def _record(
+        self,
+        scope: Scope,
+        headers: Headers,
+        tenant_id: str,
+        status_code: int,
+        duration_ms: float,
+    ) -> None:
+        try:
             try:
-                db = SessionLocal()
+                user = deps.auth_dependency(
+                    authorization=headers.get("Authorization"),
+                    x_dev_role=headers.get("X-Dev-Role"),
+                    x_dev_sub=headers.get("X-Dev-Sub"),
+                )
             except Exception:
-                db = None
-            if db:
-                try:
-                    try:
-                        user = deps.auth_dependency(
-                            authorization=request.headers.get("Authorization"),
-                            x_dev_role=request.headers.get("X-Dev-Role"),
-                            x_dev_sub=request.headers.get("X-Dev-Sub"),
-                        )
-                    except Exception:
-                        user = None
-
-                    user_id = None
-                    if user:
-                        user_row = (
-                            db.query(User)
-                            .filter(
-                                User.auth0_sub == user.get("sub"),
-                                User.tenant_id == int(tenant_id),
-                            )
-                            .first()
-                        )
-                        if user_row:
-                            user_id = user_row.id
-
-                    audit = AuditLog(
-                        tenant_id=int(tenant_id),
-                        user_id=user_id,
-                        entity=request.url.path,
-                        entity_id=0,
-                        action=request.method.lower(),
-                    )
-                    db.add(audit)
-                    db.commit()
-
-                    logger.info(
-                        "audit",
-                        extra={
-                            "tenant_id": tenant_id,
-                            "user_id": str(user_id) if user_id else "anonymous",
-                            "entity": request.url.path,
-                            "action": request.method.lower(),
-                        },
-                    )
-                except Exception:
-                    pass
-                finally:
-                    db.close()
-        return response
+                user = None
+
+            sub = user.get("sub") if user else None
+            path = scope["path"]
+            action = scope["method"].lower()
+            route = scope.get("route")
+            template = (
+                route_template(route.path_format)
+                if hasattr(route, "path_format")
+                else normalize_path(path)
+            )
+            self.writer.enqueue(
+                AuditEvent(
+                    tenant_id=int(tenant_id),
+                    sub=sub,
+                    entity=path,
+                    action=action,
+                    route=template,
+                    status_code=status_code,
+                    duration_ms=duration_ms,
+                )
+            )
+
+            logger.info(
+                "audit",
+                extra={
+                    "tenant_id": tenant_id,
+                    "user_sub": sub or "anonymous",
+                    "entity": path,
+                    "route": template,
+                    "action": action,
+                    "status_code": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                },
+            )
+        except Exception:
+            pass
@@ -0,0 +1,63 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.db.query_stats import current_query_stats
+from app.services.audit import route_template
+
+# Label used for requests that matched no route, so that scanners probing
+# random paths cannot blow up the number of series.
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Record Prometheus request metrics for every HTTP request.
+
+    Like the audit middleware it only observes ``http.response.start``, so
+    streamed bodies pass through untouched. Durations cover the whole response,
+    body included. SQL statements are counted by the enclosing
+    :class:`app.middleware.query_stats.QueryStatsMiddleware`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.http_requests_in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.http_requests_in_progress.dec()
+            route = scope.get("route")
+            template = (
+                route_template(route.path_format)
+                if hasattr(route, "path_format")
+                else UNMATCHED_ROUTE
+            )
+            method = scope["method"]
+            labels = (method, template, str(status_code))
+            metrics.http_requests_total.labels(*labels).inc()
+            metrics.http_request_duration_seconds.labels(*labels).observe(elapsed)
+            queries = current_query_stats()
+            if queries is not None:
+                metrics.db_queries_per_request.labels(method, template).observe(
+                    queries.count
+                )
+                metrics.db_query_seconds_per_request.labels(
+                    method, template
+                ).observe(queries.duration)
@@ -0,0 +1,66 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.query_stats import track_queries
+
+logger = logging.getLogger("sql")
+
+
+class QueryStatsMiddleware:
+    """Count the SQL statements run by each HTTP request.
+
+    With ``settings.server_timing_enabled`` (off by default, as it exposes
+    database timings to clients) the count and the time spent in the
+    database are sent back in a ``Server-Timing`` header
+    (``db;dur=12.5;desc="7 queries"``). Statements
+    executed after the response has started, while a body is streamed, are
+    not part of the header. With ``settings.sql_debug`` a warning names every
+    statement shape repeated more than
+    ``settings.sql_repeated_statement_threshold`` times, the usual sign of
+    lazy loads in a loop.
+
+    Registered outermost so that the other middlewares read the same stats
+    through :func:`app.db.query_stats.current_query_stats`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(record_shapes=settings.sql_debug) as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if (
+                    message["type"] == "http.response.start"
+                    and settings.server_timing_enabled
+                ):
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f"db;dur={stats.duration * 1000:.1f};"
+                        f'desc="{stats.count} queries"',
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                if settings.sql_debug:
+                    self._warn_repeated(scope, stats)
+
+    def _warn_repeated(self, scope: Scope, stats) -> None:
+        for shape, count in stats.repeated(settings.sql_repeated_statement_threshold):
+            logger.warning(
+                "Possible N+1: statement executed %s times in %s %s: %s",
+                count,
+                scope["method"],
+                scope["path"],
+                shape,
+            )
@@ -1,15 +1,24 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from .base import Base
 
 
 class AuditLog(Base):
+    __table_args__ = (
+        Index("ix_auditlog_tenant_created_at", "tenant_id", "created_at"),
+        Index("ix_auditlog_tenant_route", "tenant_id", "route"),
+    )
+
     tenant_id = Column(Integer, ForeignKey("tenant.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("user.id"))
     entity = Column(String, nullable=False)
     entity_id = Column(Integer, nullable=False)
     action = Column(String, nullable=False)
+    # Route template with identifiers replaced by ``:id`` (``/tours/:id``).
+    route = Column(String)
+    status_code = Column(Integer)
+    duration_ms = Column(Float)
     before_json = Column(String)
     after_json = Column(String)
 
@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from sqlalchemy import (
+    Column,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    UniqueConstraint,
+)
+
+from .base import Base
+
+
+class DeclarationDailyRollup(Base):
+    """Daily totals of tour items per client, driver and tariff group.
+
+    Rows are recomputed from ``TourItem`` whenever a declaration changes so
+    that aggregate reads scan one row per group instead of every item.
+    """
+
+    __tablename__ = "declaration_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_id",
+            "date",
+            "client_id",
+            "driver_id",
+            "tariff_group_id",
+            name="uq_declaration_daily_rollup_key",
+        ),
+        Index("ix_declaration_daily_rollup_tenant_date", "tenant_id", "date"),
+    )
+
+    tenant_id = Column(Integer, ForeignKey("tenant.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    client_id = Column(Integer, ForeignKey("client.id"), nullable=False)
+    driver_id = Column(Integer, ForeignKey("chauffeur.id"), nullable=False)
+    tariff_group_id = Column(Integer, ForeignKey("tariffgroup.id"), nullable=False)
+    item_count = Column(Integer, nullable=False, default=0)
+    pickup_quantity = Column(Integer, nullable=False, default=0)
+    delivery_quantity = Column(Integer, nullable=False, default=0)
+    amount_ex_vat = Column(Numeric(12, 2), nullable=False, default=Decimal("0"))
+    margin_ex_vat = Column(Numeric(12, 2), nullable=False, default=Decimal("0"))
@@ -1,16 +1,35 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 
 from .base import Base
 
 
 class Export(Base):
-    tenant_id = Column(Integer, ForeignKey("tenant.id"), nullable=False)
+    """Background export job and the location of the rendered file."""
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+
+    TYPE_DECLARATIONS = "declarations"
+
+    FORMAT_CSV = "csv"
+    FORMAT_XLSX = "xlsx"
+
+    tenant_id = Column(Integer, ForeignKey("tenant.id"), nullable=False, index=True)
     type = Column(String, nullable=False)
+    format = Column(String, nullable=False, default=FORMAT_CSV)
+    status = Column(String, nullable=False, default=STATUS_PENDING, index=True)
     periode_debut = Column(Date, nullable=False)
     periode_fin = Column(Date, nullable=False)
     client_id = Column(Integer, ForeignKey("client.id"))
+    driver_id = Column(Integer, ForeignKey("chauffeur.id"))
     file_url = Column(String)
+    error = Column(String)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
 
     tenant = relationship("Tenant")
     client = relationship("Client")
+    driver = relationship("Chauffeur")
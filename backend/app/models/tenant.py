@@ -8,12 +8,14 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Boolean,
     String,
     JSON,
     UniqueConstraint,
 )
+from sqlalchemy import func
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -76,6 +78,10 @@ class Tenant(Base):
     )
 
 
+# Backs the case-insensitive slug lookup done by ``get_tenant_id``.
+Index("ix_tenant_slug_lower", func.lower(Tenant.slug))
+
+
 class TenantSubscription(Base):
     __tablename__ = "tenant_subscriptions"
     __table_args__ = (
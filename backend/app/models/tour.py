@@ -1,4 +1,4 @@
-from sqlalchemy import CheckConstraint, Column, Date, ForeignKey, Integer, String
+from sqlalchemy import CheckConstraint, Column, Date, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -20,6 +20,7 @@ class Tour(Base):
         CheckConstraint(
             "status IN ('IN_PROGRESS', 'COMPLETED')", name="ck_tour_status"
         ),
+        Index("ix_tour_tenant_date_id", "tenant_id", "date", "id"),
     )
 
     tenant = relationship("Tenant")
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ExportCreate(BaseModel):
+    type: Literal["declarations"] = "declarations"
+    format: Literal["csv", "xlsx"] = "csv"
+    date_from: date = Field(alias="dateFrom")
+    date_to: date = Field(alias="dateTo")
+    client_id: int | None = Field(default=None, alias="clientId")
+    driver_id: int | None = Field(default=None, alias="driverId")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ExportRead(BaseModel):
+    id: int
+    type: str
+    format: Literal["csv", "xlsx"]
+    status: Literal["PENDING", "RUNNING", "COMPLETED", "FAILED"]
+    date_from: date = Field(alias="dateFrom")
+    date_to: date = Field(alias="dateTo")
+    client_id: int | None = Field(default=None, alias="clientId")
+    driver_id: int | None = Field(default=None, alias="driverId")
+    error: str | None = None
+    created_at: datetime | None = Field(default=None, alias="createdAt")
+    completed_at: datetime | None = Field(default=None, alias="completedAt")
+    download_url: str | None = Field(default=None, alias="downloadUrl")
+
+    model_config = ConfigDict(populate_by_name=True)
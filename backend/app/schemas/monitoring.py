@@ -22,8 +22,17 @@ class MonitoringEvent(BaseModel):
     has_authenticated_actor: bool
 
 
+class EndpointActivity(BaseModel):
+    route: str
+    action: str
+    request_count: int
+    error_count: int
+    average_duration_ms: float | None
+
+
 class MonitoringOverview(BaseModel):
     admins: ActivitySummary
     chauffeurs: ChauffeurSummary
     recent_events: list[MonitoringEvent]
+    endpoints: list[EndpointActivity]
     gdpr_notice: str
@@ -109,6 +109,26 @@ class DeclarationReportLine(BaseModel):
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
+class DeclarationAggregateLine(BaseModel):
+    period_start: date | None = Field(default=None, alias="periodStart")
+    client_id: int | None = Field(default=None, alias="clientId")
+    client_name: str | None = Field(default=None, alias="clientName")
+    driver_id: int | None = Field(default=None, alias="driverId")
+    driver_name: str | None = Field(default=None, alias="driverName")
+    tariff_group_id: int | None = Field(default=None, alias="tariffGroupId")
+    tariff_group_display_name: str | None = Field(
+        default=None, alias="tariffGroupDisplayName"
+    )
+    declaration_count: int = Field(alias="declarationCount")
+    pickup_quantity: int = Field(alias="pickupQuantity")
+    delivery_quantity: int = Field(alias="deliveryQuantity")
+    difference_quantity: int = Field(alias="differenceQuantity")
+    estimated_amount_eur: Decimal = Field(alias="estimatedAmountEur")
+    margin_amount_eur: Decimal = Field(alias="marginAmountEur")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class DeclarationReportCreate(BaseModel):
     date: date
     driver_id: int = Field(alias="driverId")
@@ -0,0 +1,215 @@
+"""Écriture asynchrone et groupée du journal d'audit."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit import AuditLog
+from app.models.user import User
+
+logger = logging.getLogger("audit")
+
+_PATH_PARAM_RE = re.compile(r"\{[^}]+\}")
+_ID_SEGMENT_RE = re.compile(r"/[0-9]+(?=/|$)")
+_HEX_SEGMENT_RE = re.compile(r"/[0-9a-fA-F-]{8,}(?=/|$)")
+
+
+def route_template(path_format: str) -> str:
+    """Turn a route path such as ``/tours/{tour_id}`` into ``/tours/:id``."""
+
+    return _PATH_PARAM_RE.sub(":id", path_format)
+
+
+def normalize_path(path: str | None) -> str:
+    """Pseudonymise identifiers in a raw request path.
+
+    Used when no route matched the request, and to backfill rows written before
+    route templates were recorded.
+    """
+
+    if not path:
+        return "/"
+    normalized = _ID_SEGMENT_RE.sub("/:id", path)
+    return _HEX_SEGMENT_RE.sub("/:token", normalized)
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    tenant_id: int
+    entity: str
+    action: str
+    sub: Optional[str] = None
+    route: Optional[str] = None
+    status_code: Optional[int] = None
+    duration_ms: Optional[float] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class AuditWriter:
+    """Buffer audit events in a bounded queue and insert them in batches.
+
+    ``enqueue`` never blocks the request: when the queue is full the event is
+    dropped and counted. A background task drains the queue, waiting at most
+    ``flush_interval`` seconds to fill a batch of ``batch_size`` events, and
+    writes each batch with one ``User`` lookup and one multi-row ``INSERT`` in
+    a worker thread. ``stop`` flushes whatever is still queued.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[AuditEvent] = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._unflushed: list[AuditEvent] = []
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "queue_capacity": self.max_queue_size,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+        }
+
+    def enqueue(self, event: AuditEvent) -> bool:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("Audit queue full, %s events dropped", self.dropped)
+            return False
+        return True
+
+    def start(self) -> None:
+        """Start draining the queue on the running event loop."""
+
+        if self._task is not None and not self._task.done():
+            return
+        # asyncio queues bind to the loop that first waits on them; carry the
+        # pending events over to a fresh queue for this loop.
+        pending = self._take_batch(self._queue.qsize())
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        for event in pending:
+            self._queue.put_nowait(event)
+        self._task = asyncio.create_task(self._run(), name="audit-writer")
+
+    async def stop(self) -> None:
+        """Stop the background task and write the remaining events."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        batch, self._unflushed = self._unflushed, []
+        await self._flush(batch)
+        while not self._queue.empty():
+            await self._flush(self._take_batch(self.batch_size))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            try:
+                # asyncio.timeout rather than wait_for: on Python 3.11,
+                # wait_for drops a cancellation that arrives as the get
+                # completes, and ``stop`` then waits for the task forever.
+                async with asyncio.timeout_at(deadline):
+                    while len(batch) < self.batch_size:
+                        batch.append(await self._queue.get())
+            except TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                # Hand the partial batch over to ``stop``.
+                self._unflushed = batch
+                raise
+            await self._flush(batch)
+
+    def _take_batch(self, limit: int) -> list[AuditEvent]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: list[AuditEvent]) -> None:
+        if not batch:
+            return
+        try:
+            await asyncio.to_thread(self.write_batch, batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Unable to write %s audit events", len(batch))
+        else:
+            self.written += len(batch)
+
+    def write_batch(self, batch: list[AuditEvent]) -> None:
+        memberships = {(event.sub, event.tenant_id) for event in batch if event.sub}
+        with self.session_factory() as db:
+            user_ids: dict[tuple[str, int], int] = {}
+            if memberships:
+                rows = db.execute(
+                    select(User.auth0_sub, User.tenant_id, User.id).where(
+                        tuple_(User.auth0_sub, User.tenant_id).in_(memberships)
+                    )
+                )
+                user_ids = {
+                    (sub, tenant_id): user_id for sub, tenant_id, user_id in rows
+                }
+            # Core insert: one executemany, no per-row ORM bookkeeping.
+            db.execute(
+                insert(AuditLog.__table__),
+                [
+                    {
+                        "created_at": event.created_at,
+                        "tenant_id": event.tenant_id,
+                        "user_id": user_ids.get((event.sub, event.tenant_id)),
+                        "entity": event.entity,
+                        "entity_id": 0,
+                        "action": event.action,
+                        "route": event.route,
+                        "status_code": event.status_code,
+                        "duration_ms": event.duration_ms,
+                    }
+                    for event in batch
+                ],
+            )
+            db.commit()
+
+
+def create_audit_writer(session_factory: Callable[[], Session]) -> AuditWriter:
+    return AuditWriter(
+        session_factory,
+        max_queue_size=settings.audit_queue_max_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval=settings.audit_flush_interval_seconds,
+    )
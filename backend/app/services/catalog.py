@@ -0,0 +1,128 @@
+"""Cache versionné du catalogue clients/catégories, par tenant."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.client import Client
+from app.models.tariff import Tariff
+from app.models.tariff_group import TariffGroup
+from app.schemas.client import ClientWithCategories
+
+_catalog_adapter = TypeAdapter(List[ClientWithCategories])
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    version: int
+    day: date
+    expires_at: float
+    etag: str
+    body: bytes
+
+
+_DIRTY_TENANTS_KEY = "catalog_dirty_tenants"
+
+_lock = threading.Lock()
+_versions: dict[int, int] = {}
+_entries: dict[tuple[int, bool], CatalogEntry] = {}
+
+
+def bump_catalog_version(tenant_id: Optional[int] = None) -> None:
+    """Invalidate the cached catalog of ``tenant_id``, or of every tenant."""
+
+    with _lock:
+        tenant_ids = (
+            {key[0] for key in _entries} | set(_versions)
+            if tenant_id is None
+            else {tenant_id}
+        )
+        for key in tenant_ids:
+            _versions[key] = _versions.get(key, 0) + 1
+        for key in [key for key in _entries if key[0] in tenant_ids]:
+            del _entries[key]
+
+
+def get_catalog(
+    tenant_id: int,
+    include_inactive: bool,
+    loader: Callable[[], List[ClientWithCategories]],
+) -> CatalogEntry:
+    """Return the serialized catalog, calling ``loader`` only on a miss.
+
+    Entries are dropped when the tenant's version is bumped, when the day
+    changes (current prices depend on it) and after
+    ``settings.catalog_cache_ttl_seconds`` to pick up writes made by other
+    processes. The ETag is derived from the body so that every process agrees
+    on it.
+    """
+
+    key = (tenant_id, include_inactive)
+    today = date.today()
+    now = time.monotonic()
+    with _lock:
+        version = _versions.get(tenant_id, 0)
+        entry = _entries.get(key)
+        if (
+            entry is not None
+            and entry.version == version
+            and entry.day == today
+            and entry.expires_at > now
+        ):
+            return entry
+
+    body = _catalog_adapter.dump_json(loader(), by_alias=True)
+    entry = CatalogEntry(
+        version=version,
+        day=today,
+        expires_at=now + settings.catalog_cache_ttl_seconds,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        body=body,
+    )
+    with _lock:
+        if _versions.get(tenant_id, 0) == version:
+            _entries[key] = entry
+    return entry
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header with weak comparison."""
+
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == etag
+        for candidate in candidates
+    )
+
+
+# Every committed change to a client, a category or a tariff bumps the version,
+# whether it comes from the clients endpoints or from any other session.
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_catalog_changes(session: Session, flush_context) -> None:
+    tenant_ids = {
+        instance.tenant_id
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, (Client, TariffGroup, Tariff))
+    }
+    if tenant_ids:
+        session.info.setdefault(_DIRTY_TENANTS_KEY, set()).update(tenant_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_changes(session: Session) -> None:
+    for tenant_id in session.info.pop(_DIRTY_TENANTS_KEY, ()):
+        bump_catalog_version(tenant_id)
@@ -9,6 +9,7 @@ from app.models.chauffeur import Chauffeur
 from app.models.tenant import Tenant
 from app.models.user import User
 from app.schemas.chauffeur import ChauffeurCreate, ChauffeurUpdate
+from app.services.memberships import invalidate_membership
 
 
 class TenantNotFoundError(Exception):
@@ -63,6 +64,7 @@ class ChauffeurService:
         self._record_audit("create", chauffeur.id, user_id)
 
         self.db.commit()
+        invalidate_membership(tenant_id=self.tenant_id)
         self.db.refresh(chauffeur)
         return chauffeur
 
@@ -87,6 +89,7 @@ class ChauffeurService:
         self._record_audit("update", chauffeur.id, user_id)
 
         self.db.commit()
+        invalidate_membership(tenant_id=self.tenant_id)
         self.db.refresh(chauffeur)
         return chauffeur
 
@@ -99,6 +102,7 @@ class ChauffeurService:
         self.db.delete(chauffeur)
         self._record_audit("delete", chauffeur_id, user_id)
         self.db.commit()
+        invalidate_membership(tenant_id=self.tenant_id)
 
     # Helpers -----------------------------------------------------------------
 
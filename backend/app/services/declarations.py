@@ -0,0 +1,342 @@
+"""Lecture et rendu des déclarations pour les rapports et les exports."""
+
+from __future__ import annotations
+
+import csv
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import Date, and_, cast, func, or_, tuple_, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core.xlsx import iter_xlsx
+from app.models.chauffeur import Chauffeur
+from app.models.client import Client
+from app.models.tariff_group import TariffGroup
+from app.models.tour import Tour
+from app.models.tour_item import TourItem
+from app.schemas.tour import DeclarationAggregateLine, DeclarationReportLine
+
+
+DECLARATIONS_EXPORT_HEADER = [
+    "Date",
+    "Chauffeur",
+    "Client donneur d'ordre",
+    "Catégorie de groupe tarifaire",
+    "Nombre de colis récupérés",
+    "Nombre de colis livrés",
+    "Écart",
+    "Montant estimé (€)",
+    "Marge (€)",
+]
+
+
+def format_declaration_export_row(
+    declaration: DeclarationReportLine,
+) -> list[str | int]:
+    return [
+        declaration.date.isoformat(),
+        declaration.driver_name,
+        declaration.client_name,
+        declaration.tariff_group_display_name,
+        declaration.pickup_quantity,
+        declaration.delivery_quantity,
+        declaration.difference_quantity,
+        f"{declaration.estimated_amount_eur:.2f}",
+        f"{declaration.margin_amount_eur:.2f}",
+    ]
+
+
+def serialize_declaration(
+    item: TourItem | None,
+    tour: Tour,
+    driver: Chauffeur,
+    client: Client,
+    tg: TariffGroup | None,
+) -> DeclarationReportLine:
+    pickup_qty = item.pickup_quantity or 0 if item else 0
+    delivery_qty = item.delivery_quantity or 0 if item else 0
+    estimated_amount = (
+        item.amount_ex_vat_snapshot if item and item.amount_ex_vat_snapshot else None
+    )
+    unit_price = (
+        item.unit_price_ex_vat_snapshot
+        if item and item.unit_price_ex_vat_snapshot
+        else None
+    )
+    unit_margin = (
+        item.unit_margin_ex_vat_snapshot
+        if item and item.unit_margin_ex_vat_snapshot
+        else None
+    )
+    margin_amount = (
+        item.margin_ex_vat_snapshot if item and item.margin_ex_vat_snapshot else None
+    )
+    estimated_amount_value = (estimated_amount or Decimal("0")).quantize(
+        Decimal("0.01")
+    )
+    unit_price_value = (unit_price or Decimal("0")).quantize(Decimal("0.01"))
+    unit_margin_value = (unit_margin or Decimal("0")).quantize(Decimal("0.01"))
+    margin_amount_value = (margin_amount or Decimal("0")).quantize(
+        Decimal("0.01")
+    )
+    return DeclarationReportLine(
+        tour_id=tour.id,
+        tour_item_id=item.id if item else None,
+        date=tour.date,
+        driver_name=driver.display_name,
+        client_name=client.name,
+        tariff_group_display_name=tg.display_name if tg else "—",
+        pickup_quantity=pickup_qty,
+        delivery_quantity=delivery_qty,
+        difference_quantity=pickup_qty - delivery_qty,
+        estimated_amount_eur=estimated_amount_value,
+        unit_price_ex_vat=unit_price_value,
+        unit_margin_ex_vat=unit_margin_value,
+        margin_amount_eur=margin_amount_value,
+        status=tour.status,
+    )
+
+
+DECLARATIONS_STREAM_BATCH_SIZE = 500
+DeclarationCursor = tuple[date, int, Optional[int]]
+
+
+def declarations_query(
+    db: Session,
+    tenant_id: int,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    client_id: Optional[int],
+    driver_id: Optional[int],
+    after: Optional[DeclarationCursor] = None,
+):
+    query = (
+        db.query(Tour, TourItem, Chauffeur, Client, TariffGroup)
+        .join(Chauffeur, Tour.driver_id == Chauffeur.id)
+        .join(Client, Tour.client_id == Client.id)
+        .outerjoin(TourItem, TourItem.tour_id == Tour.id)
+        .outerjoin(TariffGroup, TourItem.tariff_group_id == TariffGroup.id)
+        .filter(Tour.tenant_id == tenant_id)
+        .filter(
+            Tour.status.in_([Tour.STATUS_COMPLETED, Tour.STATUS_IN_PROGRESS])
+        )
+    )
+
+    if date_from:
+        query = query.filter(Tour.date >= date_from)
+    if date_to:
+        query = query.filter(Tour.date <= date_to)
+    if client_id:
+        query = query.filter(Tour.client_id == client_id)
+    if driver_id:
+        query = query.filter(Tour.driver_id == driver_id)
+    if after is not None:
+        # Keyset condition matching ORDER BY date DESC, tour DESC, item ASC.
+        # A cursor without item id points at a tour without items, which
+        # only ever produces a single row. The row comparison repeats the
+        # upper bound in a form the (tenant_id, date, id) index can range
+        # scan; the OR below cannot be used as an index condition.
+        after_date, after_tour_id, after_item_id = after
+        query = query.filter(
+            tuple_(Tour.date, Tour.id) <= tuple_(after_date, after_tour_id)
+        )
+        conditions = [
+            Tour.date < after_date,
+            and_(Tour.date == after_date, Tour.id < after_tour_id),
+        ]
+        if after_item_id is not None:
+            conditions.append(
+                and_(
+                    Tour.date == after_date,
+                    Tour.id == after_tour_id,
+                    TourItem.id > after_item_id,
+                )
+            )
+        query = query.filter(or_(*conditions))
+
+    return query.order_by(Tour.date.desc(), Tour.id.desc(), TourItem.id.asc())
+
+
+def iter_declarations(
+    db: Session,
+    tenant_id: int,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    client_id: Optional[int],
+    driver_id: Optional[int],
+) -> Iterator[DeclarationReportLine]:
+    """Yield declarations one by one through a server-side cursor.
+
+    ``yield_per`` fetches the joined rows in fixed-size batches (and enables
+    ``stream_results`` on PostgreSQL) so exports keep a constant memory
+    footprint whatever the length of the requested period.
+    """
+
+    query = declarations_query(
+        db, tenant_id, date_from, date_to, client_id, driver_id
+    ).yield_per(DECLARATIONS_STREAM_BATCH_SIZE)
+    for tour, item, driver, client, tg in query:
+        yield serialize_declaration(item, tour, driver, client, tg)
+
+
+def stream_declarations_csv(
+    declarations: Iterable[DeclarationReportLine],
+) -> Iterator[str]:
+    """Render declarations as CSV, flushing the buffer every batch of rows."""
+
+    output = StringIO()
+    writer = csv.writer(output, delimiter=";")
+    writer.writerow(DECLARATIONS_EXPORT_HEADER)
+    for index, declaration in enumerate(declarations, start=1):
+        writer.writerow(format_declaration_export_row(declaration))
+        if index % DECLARATIONS_STREAM_BATCH_SIZE == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    remaining = output.getvalue()
+    if remaining:
+        yield remaining
+
+
+def iter_declarations_xlsx(
+    declarations: Iterable[DeclarationReportLine],
+) -> Iterator[bytes]:
+    """Render declarations as a streamed XLSX workbook."""
+
+    rows = chain(
+        [DECLARATIONS_EXPORT_HEADER],
+        (format_declaration_export_row(row) for row in declarations),
+    )
+    return iter_xlsx(rows, sheet_title="Declarations")
+
+
+DATE_BUCKETS = ("day", "week", "month")
+AGGREGATE_DIMENSIONS = DATE_BUCKETS + ("client", "driver", "tariff_group")
+
+
+def _date_bucket(dialect_name: str, granularity: str):
+    """Return a SQL expression truncating ``Tour.date`` to the bucket start.
+
+    Weeks start on Monday, as with PostgreSQL's ``date_trunc``.
+    """
+
+    if granularity == "day":
+        return Tour.date
+    if dialect_name == "sqlite":
+        if granularity == "week":
+            expression = func.date(Tour.date, "weekday 0", "-6 days")
+        else:
+            expression = func.date(Tour.date, "start of month")
+        return type_coerce(expression, Date)
+    return cast(func.date_trunc(granularity, Tour.date), Date)
+
+
+def aggregate_declarations(
+    db: Session,
+    tenant_id: int,
+    group_by: Sequence[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    client_id: Optional[int],
+    driver_id: Optional[int],
+) -> list[DeclarationAggregateLine]:
+    """Sum tour item snapshots in SQL, grouped by the requested dimensions.
+
+    ``group_by`` accepts at most one of ``day``/``week``/``month`` plus any of
+    ``client``, ``driver`` and ``tariff_group``; the caller validates it.
+    """
+
+    columns = []
+    group_columns = []
+    order_columns = []
+    labels: list[str] = []
+
+    bucket = next((value for value in group_by if value in DATE_BUCKETS), None)
+    if bucket is not None:
+        period = _date_bucket(db.get_bind().dialect.name, bucket).label("period_start")
+        columns.append(period)
+        group_columns.append(period)
+        order_columns.append(period.desc())
+        labels.append("period_start")
+    if "client" in group_by:
+        columns += [Client.id.label("client_id"), Client.name.label("client_name")]
+        group_columns += [Client.id, Client.name]
+        order_columns += [Client.name, Client.id]
+        labels += ["client_id", "client_name"]
+    if "driver" in group_by:
+        columns += [
+            Chauffeur.id.label("driver_id"),
+            Chauffeur.display_name.label("driver_name"),
+        ]
+        group_columns += [Chauffeur.id, Chauffeur.display_name]
+        order_columns += [Chauffeur.display_name, Chauffeur.id]
+        labels += ["driver_id", "driver_name"]
+    if "tariff_group" in group_by:
+        columns += [
+            TariffGroup.id.label("tariff_group_id"),
+            TariffGroup.display_name.label("tariff_group_display_name"),
+        ]
+        group_columns += [TariffGroup.id, TariffGroup.display_name]
+        order_columns += [TariffGroup.display_name, TariffGroup.id]
+        labels += ["tariff_group_id", "tariff_group_display_name"]
+
+    query = (
+        db.query(
+            *columns,
+            func.count(TourItem.id).label("declaration_count"),
+            func.coalesce(func.sum(TourItem.pickup_quantity), 0).label("pickup"),
+            func.coalesce(func.sum(TourItem.delivery_quantity), 0).label("delivery"),
+            func.coalesce(func.sum(TourItem.amount_ex_vat_snapshot), 0).label(
+                "amount"
+            ),
+            func.coalesce(func.sum(TourItem.margin_ex_vat_snapshot), 0).label(
+                "margin"
+            ),
+        )
+        .select_from(TourItem)
+        .join(Tour, TourItem.tour_id == Tour.id)
+        .filter(Tour.tenant_id == tenant_id, TourItem.tenant_id == tenant_id)
+        .filter(
+            Tour.status.in_([Tour.STATUS_COMPLETED, Tour.STATUS_IN_PROGRESS])
+        )
+    )
+    if "client" in group_by:
+        query = query.join(Client, Tour.client_id == Client.id)
+    if "driver" in group_by:
+        query = query.join(Chauffeur, Tour.driver_id == Chauffeur.id)
+    if "tariff_group" in group_by:
+        query = query.join(TariffGroup, TourItem.tariff_group_id == TariffGroup.id)
+
+    if date_from:
+        query = query.filter(Tour.date >= date_from)
+    if date_to:
+        query = query.filter(Tour.date <= date_to)
+    if client_id:
+        query = query.filter(Tour.client_id == client_id)
+    if driver_id:
+        query = query.filter(Tour.driver_id == driver_id)
+
+    if group_columns:
+        query = query.group_by(*group_columns).order_by(*order_columns)
+
+    cent = Decimal("0.01")
+    lines = []
+    for row in query.all():
+        pickup = int(row.pickup)
+        delivery = int(row.delivery)
+        lines.append(
+            DeclarationAggregateLine(
+                **{label: getattr(row, label) for label in labels},
+                declaration_count=row.declaration_count,
+                pickup_quantity=pickup,
+                delivery_quantity=delivery,
+                difference_quantity=pickup - delivery,
+                estimated_amount_eur=Decimal(row.amount).quantize(cent),
+                margin_amount_eur=Decimal(row.margin).quantize(cent),
+            )
+        )
+    return lines
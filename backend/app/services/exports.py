@@ -0,0 +1,208 @@
+"""Services liés aux exports asynchrones."""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.chauffeur import Chauffeur
+from app.models.client import Client
+from app.models.export import Export
+from app.schemas.export import ExportCreate
+from app.services.declarations import (
+    iter_declarations,
+    iter_declarations_xlsx,
+    stream_declarations_csv,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ExportNotFoundError(Exception):
+    """Aucun export ne correspond à l'identifiant fourni."""
+
+
+class ExportNotReadyError(Exception):
+    """Le fichier de l'export n'est pas encore disponible."""
+
+
+class InvalidExportError(Exception):
+    """La demande d'export référence des données invalides."""
+
+
+def export_storage_root() -> Path:
+    return Path(settings.export_storage_dir).resolve()
+
+
+def export_file_path(export: Export) -> Path:
+    filename = f"{export.id}.{export.format}"
+    return export_storage_root() / str(export.tenant_id) / filename
+
+
+class ExportService:
+    """Crée et consulte les exports d'un tenant."""
+
+    def __init__(self, db: Session, tenant_id: int) -> None:
+        self.db = db
+        self.tenant_id = tenant_id
+
+    def create(self, export_in: ExportCreate) -> Export:
+        """Enregistre un export en attente ; le worker se charge du rendu."""
+
+        if export_in.date_from > export_in.date_to:
+            raise InvalidExportError("Invalid date range")
+        if export_in.client_id is not None:
+            client = self.db.get(Client, export_in.client_id)
+            if client is None or client.tenant_id != self.tenant_id:
+                raise InvalidExportError("Client not found")
+        if export_in.driver_id is not None:
+            driver = self.db.get(Chauffeur, export_in.driver_id)
+            if driver is None or driver.tenant_id != self.tenant_id:
+                raise InvalidExportError("Driver not found")
+
+        export = Export(
+            tenant_id=self.tenant_id,
+            type=export_in.type,
+            format=export_in.format,
+            status=Export.STATUS_PENDING,
+            periode_debut=export_in.date_from,
+            periode_fin=export_in.date_to,
+            client_id=export_in.client_id,
+            driver_id=export_in.driver_id,
+        )
+        self.db.add(export)
+        self.db.commit()
+        self.db.refresh(export)
+        return export
+
+    def get(self, export_id: int) -> Export:
+        export = (
+            self.db.query(Export)
+            .filter(Export.id == export_id, Export.tenant_id == self.tenant_id)
+            .first()
+        )
+        if export is None:
+            raise ExportNotFoundError
+        return export
+
+    def file_path(self, export_id: int) -> tuple[Export, Path]:
+        """Retourne l'export terminé et le chemin de son fichier."""
+
+        export = self.get(export_id)
+        if export.status != Export.STATUS_COMPLETED or not export.file_url:
+            raise ExportNotReadyError
+        path = export_storage_root() / export.file_url
+        if not path.is_file():
+            raise ExportNotReadyError
+        return export, path
+
+
+# Worker ----------------------------------------------------------------------
+
+
+def claim_next_export(db: Session) -> Export | None:
+    """Passe le plus ancien export en attente au statut ``RUNNING``.
+
+    ``SKIP LOCKED`` lets several workers poll the same table on PostgreSQL
+    without handing the same job out twice. A job still ``RUNNING`` after
+    ``export_job_timeout_seconds`` belongs to a worker that died mid-render
+    and is claimed again.
+    """
+
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=settings.export_job_timeout_seconds)
+    export = (
+        db.query(Export)
+        .filter(
+            or_(
+                Export.status == Export.STATUS_PENDING,
+                and_(
+                    Export.status == Export.STATUS_RUNNING,
+                    Export.started_at < stale_before,
+                ),
+            )
+        )
+        .order_by(Export.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if export is None:
+        db.rollback()
+        return None
+    if export.status == Export.STATUS_RUNNING:
+        logger.warning(
+            "Reclaiming export %s running since %s", export.id, export.started_at
+        )
+    export.status = Export.STATUS_RUNNING
+    export.started_at = now
+    db.commit()
+    return export
+
+
+def render_export(db: Session, export: Export) -> Path:
+    """Écrit le fichier de l'export sur disque et le marque comme terminé."""
+
+    path = export_file_path(export)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = _partial_path(path)
+
+    declarations = iter_declarations(
+        db,
+        export.tenant_id,
+        export.periode_debut,
+        export.periode_fin,
+        export.client_id,
+        export.driver_id,
+    )
+    if export.format == Export.FORMAT_XLSX:
+        with open(partial_path, "wb") as fh:
+            for chunk in iter_declarations_xlsx(declarations):
+                fh.write(chunk)
+    else:
+        with open(partial_path, "w", encoding="utf-8", newline="") as fh:
+            for chunk in stream_declarations_csv(declarations):
+                fh.write(chunk)
+    os.replace(partial_path, path)
+
+    export.file_url = str(path.relative_to(export_storage_root()))
+    export.status = Export.STATUS_COMPLETED
+    export.completed_at = datetime.utcnow()
+    export.error = None
+    db.commit()
+    return path
+
+
+def _partial_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.part")
+
+
+def process_pending_exports(
+    session_factory: Callable[[], Session], limit: int | None = None
+) -> int:
+    """Traite les exports en attente et retourne le nombre de jobs exécutés."""
+
+    processed = 0
+    while limit is None or processed < limit:
+        with session_factory() as db:
+            export = claim_next_export(db)
+            if export is None:
+                break
+            try:
+                render_export(db, export)
+            except Exception as exc:
+                logger.exception("Export %s failed", export.id)
+                db.rollback()
+                _partial_path(export_file_path(export)).unlink(missing_ok=True)
+                export.status = Export.STATUS_FAILED
+                export.error = str(exc)[:500]
+                export.completed_at = datetime.utcnow()
+                db.commit()
+        processed += 1
+    return processed
@@ -0,0 +1,130 @@
+"""Suivi groupé de la dernière activité des chauffeurs."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.chauffeur import Chauffeur
+
+logger = logging.getLogger(__name__)
+
+_chauffeur = Chauffeur.__table__
+
+# Never move a timestamp backwards, e.g. when several workers flush.
+_UPDATE_LAST_SEEN = (
+    update(_chauffeur)
+    .where(_chauffeur.c.id == bindparam("driver_id"))
+    .where(
+        or_(
+            _chauffeur.c.last_seen_at.is_(None),
+            _chauffeur.c.last_seen_at < bindparam("seen_at"),
+        )
+    )
+    .values(last_seen_at=bindparam("seen_at"))
+)
+
+
+class LastSeenTracker:
+    """Coalesce driver heartbeats in memory and write them in bulk.
+
+    ``touch`` only records the latest time per driver, so a burst of requests
+    costs one row update. A background task calls ``flush`` every
+    ``flush_interval`` seconds and writes all pending heartbeats with a single
+    ``UPDATE`` executemany: ``Chauffeur.last_seen_at`` lags the real activity
+    by at most that interval. Heartbeats are grouped by the engine of the
+    request session and written back through it; a failed write keeps them
+    for the next flush. ``stop`` flushes whatever is still pending.
+    """
+
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: dict[object, dict[int, datetime]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(heartbeats) for heartbeats in self._pending.values())
+
+    def touch(
+        self, db: Session, driver_id: int, seen_at: Optional[datetime] = None
+    ) -> None:
+        self._merge(db.get_bind(), {driver_id: seen_at or datetime.utcnow()})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+
+    def flush(self) -> int:
+        """Write the pending heartbeats and return how many were sent."""
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        sent = 0
+        for bind, heartbeats in pending.items():
+            try:
+                with Session(bind=bind) as db:
+                    db.execute(
+                        _UPDATE_LAST_SEEN,
+                        [
+                            {"driver_id": driver_id, "seen_at": seen_at}
+                            for driver_id, seen_at in heartbeats.items()
+                        ],
+                    )
+                    db.commit()
+            except Exception:
+                self.failed += len(heartbeats)
+                logger.exception(
+                    "Unable to write %s driver heartbeats", len(heartbeats)
+                )
+                self._merge(bind, heartbeats)
+            else:
+                sent += len(heartbeats)
+        self.written += sent
+        return sent
+
+    def start(self) -> None:
+        """Start flushing periodically on the running event loop."""
+
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(), name="last-seen-flush")
+
+    async def stop(self) -> None:
+        """Stop the background task and write the remaining heartbeats."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def _merge(self, bind, heartbeats: dict[int, datetime]) -> None:
+        with self._lock:
+            pending = self._pending.setdefault(bind, {})
+            for driver_id, seen_at in heartbeats.items():
+                previous = pending.get(driver_id)
+                if previous is None or previous < seen_at:
+                    pending[driver_id] = seen_at
+
+
+last_seen_tracker = LastSeenTracker(settings.last_seen_flush_interval_seconds)
@@ -0,0 +1,94 @@
+"""Cache des vérifications d'appartenance d'un utilisateur à un tenant."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+_membership_cache: TTLCache[tuple[str, int], bool] = TTLCache(
+    maxsize=settings.membership_cache_max_entries,
+    ttl=settings.membership_cache_ttl_seconds,
+)
+
+
+def has_active_membership(db: Session, sub: str, tenant_id: int) -> bool:
+    """Return whether ``sub`` has an active user in ``tenant_id``.
+
+    Both verdicts are cached for ``settings.membership_cache_ttl_seconds``.
+    """
+
+    key = (sub, tenant_id)
+    verdict = _membership_cache.get(key)
+    if verdict is MISSING:
+        verdict = (
+            db.execute(
+                select(User.id).where(
+                    User.auth0_sub == sub,
+                    User.tenant_id == tenant_id,
+                    User.is_active.is_(True),
+                )
+            ).scalar_one_or_none()
+            is not None
+        )
+        _membership_cache.set(key, verdict)
+    return verdict
+
+
+def invalidate_membership(
+    sub: Optional[str] = None, tenant_id: Optional[int] = None
+) -> None:
+    """Forget cached verdicts matching ``sub`` and/or ``tenant_id``.
+
+    Without arguments every verdict is dropped.
+    """
+
+    if sub is not None and tenant_id is not None:
+        _membership_cache.pop((sub, tenant_id))
+    elif sub is None and tenant_id is None:
+        _membership_cache.clear()
+    else:
+        _membership_cache.discard_where(
+            lambda key: key[0] == sub if sub is not None else key[1] == tenant_id
+        )
+
+
+# Users are also created, deactivated or moved outside the code paths that
+# invalidate explicitly (back office, scripts); catch those on commit.
+_DIRTY_KEY = "membership_cache_dirty"
+_MEMBERSHIP_ATTRIBUTES = ("auth0_sub", "tenant_id", "is_active")
+
+
+def _membership_changed(instance: User) -> bool:
+    attrs = inspect(instance).attrs
+    return any(
+        getattr(attrs, name).history.has_changes() for name in _MEMBERSHIP_ATTRIBUTES
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context) -> None:
+    changed = session.info.setdefault(_DIRTY_KEY, set())
+    for instance in (*session.new, *session.deleted):
+        if isinstance(instance, User):
+            changed.add(instance.auth0_sub)
+    for instance in session.dirty:
+        if isinstance(instance, User) and _membership_changed(instance):
+            changed.update(
+                value
+                for value in inspect(instance).attrs.auth0_sub.history.sum()
+                if value
+            )
+    if not changed:
+        session.info.pop(_DIRTY_KEY)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_changes(session: Session) -> None:
+    for sub in session.info.pop(_DIRTY_KEY, ()):
+        invalidate_membership(sub=sub)
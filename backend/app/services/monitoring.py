@@ -2,40 +2,49 @@
 
 from __future__ import annotations
 
-import re
+import logging
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Iterable
+from typing import Iterable, Optional
 
-from sqlalchemy import func
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
 from app.models.audit import AuditLog
 from app.models.chauffeur import Chauffeur
 from app.models.user import User
 from app.schemas.monitoring import (
     ActivitySummary,
     ChauffeurSummary,
+    EndpointActivity,
     MonitoringEvent,
     MonitoringOverview,
 )
+from app.services.audit import normalize_path
+
+logger = logging.getLogger(__name__)
 
 
 class MonitoringService:
     """Construit des indicateurs de suivi sans exposer de données personnelles."""
 
-    _ID_SEGMENT_RE = re.compile(r"/[0-9]+(?=/|$)")
-    _HEX_SEGMENT_RE = re.compile(r"/[0-9a-fA-F-]{8,}(?=/|$)")
-
     def __init__(self, db: Session, tenant_id: int):
         self.db = db
         self.tenant_id = tenant_id
 
-    def get_overview(self, event_limit: int = 10) -> MonitoringOverview:
+    def get_overview(
+        self, event_limit: int = 10, endpoint_limit: int = 10
+    ) -> MonitoringOverview:
         """Retourne un résumé des activités administrateurs et chauffeurs."""
 
         admin_summary = self._build_admin_summary()
         chauffeur_summary = self._build_chauffeur_summary()
         recent_events = list(self._build_recent_events(limit=event_limit))
+        endpoints = self._build_endpoint_activity(limit=endpoint_limit)
 
         notice = (
             "Les indicateurs sont agrégés et ne comportent pas de données personnelles. "
@@ -46,86 +55,54 @@ class MonitoringService:
             admins=admin_summary,
             chauffeurs=chauffeur_summary,
             recent_events=recent_events,
+            endpoints=endpoints,
             gdpr_notice=notice,
         )
 
     def _build_admin_summary(self) -> ActivitySummary:
-        total = (
-            self.db.query(func.count(User.id))
-            .filter(User.tenant_id == self.tenant_id, User.role == "ADMIN")
-            .scalar()
-            or 0
-        )
-        active = (
-            self.db.query(func.count(User.id))
-            .filter(
-                User.tenant_id == self.tenant_id,
-                User.role == "ADMIN",
-                User.is_active.is_(True),
-            )
-            .scalar()
-            or 0
-        )
         last_activity = (
-            self.db.query(func.max(AuditLog.created_at))
+            select(func.max(AuditLog.created_at))
             .join(User, AuditLog.user_id == User.id)
-            .filter(
-                AuditLog.tenant_id == self.tenant_id,
-                User.role == "ADMIN",
-            )
-            .scalar()
+            .where(AuditLog.tenant_id == self.tenant_id, User.role == "ADMIN")
+            .correlate(None)
+            .scalar_subquery()
         )
+        total, active, last_activity_at = self.db.execute(
+            select(
+                func.count(User.id),
+                func.sum(case((User.is_active.is_(True), 1), else_=0)),
+                last_activity,
+            ).where(User.tenant_id == self.tenant_id, User.role == "ADMIN")
+        ).one()
+        active = active or 0
 
         return ActivitySummary(
             total=total,
             active=active,
             inactive=max(total - active, 0),
-            last_activity_at=last_activity,
+            last_activity_at=last_activity_at,
         )
 
     def _build_chauffeur_summary(self) -> ChauffeurSummary:
-        total = (
-            self.db.query(func.count(Chauffeur.id))
-            .filter(Chauffeur.tenant_id == self.tenant_id)
-            .scalar()
-            or 0
-        )
-        active = (
-            self.db.query(func.count(Chauffeur.id))
-            .filter(
-                Chauffeur.tenant_id == self.tenant_id,
-                Chauffeur.is_active.is_(True),
-            )
-            .scalar()
-            or 0
-        )
-        last_seen = (
-            self.db.query(func.max(Chauffeur.last_seen_at))
-            .filter(
-                Chauffeur.tenant_id == self.tenant_id,
-                Chauffeur.last_seen_at.isnot(None),
-            )
-            .scalar()
-        )
-
         recent_threshold = datetime.utcnow() - timedelta(hours=24)
-        active_last_24h = (
-            self.db.query(func.count(Chauffeur.id))
-            .filter(
-                Chauffeur.tenant_id == self.tenant_id,
-                Chauffeur.last_seen_at.isnot(None),
-                Chauffeur.last_seen_at >= recent_threshold,
-            )
-            .scalar()
-            or 0
-        )
+        total, active, last_seen, active_last_24h = self.db.execute(
+            select(
+                func.count(Chauffeur.id),
+                func.sum(case((Chauffeur.is_active.is_(True), 1), else_=0)),
+                func.max(Chauffeur.last_seen_at),
+                func.sum(
+                    case((Chauffeur.last_seen_at >= recent_threshold, 1), else_=0)
+                ),
+            ).where(Chauffeur.tenant_id == self.tenant_id)
+        ).one()
+        active = active or 0
 
         return ChauffeurSummary(
             total=total,
             active=active,
             inactive=max(total - active, 0),
             last_activity_at=last_seen,
-            active_last_24h=active_last_24h,
+            active_last_24h=active_last_24h or 0,
         )
 
     def _build_recent_events(self, limit: int) -> Iterable[MonitoringEvent]:
@@ -133,6 +110,7 @@ class MonitoringService:
             self.db.query(
                 AuditLog.created_at,
                 AuditLog.entity,
+                AuditLog.route,
                 AuditLog.action,
                 User.role,
             )
@@ -143,8 +121,8 @@ class MonitoringService:
             .all()
         )
 
-        for created_at, entity, action, role in rows:
-            sanitized_entity = self._sanitize_entity(entity)
+        for created_at, entity, route, action, role in rows:
+            sanitized_entity = route or self._sanitize_entity(entity)
             actor_role = role if role else "ANONYMOUS"
             yield MonitoringEvent(
                 timestamp=created_at,
@@ -154,10 +132,128 @@ class MonitoringService:
                 has_authenticated_actor=bool(role),
             )
 
+    def _build_endpoint_activity(self, limit: int) -> list[EndpointActivity]:
+        """Agrège les requêtes des dernières 24 h par route, côté base."""
+
+        since = datetime.utcnow() - timedelta(hours=24)
+        request_count = func.count(AuditLog.id)
+        rows = (
+            self.db.query(
+                AuditLog.route,
+                AuditLog.action,
+                request_count,
+                func.sum(case((AuditLog.status_code >= 500, 1), else_=0)),
+                func.avg(AuditLog.duration_ms),
+            )
+            .filter(
+                AuditLog.tenant_id == self.tenant_id,
+                AuditLog.route.isnot(None),
+                AuditLog.created_at >= since,
+            )
+            .group_by(AuditLog.route, AuditLog.action)
+            .order_by(request_count.desc(), AuditLog.route)
+            .limit(limit)
+            .all()
+        )
+
+        return [
+            EndpointActivity(
+                route=route,
+                action=action,
+                request_count=count,
+                error_count=errors or 0,
+                average_duration_ms=(
+                    round(float(duration), 2) if duration is not None else None
+                ),
+            )
+            for route, action, count, errors, duration in rows
+        ]
+
     def _sanitize_entity(self, entity: str | None) -> str:
-        if not entity:
-            return "/"
+        return normalize_path(entity)
+
+
+@dataclass(frozen=True)
+class _OverviewEntry:
+    overview: MonitoringOverview
+    fresh_until: float
+
+
+class OverviewCache:
+    """Per-tenant stale-while-revalidate cache of monitoring overviews.
 
-        sanitized = self._ID_SEGMENT_RE.sub("/:id", entity)
-        sanitized = self._HEX_SEGMENT_RE.sub("/:token", sanitized)
-        return sanitized
+    An overview is served as is for ``fresh_for`` seconds. For the following
+    ``stale_for`` seconds it is still served immediately while a background
+    thread rebuilds it, at most one per tenant. Past that window the next
+    request rebuilds it synchronously.
+    """
+
+    def __init__(self, fresh_for: float, stale_for: float, maxsize: int) -> None:
+        self.fresh_for = fresh_for
+        self._entries: TTLCache[int, _OverviewEntry] = TTLCache(
+            maxsize=maxsize, ttl=fresh_for + stale_for
+        )
+        self._lock = threading.Lock()
+        self._refreshes: dict[int, threading.Thread] = {}
+
+    def get(self, db: Session, tenant_id: int) -> MonitoringOverview:
+        entry = self._entries.get(tenant_id)
+        if entry is MISSING:
+            return self._load(db, tenant_id)
+        if entry.fresh_until <= time.monotonic():
+            self._refresh_in_background(db, tenant_id)
+        return entry.overview
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def wait_for_refreshes(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            threads = list(self._refreshes.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def _load(self, db: Session, tenant_id: int) -> MonitoringOverview:
+        fresh_until = time.monotonic() + self.fresh_for
+        overview = MonitoringService(db, tenant_id).get_overview()
+        self._entries.set(tenant_id, _OverviewEntry(overview, fresh_until))
+        return overview
+
+    def _refresh_in_background(self, db: Session, tenant_id: int) -> None:
+        # The request session is closed once the response is sent; the
+        # refresh opens its own on the same engine.
+        bind = db.get_bind()
+        with self._lock:
+            running = self._refreshes.get(tenant_id)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._refresh_quietly,
+                args=(bind, tenant_id),
+                name=f"monitoring-overview-{tenant_id}",
+                daemon=True,
+            )
+            self._refreshes[tenant_id] = thread
+            thread.start()
+
+    def _refresh_quietly(self, bind, tenant_id: int) -> None:
+        try:
+            with Session(bind=bind) as db:
+                self._load(db, tenant_id)
+        except Exception:
+            logger.warning(
+                "Unable to refresh the monitoring overview of tenant %s",
+                tenant_id,
+                exc_info=True,
+            )
+        finally:
+            with self._lock:
+                if self._refreshes.get(tenant_id) is threading.current_thread():
+                    del self._refreshes[tenant_id]
+
+
+monitoring_overviews = OverviewCache(
+    fresh_for=settings.monitoring_overview_fresh_seconds,
+    stale_for=settings.monitoring_overview_stale_seconds,
+    maxsize=settings.monitoring_overview_cache_max_entries,
+)
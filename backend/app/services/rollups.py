@@ -0,0 +1,140 @@
+"""Maintenance de la table d'agrégats journaliers des déclarations."""
+
+from __future__ import annotations
+
+import zlib
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.declaration_rollup import DeclarationDailyRollup
+from app.models.tour import Tour
+from app.models.tour_item import TourItem
+
+# A slice groups every rollup row of one driver for one client on one day,
+# which is exactly the set of rows a single tour can contribute to.
+RollupSlice = tuple[date, int, int]
+
+_ROLLUP_COLUMNS = (
+    DeclarationDailyRollup.created_at,
+    DeclarationDailyRollup.tenant_id,
+    DeclarationDailyRollup.date,
+    DeclarationDailyRollup.client_id,
+    DeclarationDailyRollup.driver_id,
+    DeclarationDailyRollup.tariff_group_id,
+    DeclarationDailyRollup.item_count,
+    DeclarationDailyRollup.pickup_quantity,
+    DeclarationDailyRollup.delivery_quantity,
+    DeclarationDailyRollup.amount_ex_vat,
+    DeclarationDailyRollup.margin_ex_vat,
+)
+
+
+def rollup_slice(tour: Tour) -> RollupSlice:
+    return (tour.date, tour.client_id, tour.driver_id)
+
+
+def slice_lock_key(rollup: RollupSlice) -> int:
+    """Return the advisory lock key of a slice within its tenant.
+
+    The key must be the same in every process, so it is a CRC32 of the slice
+    rather than ``hash()``, folded into PostgreSQL's signed ``int4`` range.
+    """
+
+    day, client_id, driver_id = rollup
+    key = zlib.crc32(f"{day.isoformat()}:{client_id}:{driver_id}".encode())
+    return key - (1 << 32) if key >= 1 << 31 else key
+
+
+def _aggregate_items():
+    return (
+        select(
+            func.current_timestamp(),
+            TourItem.tenant_id,
+            Tour.date,
+            Tour.client_id,
+            Tour.driver_id,
+            TourItem.tariff_group_id,
+            func.count(TourItem.id),
+            func.coalesce(func.sum(TourItem.pickup_quantity), 0),
+            func.coalesce(func.sum(TourItem.delivery_quantity), 0),
+            func.coalesce(func.sum(TourItem.amount_ex_vat_snapshot), 0),
+            func.coalesce(func.sum(TourItem.margin_ex_vat_snapshot), 0),
+        )
+        .join(Tour, TourItem.tour_id == Tour.id)
+        .group_by(
+            TourItem.tenant_id,
+            Tour.date,
+            Tour.client_id,
+            Tour.driver_id,
+            TourItem.tariff_group_id,
+        )
+    )
+
+
+def refresh_declaration_rollups(
+    db: Session, tenant_id: int, slices: Iterable[RollupSlice]
+) -> None:
+    """Recompute the rollup rows of the given slices from ``TourItem``.
+
+    Must run after the item changes have been flushed, inside the same
+    transaction, so the rollup commits or rolls back with them.
+
+    On PostgreSQL each slice is first locked with a transaction-level
+    advisory lock: two transactions rebuilding the same slice would
+    otherwise both delete its rows under READ COMMITTED, then both insert
+    and fail on ``uq_declaration_daily_rollup_key``. The second one waits
+    for the first to commit and then aggregates the items of both. Slices
+    are locked in sorted order so that concurrent refreshes cannot deadlock.
+    """
+
+    lock = db.get_bind().dialect.name == "postgresql"
+    for day, client_id, driver_id in sorted(set(slices)):
+        if lock:
+            db.execute(
+                select(
+                    func.pg_advisory_xact_lock(
+                        tenant_id, slice_lock_key((day, client_id, driver_id))
+                    )
+                )
+            )
+        db.execute(
+            delete(DeclarationDailyRollup).where(
+                DeclarationDailyRollup.tenant_id == tenant_id,
+                DeclarationDailyRollup.date == day,
+                DeclarationDailyRollup.client_id == client_id,
+                DeclarationDailyRollup.driver_id == driver_id,
+            )
+        )
+        db.execute(
+            insert(DeclarationDailyRollup).from_select(
+                _ROLLUP_COLUMNS,
+                _aggregate_items().where(
+                    TourItem.tenant_id == tenant_id,
+                    Tour.tenant_id == tenant_id,
+                    Tour.date == day,
+                    Tour.client_id == client_id,
+                    Tour.driver_id == driver_id,
+                ),
+            )
+        )
+
+
+def rebuild_declaration_rollups(db: Session, tenant_id: int | None = None) -> int:
+    """Recompute the whole rollup table, or one tenant's rows, from scratch."""
+
+    delete_stmt = delete(DeclarationDailyRollup)
+    aggregate = _aggregate_items()
+    if tenant_id is not None:
+        delete_stmt = delete_stmt.where(DeclarationDailyRollup.tenant_id == tenant_id)
+        aggregate = aggregate.where(
+            TourItem.tenant_id == tenant_id, Tour.tenant_id == tenant_id
+        )
+    db.execute(delete_stmt)
+    db.execute(insert(DeclarationDailyRollup).from_select(_ROLLUP_COLUMNS, aggregate))
+    count_query = select(func.count(DeclarationDailyRollup.id))
+    if tenant_id is not None:
+        count_query = count_query.where(DeclarationDailyRollup.tenant_id == tenant_id)
+    return db.execute(count_query).scalar_one()
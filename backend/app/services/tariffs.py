@@ -0,0 +1,150 @@
+"""Index en mémoire des versions de tarifs, par tenant."""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.tariff import Tariff
+from app.models.tariff_group import TariffGroup
+
+
+@dataclass(frozen=True)
+class TariffVersion:
+    id: int
+    tariff_group_id: int
+    price_ex_vat: Decimal
+    margin_ex_vat: Decimal
+    vat_rate: Decimal
+    effective_from: date
+    effective_to: Optional[date]
+
+    def covers(self, on: date) -> bool:
+        return self.effective_to is None or self.effective_to >= on
+
+
+class TariffIndex:
+    """Tariff versions of one tenant, sorted by ``effective_from`` per group."""
+
+    def __init__(self, versions: Iterable[TariffVersion]) -> None:
+        by_group: dict[int, list[TariffVersion]] = {}
+        for version in versions:
+            by_group.setdefault(version.tariff_group_id, []).append(version)
+        self._versions: dict[int, list[TariffVersion]] = {}
+        self._starts: dict[int, list[date]] = {}
+        for group_id, group_versions in by_group.items():
+            group_versions.sort(key=lambda v: (v.effective_from, v.id))
+            self._versions[group_id] = group_versions
+            self._starts[group_id] = [v.effective_from for v in group_versions]
+
+    def resolve(self, tariff_group_id: int, on: date) -> Optional[TariffVersion]:
+        """Return the latest version started on or before ``on`` still in force.
+
+        Same result as filtering on ``effective_from <= on`` and
+        ``effective_to`` null or ``>= on`` ordered by ``effective_from desc``.
+        """
+
+        starts = self._starts.get(tariff_group_id)
+        if not starts:
+            return None
+        versions = self._versions[tariff_group_id]
+        position = bisect_right(starts, on)
+        # Overlapping periods are rare, so this loop nearly always stops on the
+        # first candidate.
+        while position > 0:
+            position -= 1
+            if versions[position].covers(on):
+                return versions[position]
+        return None
+
+
+def load_tariff_index(db: Session, tenant_id: int) -> TariffIndex:
+    rows = db.execute(
+        select(
+            Tariff.id,
+            Tariff.tariff_group_id,
+            Tariff.price_ex_vat,
+            Tariff.margin_ex_vat,
+            Tariff.vat_rate,
+            Tariff.effective_from,
+            Tariff.effective_to,
+        ).where(Tariff.tenant_id == tenant_id)
+    ).all()
+    return TariffIndex(TariffVersion(*row) for row in rows)
+
+
+# Cache -----------------------------------------------------------------------
+
+_DIRTY_TENANTS_KEY = "tariff_index_dirty_tenants"
+
+_lock = threading.Lock()
+_indexes: dict[int, tuple[float, TariffIndex]] = {}
+# Bumped on every invalidation so that an index loaded concurrently with a
+# tariff change is not stored over the invalidation.
+_epoch = 0
+
+
+def get_tariff_index(db: Session, tenant_id: int) -> TariffIndex:
+    """Return the cached index of ``tenant_id``, loading it on a miss.
+
+    Entries expire after ``settings.tariff_index_ttl_seconds`` so that changes
+    committed by another process are eventually picked up; changes committed
+    through this process invalidate the entry immediately.
+    """
+
+    if tenant_id in db.info.get(_DIRTY_TENANTS_KEY, ()):
+        # Uncommitted tariff changes are visible to this session only.
+        return load_tariff_index(db, tenant_id)
+
+    now = time.monotonic()
+    with _lock:
+        cached = _indexes.get(tenant_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        epoch = _epoch
+
+    index = load_tariff_index(db, tenant_id)
+    with _lock:
+        if _epoch == epoch:
+            _indexes[tenant_id] = (now + settings.tariff_index_ttl_seconds, index)
+    return index
+
+
+def invalidate_tariff_index(tenant_id: Optional[int] = None) -> None:
+    """Drop the cached index of ``tenant_id``, or of every tenant."""
+
+    global _epoch
+    with _lock:
+        _epoch += 1
+        if tenant_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(tenant_id, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tariff_changes(session: Session, flush_context) -> None:
+    tenant_ids = {
+        instance.tenant_id
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, (Tariff, TariffGroup))
+    }
+    if tenant_ids:
+        session.info.setdefault(_DIRTY_TENANTS_KEY, set()).update(tenant_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_changes(session: Session) -> None:
+    # Rolled back changes stay in the set until the next commit; invalidating
+    # a little too often is harmless.
+    for tenant_id in session.info.pop(_DIRTY_TENANTS_KEY, ()):
+        invalidate_tariff_index(tenant_id)
@@ -0,0 +1,82 @@
+"""Résolution mise en cache des tenants (slug → id, id → existence)."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.models.tenant import Tenant
+
+# Misses are cached too: numeric tenant headers never match a slug, and an
+# unknown id keeps failing until a tenant is created, which clears the caches.
+_slug_cache: TTLCache[str, Optional[int]] = TTLCache(
+    maxsize=settings.tenant_cache_max_entries, ttl=settings.tenant_cache_ttl_seconds
+)
+_exists_cache: TTLCache[int, bool] = TTLCache(
+    maxsize=settings.tenant_cache_max_entries, ttl=settings.tenant_cache_ttl_seconds
+)
+
+
+def resolve_tenant_slug(db: Session, slug: str) -> Optional[int]:
+    """Return the id of the tenant whose slug matches ``slug`` case-insensitively."""
+
+    slug = slug.lower()
+    tenant_id = _slug_cache.get(slug)
+    if tenant_id is MISSING:
+        tenant_id = db.execute(
+            select(Tenant.id).where(func.lower(Tenant.slug) == slug)
+        ).scalar_one_or_none()
+        _slug_cache.set(slug, tenant_id)
+        if tenant_id is not None:
+            _exists_cache.set(tenant_id, True)
+    return tenant_id
+
+
+def tenant_exists(db: Session, tenant_id: int) -> bool:
+    exists = _exists_cache.get(tenant_id)
+    if exists is MISSING:
+        exists = (
+            db.execute(
+                select(Tenant.id).where(Tenant.id == tenant_id)
+            ).scalar_one_or_none()
+            is not None
+        )
+        _exists_cache.set(tenant_id, exists)
+    return exists
+
+
+def invalidate_tenant_cache() -> None:
+    """Forget every cached slug and existence check.
+
+    Tenants are created, renamed and deleted rarely, so dropping everything is
+    simpler than tracking which slugs pointed to the changed rows.
+    """
+
+    _slug_cache.clear()
+    _exists_cache.clear()
+
+
+_DIRTY_KEY = "tenant_cache_dirty"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tenant_changes(session: Session, flush_context) -> None:
+    # Billing updates touch tenants often; only a slug change matters here.
+    if any(
+        isinstance(instance, Tenant) for instance in (*session.new, *session.deleted)
+    ) or any(
+        isinstance(instance, Tenant)
+        and inspect(instance).attrs.slug.history.has_changes()
+        for instance in session.dirty
+    ):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_changes(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        invalidate_tenant_cache()
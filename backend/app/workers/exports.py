@@ -0,0 +1,41 @@
+"""Process queued exports outside of the API workers.
+
+Run with ``python -m app.workers.exports``. The worker polls the ``export``
+table for pending jobs, renders them into ``EXPORT_STORAGE_DIR`` and sleeps
+for ``EXPORT_WORKER_POLL_INTERVAL_SECONDS`` when the queue is empty. A job
+left ``RUNNING`` for more than ``EXPORT_JOB_TIMEOUT_SECONDS`` (e.g. after a
+crash) is picked up again.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.exports import process_pending_exports
+
+logger = logging.getLogger(__name__)
+
+
+def run_forever() -> None:
+    logger.info("Export worker started")
+    while True:
+        processed = process_pending_exports(SessionLocal)
+        if processed:
+            logger.info("Processed %s export(s)", processed)
+        else:
+            time.sleep(settings.export_worker_poll_interval_seconds)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    try:
+        run_forever()
+    except KeyboardInterrupt:
+        logger.info("Export worker stopped")
+
+
+if __name__ == "__main__":
+    main()
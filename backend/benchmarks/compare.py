@@ -0,0 +1,84 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json benchmarks/results/latest.json
+
+Exits with status 1 when the p95 latency of an endpoint grows by more than
+``--threshold`` (20 % by default) or when it runs more SQL statements.
+
+When the results have several rounds, the p95 compared is the one of the
+fastest round. Other load on the machine only ever adds latency, and often
+to whole rounds at once, while a slower endpoint is slower in every round.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _p95(result: dict) -> float:
+    latency = result["latency_ms"]
+    rounds = latency.get("p95_rounds")
+    return min(rounds) if rounds else latency["p95"]
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(
+        f"{'endpoint':<24} {'p95 before':>11} {'p95 after':>10} {'change':>8} "
+        f"{'queries':>9}"
+    )
+    for name, after in sorted(current["results"].items()):
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<24} {'-':>11} {_p95(after):>10.1f}")
+            continue
+        p95_before = _p95(before)
+        p95_after = _p95(after)
+        change = (p95_after - p95_before) / p95_before if p95_before else 0.0
+        queries = f"{before['queries_per_request']:g}->{after['queries_per_request']:g}"
+        print(
+            f"{name:<24} {p95_before:>11.1f} {p95_after:>10.1f} {change:>+8.0%} "
+            f"{queries:>9}"
+        )
+        if change > threshold:
+            regressions.append(f"{name}: p95 {p95_before:.1f} -> {p95_after:.1f} ms")
+        if after["queries_per_request"] > before["queries_per_request"]:
+            regressions.append(f"{name}: {queries} SQL statements per request")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Tolerated relative p95 increase (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    for key in ("volume", "dialect"):
+        if baseline["meta"][key] != current["meta"][key]:
+            print(
+                f"warning: {key} differs "
+                f"({baseline['meta'][key]} vs {current['meta'][key]})",
+                file=sys.stderr,
+            )
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
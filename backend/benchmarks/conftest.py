@@ -0,0 +1,176 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Make the app package importable when run outside the Docker environment.
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+import pytest
+import sqlalchemy
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import get_db
+from app.main import app
+from app.middleware.audit import audit_writer
+from app.models.base import Base
+from benchmarks.dataset import VOLUMES, seed_dataset
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results" / "latest.json"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--bench-volume",
+        choices=sorted(VOLUMES),
+        default="small",
+        help="Dataset size seeded before the benchmarks",
+    )
+    group.addoption("--bench-seed", type=int, default=42, help="Dataset seed")
+    group.addoption(
+        "--bench-iterations",
+        type=int,
+        default=100,
+        help="Measured requests per endpoint and round",
+    )
+    group.addoption(
+        "--bench-rounds",
+        type=int,
+        default=5,
+        help="Measured rounds per endpoint; compare uses the best round's p95",
+    )
+    group.addoption(
+        "--bench-warmup",
+        type=int,
+        default=3,
+        help="Unmeasured requests per endpoint and round",
+    )
+    group.addoption(
+        "--bench-database-url",
+        default=os.environ.get("BENCH_DATABASE_URL"),
+        help="Empty database to benchmark against (default: temporary SQLite file)",
+    )
+    group.addoption(
+        "--bench-output",
+        default=str(DEFAULT_OUTPUT),
+        help="JSON file receiving the results",
+    )
+
+
+@pytest.fixture(scope="session")
+def bench_options(request):
+    return request.config.option
+
+
+@pytest.fixture(scope="session")
+def bench_engine(bench_options):
+    url = bench_options.bench_database_url
+    tmpdir = None
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory(prefix="delivops-bench-")
+        url = f"sqlite:///{tmpdir.name}/bench.db"
+    kwargs = {"future": True}
+    if make_url(url).drivername.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    engine = create_engine(url, **kwargs)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+@pytest.fixture(scope="session")
+def dataset(bench_engine, bench_options):
+    return seed_dataset(
+        bench_engine,
+        VOLUMES[bench_options.bench_volume],
+        seed=bench_options.bench_seed,
+    )
+
+
+@pytest.fixture(scope="session")
+def bench_client(bench_engine, dataset):
+    session_factory = sessionmaker(
+        bind=bench_engine, autocommit=False, autoflush=False, future=True
+    )
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous_override = app.dependency_overrides.get(get_db)
+    previous_fake_auth = settings.dev_fake_auth
+    previous_audit_factory = audit_writer.session_factory
+    app.dependency_overrides[get_db] = override_get_db
+    settings.dev_fake_auth = True
+    # Entering the client runs the lifespan, so the audit writer and the
+    # last-seen flusher work in the background as they do in production.
+    audit_writer.session_factory = session_factory
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        audit_writer.session_factory = previous_audit_factory
+        settings.dev_fake_auth = previous_fake_auth
+        if previous_override is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous_override
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@pytest.fixture(scope="session")
+def bench_results(bench_options, bench_engine, dataset):
+    results: dict[str, dict] = {}
+    yield results
+    if not results:
+        return
+    output = Path(bench_options.bench_output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "meta": {
+            "revision": _git_revision(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "dialect": bench_engine.dialect.name,
+            "volume": bench_options.bench_volume,
+            "seed": bench_options.bench_seed,
+            "iterations": bench_options.bench_iterations,
+            "rounds": bench_options.bench_rounds,
+            "warmup": bench_options.bench_warmup,
+            "rows": dataset.counts,
+        },
+        "results": dict(sorted(results.items())),
+    }
+    output.write_text(json.dumps(payload, indent=2) + "\n")
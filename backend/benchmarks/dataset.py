@@ -0,0 +1,602 @@
+"""Deterministic synthetic datasets for benchmarks and load testing.
+
+Rows are generated from a seeded :class:`random.Random`, so the same volume and
+seed always produce the same data. Identifiers are assigned here, starting
+after the highest existing id of each table, so related rows are generated
+without reading anything back and the dataset can be added to a database that
+already holds other tenants.
+
+Reference data (tenants, users, drivers, clients, categories, tariffs) goes
+through Core ``executemany`` so column defaults apply. Tours, tour items and
+audit rows are streamed tenant by tenant in bounded batches: ``COPY`` with
+psycopg on PostgreSQL, raw ``executemany`` elsewhere.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterable, Sequence
+
+from sqlalchemy import Date, DateTime, Numeric, Table, func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.audit import AuditLog
+from app.models.chauffeur import Chauffeur
+from app.models.client import Client
+from app.models.tariff import Tariff
+from app.models.tariff_group import TariffGroup
+from app.models.tenant import Tenant
+from app.models.tour import Tour
+from app.models.tour_item import TourItem
+from app.models.user import User
+from app.services.rollups import rebuild_declaration_rollups
+
+ADMIN_SUB = "bench|admin-{tenant_id}"
+DRIVER_SUB = "bench|driver-{driver_id}"
+
+STREAM_BATCH_SIZE = 50_000
+CENT = Decimal("0.01")
+
+# Share of the usual activity by weekday (Monday first) and by month.
+WEEKDAY_ACTIVITY = (1.0, 1.0, 1.0, 1.0, 1.0, 0.45, 0.08)
+MONTH_ACTIVITY = (0.9, 0.9, 1.0, 1.0, 1.0, 1.0, 0.9, 0.7, 1.0, 1.05, 1.15, 1.25)
+
+TOUR_COLUMNS = (
+    "id",
+    "created_at",
+    "tenant_id",
+    "driver_id",
+    "client_id",
+    "date",
+    "status",
+)
+ITEM_COLUMNS = (
+    "id",
+    "created_at",
+    "tenant_id",
+    "tour_id",
+    "tariff_group_id",
+    "pickup_quantity",
+    "delivery_quantity",
+    "unit_price_ex_vat_snapshot",
+    "amount_ex_vat_snapshot",
+    "unit_margin_ex_vat_snapshot",
+    "margin_ex_vat_snapshot",
+)
+AUDIT_COLUMNS = (
+    "id",
+    "created_at",
+    "tenant_id",
+    "user_id",
+    "entity",
+    "entity_id",
+    "action",
+    "route",
+    "status_code",
+    "duration_ms",
+)
+
+
+@dataclass(frozen=True)
+class Volume:
+    tenants: int
+    drivers_per_tenant: int
+    clients_per_tenant: int
+    groups_per_client: int
+    days: int
+    # Probability that a driver works on a plain weekday, before the weekday
+    # and month factors; the trailing ``open_days`` keep their tours open.
+    activity_rate: float = 0.8
+    open_days: int = 2
+    audit_rows_per_tenant: int = 1000
+
+
+VOLUMES = {
+    "small": Volume(
+        tenants=1,
+        drivers_per_tenant=10,
+        clients_per_tenant=5,
+        groups_per_client=3,
+        days=30,
+    ),
+    "medium": Volume(
+        tenants=2,
+        drivers_per_tenant=50,
+        clients_per_tenant=20,
+        groups_per_client=4,
+        days=90,
+    ),
+    "large": Volume(
+        tenants=3,
+        drivers_per_tenant=200,
+        clients_per_tenant=50,
+        groups_per_client=5,
+        days=365,
+        audit_rows_per_tenant=20000,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class DatasetSummary:
+    tenant_ids: list[int]
+    driver_subs: dict[int, str]
+    start: date
+    end: date
+    counts: dict[str, int]
+
+
+@dataclass(frozen=True)
+class _Category:
+    id: int
+    # Tariff versions as (effective_from, unit price, unit margin), oldest first.
+    versions: tuple[tuple[date, Decimal, Decimal], ...]
+    # Typical pickup quantity of a tour for this category.
+    scale: float
+
+    def snapshot(self, day: date) -> tuple[Decimal, Decimal]:
+        price, margin = self.versions[0][1:]
+        for effective_from, version_price, version_margin in self.versions:
+            if effective_from > day:
+                break
+            price, margin = version_price, version_margin
+        return price, margin
+
+
+class _Ids:
+    def __init__(self, start: dict[str, int]) -> None:
+        self._next = {table: value + 1 for table, value in start.items()}
+
+    def next(self, table: str) -> int:
+        value = self._next[table]
+        self._next[table] = value + 1
+        return value
+
+
+def _max_ids(conn: Connection, tables: Iterable[Table]) -> dict[str, int]:
+    return {
+        table.name: conn.execute(
+            select(func.coalesce(func.max(table.c.id), 0))
+        ).scalar_one()
+        for table in tables
+    }
+
+
+class BulkLoader:
+    """Append rows given as tuples to a table, as fast as the driver allows."""
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+        self.use_copy = conn.dialect.driver == "psycopg"
+        self.counts: dict[str, int] = {}
+
+    def load(self, table: Table, columns: Sequence[str], rows: list[tuple]) -> None:
+        if not rows:
+            return
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        if self.use_copy:
+            self._copy(table, quoted, rows)
+        elif self.conn.dialect.name == "sqlite":
+            placeholders = ", ".join("?" for _ in columns)
+            self.conn.exec_driver_sql(
+                f'INSERT INTO "{table.name}" ({quoted}) VALUES ({placeholders})',
+                _sqlite_rows(table, columns, rows),
+            )
+        else:
+            self.conn.execute(
+                insert(table),
+                [dict(zip(columns, row, strict=True)) for row in rows],
+            )
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _copy(self, table: Table, quoted: str, rows: list[tuple]) -> None:
+        # Same driver connection, hence same transaction, as ``self.conn``.
+        with self.conn.connection.driver_connection.cursor() as cursor:
+            with cursor.copy(f'COPY "{table.name}" ({quoted}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+
+def _sqlite_rows(
+    table: Table, columns: Sequence[str], rows: list[tuple]
+) -> list[tuple]:
+    """Convert values the way the SQLAlchemy types would, without their per-row cost."""
+
+    conversions = []
+    for index, name in enumerate(columns):
+        column_type = table.c[name].type
+        if isinstance(column_type, Numeric):
+            conversions.append((index, str))
+        elif isinstance(column_type, DateTime):
+            conversions.append((index, lambda value: value.isoformat(" ")))
+        elif isinstance(column_type, Date):
+            conversions.append((index, date.isoformat))
+    converted = []
+    for row in rows:
+        values = list(row)
+        for index, convert in conversions:
+            if values[index] is not None:
+                values[index] = convert(values[index])
+        converted.append(tuple(values))
+    return converted
+
+
+def _reset_sequences(conn: Connection, tables: Iterable[Table]) -> None:
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM \"{table.name}\"), 1))"
+            )
+        )
+
+
+_TABLES = (
+    Tenant.__table__,
+    User.__table__,
+    Chauffeur.__table__,
+    Client.__table__,
+    TariffGroup.__table__,
+    Tariff.__table__,
+    Tour.__table__,
+    TourItem.__table__,
+    AuditLog.__table__,
+)
+
+
+def seed_dataset(
+    engine: Engine,
+    volume: Volume,
+    seed: int = 42,
+    today: date | None = None,
+    slug_prefix: str = "synthetic",
+    rollups: bool = True,
+    progress: Callable[[str], None] | None = None,
+) -> DatasetSummary:
+    """Generate ``volume`` worth of data ending ``today`` and load it.
+
+    Each tenant's activity is committed in its own transaction. ``rollups``
+    rebuilds the declaration rollup rows of the generated tenants afterwards.
+    """
+
+    rng = random.Random(seed)
+    end = today or date.today()
+    start = end - timedelta(days=volume.days - 1)
+    now = datetime.utcnow()
+    report = progress or (lambda message: None)
+
+    with engine.connect() as conn:
+        ids = _Ids(_max_ids(conn, _TABLES))
+
+    tenants, reference_rows, categories, drivers_by_tenant, clients_by_tenant = (
+        _reference_data(rng, ids, volume, start, end, now, slug_prefix)
+    )
+    counts: dict[str, int] = {}
+    with engine.begin() as conn:
+        for table, rows in reference_rows:
+            if rows:
+                conn.execute(insert(table), rows)
+            counts[table.name] = len(rows)
+    report(
+        f"{len(tenants)} tenants, {counts['chauffeur']} drivers, "
+        f"{counts['client']} clients, {counts['tariffgroup']} categories"
+    )
+
+    for tenant_id in tenants:
+        with engine.begin() as conn:
+            loader = BulkLoader(conn)
+            _load_activity(
+                loader,
+                rng,
+                ids,
+                volume,
+                tenant_id,
+                drivers_by_tenant[tenant_id],
+                clients_by_tenant[tenant_id],
+                categories,
+                start,
+                end,
+                now,
+            )
+            _reset_sequences(conn, _TABLES)
+        for name, count in loader.counts.items():
+            counts[name] = counts.get(name, 0) + count
+        report(
+            f"tenant {tenant_id}: {loader.counts.get('tour', 0)} tours, "
+            f"{loader.counts.get('touritem', 0)} items"
+        )
+
+    if rollups:
+        counts["declaration_daily_rollup"] = 0
+        with Session(bind=engine) as db:
+            for tenant_id in tenants:
+                counts["declaration_daily_rollup"] += rebuild_declaration_rollups(
+                    db, tenant_id
+                )
+                db.commit()
+        report(f"{counts['declaration_daily_rollup']} rollup rows rebuilt")
+
+    return DatasetSummary(
+        tenant_ids=tenants,
+        driver_subs={
+            driver_id: DRIVER_SUB.format(driver_id=driver_id)
+            for driver_ids in drivers_by_tenant.values()
+            for driver_id in driver_ids
+        },
+        start=start,
+        end=end,
+        counts=counts,
+    )
+
+
+def _reference_data(rng, ids, volume, start, end, now, slug_prefix):
+    tenants: list[int] = []
+    tenant_rows: list[dict] = []
+    users: list[dict] = []
+    drivers: list[dict] = []
+    clients: list[dict] = []
+    groups: list[dict] = []
+    tariffs: list[dict] = []
+    categories: dict[int, list[_Category]] = {}
+    drivers_by_tenant: dict[int, list[int]] = {}
+    clients_by_tenant: dict[int, list[int]] = {}
+
+    for _ in range(volume.tenants):
+        tenant_id = ids.next("tenant")
+        tenants.append(tenant_id)
+        tenant_rows.append(
+            {
+                "id": tenant_id,
+                "name": f"{slug_prefix.title()} {tenant_id}",
+                "slug": f"{slug_prefix}-{tenant_id}",
+                "max_chauffeurs": volume.drivers_per_tenant,
+            }
+        )
+        users.append(
+            {
+                "id": ids.next("user"),
+                "tenant_id": tenant_id,
+                "auth0_sub": ADMIN_SUB.format(tenant_id=tenant_id),
+                "email": f"admin-{tenant_id}@bench.example",
+                "role": "ADMIN",
+                "is_active": True,
+            }
+        )
+        for _ in range(volume.drivers_per_tenant):
+            user_id = ids.next("user")
+            driver_id = ids.next("chauffeur")
+            users.append(
+                {
+                    "id": user_id,
+                    "tenant_id": tenant_id,
+                    "auth0_sub": DRIVER_SUB.format(driver_id=driver_id),
+                    "email": f"driver-{driver_id}@bench.example",
+                    "role": "CHAUFFEUR",
+                    "is_active": True,
+                }
+            )
+            drivers.append(
+                {
+                    "id": driver_id,
+                    "tenant_id": tenant_id,
+                    "user_id": user_id,
+                    "email": f"chauffeur-{driver_id}@bench.example",
+                    "display_name": f"Chauffeur {driver_id}",
+                    "is_active": rng.random() > 0.1,
+                    "last_seen_at": now - timedelta(minutes=rng.randint(0, 72 * 60)),
+                }
+            )
+            drivers_by_tenant.setdefault(tenant_id, []).append(driver_id)
+        for _ in range(volume.clients_per_tenant):
+            client_id = ids.next("client")
+            clients.append(
+                {
+                    "id": client_id,
+                    "tenant_id": tenant_id,
+                    "name": f"Client {client_id}",
+                    "is_active": True,
+                }
+            )
+            clients_by_tenant.setdefault(tenant_id, []).append(client_id)
+            for order in range(volume.groups_per_client):
+                group_id = ids.next("tariffgroup")
+                groups.append(
+                    {
+                        "id": group_id,
+                        "tenant_id": tenant_id,
+                        "client_id": client_id,
+                        "code": f"cat-{order}",
+                        "display_name": f"Catégorie {order}",
+                        "unit": "colis",
+                        "order": order,
+                        "is_active": True,
+                    }
+                )
+                versions = _tariff_versions(rng, start, end)
+                for index, (effective_from, price, margin) in enumerate(versions):
+                    effective_to = (
+                        versions[index + 1][0] - timedelta(days=1)
+                        if index + 1 < len(versions)
+                        else None
+                    )
+                    tariffs.append(
+                        {
+                            "id": ids.next("tariff"),
+                            "tenant_id": tenant_id,
+                            "tariff_group_id": group_id,
+                            "price_ex_vat": price,
+                            "margin_ex_vat": margin,
+                            "vat_rate": Decimal("0.20"),
+                            "effective_from": effective_from,
+                            "effective_to": effective_to,
+                        }
+                    )
+                categories.setdefault(client_id, []).append(
+                    _Category(
+                        id=group_id,
+                        versions=tuple(versions),
+                        # The first categories of a client carry most volume.
+                        scale=rng.uniform(20, 60) / (order + 1),
+                    )
+                )
+
+    reference_rows = (
+        (Tenant.__table__, tenant_rows),
+        (User.__table__, users),
+        (Chauffeur.__table__, drivers),
+        (Client.__table__, clients),
+        (TariffGroup.__table__, groups),
+        (Tariff.__table__, tariffs),
+    )
+    return tenants, reference_rows, categories, drivers_by_tenant, clients_by_tenant
+
+
+def _tariff_versions(rng: random.Random, start: date, end: date):
+    """One version per calendar year, the price rising a few percent each time."""
+
+    price = Decimal(rng.randint(150, 450)) / 100
+    versions = [(date(start.year - 1, 1, 1), price, _margin(price))]
+    for year in range(start.year, end.year + 1):
+        price = (price * Decimal(str(1 + rng.uniform(0.01, 0.05)))).quantize(CENT)
+        versions.append((date(year, 1, 1), price, _margin(price)))
+    return versions
+
+
+def _margin(price: Decimal) -> Decimal:
+    return (price * Decimal("0.25")).quantize(CENT)
+
+
+def _load_activity(
+    loader: BulkLoader,
+    rng: random.Random,
+    ids: _Ids,
+    volume: Volume,
+    tenant_id: int,
+    driver_ids: list[int],
+    client_ids: list[int],
+    categories: dict[int, list[_Category]],
+    start: date,
+    end: date,
+    now: datetime,
+) -> None:
+    tours: list[tuple] = []
+    items: list[tuple] = []
+    open_from = end - timedelta(days=volume.open_days - 1)
+    # A few clients get most of the work (Zipf-like weights).
+    client_weights = [1 / (rank + 1) for rank in range(len(client_ids))]
+    days = [start + timedelta(days=offset) for offset in range(volume.days)]
+    day_rates = [
+        volume.activity_rate
+        * WEEKDAY_ACTIVITY[day.weekday()]
+        * min(1.0, MONTH_ACTIVITY[day.month - 1])
+        for day in days
+    ]
+    day_volumes = [MONTH_ACTIVITY[day.month - 1] for day in days]
+
+    def flush() -> None:
+        loader.load(Tour.__table__, TOUR_COLUMNS, tours)
+        loader.load(TourItem.__table__, ITEM_COLUMNS, items)
+        tours.clear()
+        items.clear()
+
+    for driver_id in driver_ids:
+        usual = _weighted_sample(
+            rng, client_ids, client_weights, k=min(len(client_ids), rng.randint(1, 4))
+        )
+        diligence = rng.uniform(0.7, 1.1)
+        for day, rate, seasonal in zip(days, day_rates, day_volumes, strict=True):
+            if rng.random() >= rate * diligence:
+                continue
+            client_id = rng.choice(usual)
+            tour_id = ids.next("tour")
+            created_at = datetime.combine(day, datetime.min.time()) + timedelta(
+                hours=rng.uniform(6, 10)
+            )
+            status = (
+                Tour.STATUS_IN_PROGRESS if day >= open_from else Tour.STATUS_COMPLETED
+            )
+            tours.append(
+                (tour_id, created_at, tenant_id, driver_id, client_id, day, status)
+            )
+            client_categories = categories[client_id]
+            count = 1 + int(rng.triangular(0, len(client_categories), 0))
+            for category in rng.sample(
+                client_categories, k=min(count, len(client_categories))
+            ):
+                typical = category.scale * seasonal
+                pickup = max(1, int(rng.lognormvariate(0, 0.45) * typical))
+                returns = min(pickup, int(rng.expovariate(0.5)))
+                delivery = 0 if status == Tour.STATUS_IN_PROGRESS else pickup - returns
+                price, margin = category.snapshot(day)
+                items.append(
+                    (
+                        ids.next("touritem"),
+                        created_at,
+                        tenant_id,
+                        tour_id,
+                        category.id,
+                        pickup,
+                        delivery,
+                        price,
+                        price * delivery,
+                        margin,
+                        margin * delivery,
+                    )
+                )
+            if len(items) >= STREAM_BATCH_SIZE:
+                flush()
+    flush()
+
+    audits: list[tuple] = []
+    for _ in range(volume.audit_rows_per_tenant):
+        route, action = rng.choice(_AUDIT_ROUTES)
+        audits.append(
+            (
+                ids.next("auditlog"),
+                now - timedelta(seconds=rng.randint(0, 7 * 86400)),
+                tenant_id,
+                None,
+                route.replace(":id", str(rng.randint(1, 10_000))),
+                0,
+                action,
+                route,
+                500 if rng.random() < 0.01 else 200,
+                round(rng.lognormvariate(3, 0.6), 2),
+            )
+        )
+        if len(audits) >= STREAM_BATCH_SIZE:
+            loader.load(AuditLog.__table__, AUDIT_COLUMNS, audits)
+            audits.clear()
+    loader.load(AuditLog.__table__, AUDIT_COLUMNS, audits)
+
+
+def _weighted_sample(
+    rng: random.Random, values: list[int], weights: list[float], k: int
+) -> list[int]:
+    chosen: list[int] = []
+    candidates = list(zip(values, weights, strict=True))
+    for _ in range(k):
+        total = sum(weight for _, weight in candidates)
+        pick = rng.uniform(0, total)
+        for index, (value, weight) in enumerate(candidates):
+            pick -= weight
+            if pick <= 0 or index == len(candidates) - 1:
+                chosen.append(value)
+                del candidates[index]
+                break
+    return chosen
+
+
+_AUDIT_ROUTES = (
+    ("/clients", "get"),
+    ("/tours/pending", "get"),
+    ("/tours/:id/delivery", "put"),
+    ("/reports/declarations", "get"),
+    ("/chauffeurs", "post"),
+)
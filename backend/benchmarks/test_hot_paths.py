@@ -0,0 +1,196 @@
+"""Latency and throughput of the hot API paths.
+
+Every case is measured in ``--bench-rounds`` rounds of ``--bench-iterations``
+sequential requests, each round preceded by ``--bench-warmup`` unmeasured
+ones. Rounds are interleaved (round 1 of every case, then round 2, ...) so
+that a slow period of the machine spreads over all cases instead of
+swallowing every round of one of them. The results hold latency
+percentiles over all rounds, the p95 of each round (``benchmarks.compare``
+uses the best one), throughput, response size and the number of SQL
+statements per request.
+
+The audit writer and the last-seen flusher are stopped during each round and
+restarted afterwards: their periodic commits would otherwise land in the
+middle of the measured requests. Their queues keep filling and are written
+when they restart.
+
+Statements are counted on the engine rather than read from
+``Server-Timing``, which misses those run while a body is streamed. Only the
+statements run inside a request (while :mod:`app.db.query_stats` tracks it)
+are counted, and the reported figure is the median per request, so neither
+a background write nor the occasional refill of an expired cache changes it.
+"""
+
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.db.query_stats import current_query_stats
+from app.middleware.audit import audit_writer
+from app.services.last_seen import last_seen_tracker
+from benchmarks.dataset import ADMIN_SUB
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile."""
+
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@contextmanager
+def _background_writers_paused(client):
+    """Stop the lifespan's background writers, restart them on exit."""
+
+    client.portal.call(audit_writer.stop)
+    client.portal.call(last_seen_tracker.stop)
+    try:
+        yield
+    finally:
+        client.portal.call(audit_writer.start)
+        client.portal.call(last_seen_tracker.start)
+
+
+def _admin_headers(dataset):
+    tenant_id = dataset.tenant_ids[0]
+    return {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": ADMIN_SUB.format(tenant_id=tenant_id),
+    }
+
+
+def _driver_headers(dataset):
+    tenant_id = dataset.tenant_ids[0]
+    return {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "CHAUFFEUR",
+        "X-Dev-Sub": next(iter(dataset.driver_subs.values())),
+    }
+
+
+def _supervisor_headers(dataset):
+    return {
+        "X-Tenant-Id": str(dataset.tenant_ids[0]),
+        "X-Dev-Role": "GLOBAL_SUPERVISION",
+    }
+
+
+def _last_month(dataset):
+    return {
+        "date_from": (dataset.end - timedelta(days=29)).isoformat(),
+        "date_to": dataset.end.isoformat(),
+    }
+
+
+CASES = {
+    "clients": ("/clients/", _admin_headers, lambda dataset: {}),
+    "tours_pending": ("/tours/pending", _driver_headers, lambda dataset: {}),
+    "tours_activity_summary": (
+        "/tours/activity-summary",
+        _admin_headers,
+        lambda dataset: {
+            "startDate": (dataset.end - timedelta(days=6)).isoformat(),
+            "endDate": dataset.end.isoformat(),
+        },
+    ),
+    "reports_declarations": ("/reports/declarations", _admin_headers, _last_month),
+    "export_csv": ("/reports/declarations/export.csv", _admin_headers, _last_month),
+    "export_xlsx": ("/reports/declarations/export.xlsx", _admin_headers, _last_month),
+    "monitoring_overview": (
+        "/monitoring/overview",
+        _supervisor_headers,
+        lambda dataset: {},
+    ),
+}
+
+
+@dataclass
+class _Samples:
+    latencies: list[float] = field(default_factory=list)
+    round_p95: list[float] = field(default_factory=list)
+    statements: list[int] = field(default_factory=list)
+    elapsed: float = 0.0
+    size: int = 0
+
+
+def pytest_generate_tests(metafunc):
+    if "case" in metafunc.fixturenames:
+        rounds = metafunc.config.option.bench_rounds
+        metafunc.parametrize(
+            "case",
+            [(index, name) for index in range(rounds) for name in CASES],
+            ids=[f"{name}-{index + 1}" for index in range(rounds) for name in CASES],
+        )
+
+
+@pytest.fixture(scope="module")
+def samples():
+    return {name: _Samples() for name in CASES}
+
+
+def _summary(path: str, collected: _Samples) -> dict:
+    latencies = sorted(collected.latencies)
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "rounds": len(collected.round_p95),
+        "throughput_rps": round(len(latencies) / collected.elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p90": round(_percentile(latencies, 90) * 1000, 3),
+            "p95": round(_percentile(latencies, 95) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+            "p95_rounds": [round(value * 1000, 3) for value in collected.round_p95],
+        },
+        "queries_per_request": statistics.median_low(collected.statements),
+        "response_bytes": collected.size,
+    }
+
+
+def test_endpoint(
+    case, bench_client, bench_engine, bench_options, bench_results, dataset, samples
+):
+    _, name = case
+    path, headers_for, params_for = CASES[name]
+    headers = headers_for(dataset)
+    params = params_for(dataset)
+    collected = samples[name]
+
+    for _ in range(bench_options.bench_warmup):
+        assert bench_client.get(path, headers=headers, params=params).status_code == 200
+
+    latencies: list[float] = []
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        if current_query_stats() is not None:
+            statements += 1
+
+    with _background_writers_paused(bench_client):
+        event.listen(bench_engine, "before_cursor_execute", count_statement)
+        try:
+            started = time.perf_counter()
+            for _ in range(bench_options.bench_iterations):
+                statements = 0
+                request_started = time.perf_counter()
+                response = bench_client.get(path, headers=headers, params=params)
+                latencies.append(time.perf_counter() - request_started)
+                assert response.status_code == 200, response.text
+                collected.statements.append(statements)
+                collected.size = len(response.content)
+            collected.elapsed += time.perf_counter() - started
+        finally:
+            event.remove(bench_engine, "before_cursor_execute", count_statement)
+
+    collected.latencies.extend(latencies)
+    collected.round_p95.append(_percentile(sorted(latencies), 95))
+    bench_results[name] = _summary(path, collected)
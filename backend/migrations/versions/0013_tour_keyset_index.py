@@ -0,0 +1,28 @@
+"""add composite index backing declaration keyset pagination
+
+Revision ID: 0013_tour_keyset_index
+Revises: 0012_stripe_billing
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_tour_keyset_index"
+down_revision = "0012_stripe_billing"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_tour_tenant_date_id",
+        "tour",
+        ["tenant_id", "date", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tour_tenant_date_id", table_name="tour")
@@ -0,0 +1,49 @@
+"""create export table for background export jobs
+
+Revision ID: 0014_export_jobs
+Revises: 0013_tour_keyset_index
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_export_jobs"
+down_revision = "0013_tour_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("format", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("periode_debut", sa.Date(), nullable=False),
+        sa.Column("periode_fin", sa.Date(), nullable=False),
+        sa.Column("client_id", sa.Integer(), nullable=True),
+        sa.Column("driver_id", sa.Integer(), nullable=True),
+        sa.Column("file_url", sa.String(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenant.id"]),
+        sa.ForeignKeyConstraint(["client_id"], ["client.id"]),
+        sa.ForeignKeyConstraint(["driver_id"], ["chauffeur.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_export_tenant_id", "export", ["tenant_id"], unique=False)
+    op.create_index("ix_export_status", "export", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_status", table_name="export")
+    op.drop_index("ix_export_tenant_id", table_name="export")
+    op.drop_table("export")
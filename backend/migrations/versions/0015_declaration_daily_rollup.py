@@ -0,0 +1,82 @@
+"""create declaration daily rollup table and backfill it
+
+Revision ID: 0015_declaration_daily_rollup
+Revises: 0014_export_jobs
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_declaration_daily_rollup"
+down_revision = "0014_export_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "declaration_daily_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("client_id", sa.Integer(), nullable=False),
+        sa.Column("driver_id", sa.Integer(), nullable=False),
+        sa.Column("tariff_group_id", sa.Integer(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("pickup_quantity", sa.Integer(), nullable=False),
+        sa.Column("delivery_quantity", sa.Integer(), nullable=False),
+        sa.Column("amount_ex_vat", sa.Numeric(12, 2), nullable=False),
+        sa.Column("margin_ex_vat", sa.Numeric(12, 2), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenant.id"]),
+        sa.ForeignKeyConstraint(["client_id"], ["client.id"]),
+        sa.ForeignKeyConstraint(["driver_id"], ["chauffeur.id"]),
+        sa.ForeignKeyConstraint(["tariff_group_id"], ["tariffgroup.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "tenant_id",
+            "date",
+            "client_id",
+            "driver_id",
+            "tariff_group_id",
+            name="uq_declaration_daily_rollup_key",
+        ),
+    )
+    op.create_index(
+        "ix_declaration_daily_rollup_tenant_date",
+        "declaration_daily_rollup",
+        ["tenant_id", "date"],
+    )
+
+    op.execute(
+        """
+        INSERT INTO declaration_daily_rollup (
+            created_at, tenant_id, date, client_id, driver_id, tariff_group_id,
+            item_count, pickup_quantity, delivery_quantity, amount_ex_vat,
+            margin_ex_vat
+        )
+        SELECT
+            CURRENT_TIMESTAMP, touritem.tenant_id, tour.date, tour.client_id,
+            tour.driver_id, touritem.tariff_group_id, COUNT(touritem.id),
+            COALESCE(SUM(touritem.pickup_quantity), 0),
+            COALESCE(SUM(touritem.delivery_quantity), 0),
+            COALESCE(SUM(touritem.amount_ex_vat_snapshot), 0),
+            COALESCE(SUM(touritem.margin_ex_vat_snapshot), 0)
+        FROM touritem
+        JOIN tour ON touritem.tour_id = tour.id
+        GROUP BY touritem.tenant_id, tour.date, tour.client_id, tour.driver_id,
+            touritem.tariff_group_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_declaration_daily_rollup_tenant_date",
+        table_name="declaration_daily_rollup",
+    )
+    op.drop_table("declaration_daily_rollup")
@@ -0,0 +1,29 @@
+"""add functional index on lower(tenant.slug)
+
+Revision ID: 0016_tenant_slug_lower_index
+Revises: 0015_declaration_daily_rollup
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_tenant_slug_lower_index"
+down_revision = "0015_declaration_daily_rollup"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_tenant_slug_lower",
+        "tenant",
+        [sa.text("lower(slug)")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tenant_slug_lower", table_name="tenant")
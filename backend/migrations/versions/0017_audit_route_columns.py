@@ -0,0 +1,96 @@
+"""record route template, status and duration in the audit log
+
+Revision ID: 0017_audit_route_columns
+Revises: 0016_tenant_slug_lower_index
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_audit_route_columns"
+down_revision = "0016_tenant_slug_lower_index"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Frozen copy of ``app.services.audit.normalize_path``.
+_ID_SEGMENT_RE = re.compile(r"/[0-9]+(?=/|$)")
+_HEX_SEGMENT_RE = re.compile(r"/[0-9a-fA-F-]{8,}(?=/|$)")
+
+
+def _normalize_path(path: str) -> str:
+    normalized = _ID_SEGMENT_RE.sub("/:id", path)
+    return _HEX_SEGMENT_RE.sub("/:token", normalized)
+
+
+def _backfill_routes() -> None:
+    """Derive the route of request rows from their raw path, by id range.
+
+    Only rows written by the HTTP middleware have a path as entity; domain
+    events (``chauffeur``, ``tenant_subscription``) keep a NULL route.
+    """
+
+    auditlog = sa.table(
+        "auditlog",
+        sa.column("id", sa.Integer),
+        sa.column("entity", sa.String),
+        sa.column("route", sa.String),
+    )
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(auditlog.c.id, auditlog.c.entity)
+            .where(auditlog.c.id > last_id, auditlog.c.route.is_(None))
+            .order_by(auditlog.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        updates = [
+            {"row_id": row.id, "route": _normalize_path(row.entity)}
+            for row in rows
+            if row.entity.startswith("/")
+        ]
+        if updates:
+            bind.execute(
+                auditlog.update()
+                .where(auditlog.c.id == sa.bindparam("row_id"))
+                .values(route=sa.bindparam("route")),
+                updates,
+            )
+
+
+def upgrade() -> None:
+    op.add_column("auditlog", sa.Column("route", sa.String(), nullable=True))
+    op.add_column("auditlog", sa.Column("status_code", sa.Integer(), nullable=True))
+    op.add_column("auditlog", sa.Column("duration_ms", sa.Float(), nullable=True))
+
+    _backfill_routes()
+
+    op.create_index(
+        "ix_auditlog_tenant_created_at",
+        "auditlog",
+        ["tenant_id", "created_at"],
+    )
+    op.create_index(
+        "ix_auditlog_tenant_route",
+        "auditlog",
+        ["tenant_id", "route"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_auditlog_tenant_route", table_name="auditlog")
+    op.drop_index("ix_auditlog_tenant_created_at", table_name="auditlog")
+    op.drop_column("auditlog", "duration_ms")
+    op.drop_column("auditlog", "status_code")
+    op.drop_column("auditlog", "route")
@@ -0,0 +1,146 @@
+"""Compare the request throughput of the audit middleware implementations.
+
+Each scenario is served by a small Starlette application exposing
+``/healthz`` and a streamed CSV export, wrapped either by nothing, by the
+previous ``BaseHTTPMiddleware`` implementation or by the current pure ASGI
+:class:`app.middleware.audit.AuditMiddleware`. Audit events go to a writer that
+discards them, so only the middleware overhead is measured. Requests are sent
+in-process through ``httpx.ASGITransport``.
+
+    python scripts/benchmark_audit_middleware.py --requests 2000 --export-rows 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+if __package__ in {None, ""}:
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.types import ASGIApp
+
+from app.core.config import settings
+from app.middleware.audit import AuditMiddleware
+from app.services.audit import AuditEvent
+
+TENANT_HEADERS = {settings.tenant_header_name: "1"}
+
+
+class NullWriter:
+    def enqueue(self, event: AuditEvent) -> bool:
+        return True
+
+
+class BaseHTTPAuditMiddleware(BaseHTTPMiddleware):
+    """The former implementation, minus its synchronous database write."""
+
+    def __init__(self, app: ASGIApp, writer: NullWriter) -> None:
+        super().__init__(app)
+        self.writer = writer
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        tenant_id = request.headers.get(settings.tenant_header_name)
+        if tenant_id:
+            self.writer.enqueue(
+                AuditEvent(
+                    tenant_id=int(tenant_id),
+                    entity=request.url.path,
+                    action=request.method.lower(),
+                    status_code=response.status_code,
+                )
+            )
+        return response
+
+
+def build_app(export_rows: int) -> Starlette:
+    def healthz(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    def export(request: Request) -> StreamingResponse:
+        def rows() -> Iterator[str]:
+            yield "date;chauffeur;client;quantite\n"
+            for index in range(export_rows):
+                yield (
+                    f"2024-01-{index % 28 + 1:02d};Chauffeur {index % 250};"
+                    f"Client {index % 40};{index % 50}\n"
+                )
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    return Starlette(
+        routes=[Route("/healthz", healthz), Route("/export", export)]
+    )
+
+
+SCENARIOS: dict[str, Callable[[ASGIApp], ASGIApp]] = {
+    "none": lambda app: app,
+    "base-http": lambda app: BaseHTTPAuditMiddleware(app, writer=NullWriter()),
+    "pure-asgi": lambda app: AuditMiddleware(app, writer=NullWriter()),
+}
+
+
+async def measure(app: ASGIApp, path: str, count: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", headers=TENANT_HEADERS
+    ) as client:
+        # Warm up routing and the first response.
+        (await client.get(path)).raise_for_status()
+        remaining = count
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                (await client.get(path)).raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return count / elapsed if elapsed else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="Requests per /healthz run"
+    )
+    parser.add_argument(
+        "--export-requests",
+        type=int,
+        default=50,
+        help="Requests per streamed export run",
+    )
+    parser.add_argument(
+        "--export-rows", type=int, default=20_000, help="Rows per streamed export"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="Concurrent in-flight requests"
+    )
+    args = parser.parse_args()
+
+    base_app = build_app(args.export_rows)
+    print(f"{'middleware':>10} {'healthz req/s':>14} {'export req/s':>13}")
+    for name, wrap in SCENARIOS.items():
+        app = wrap(base_app)
+        healthz = asyncio.run(measure(app, "/healthz", args.requests, args.concurrency))
+        export = asyncio.run(
+            measure(app, "/export", args.export_requests, args.concurrency)
+        )
+        print(f"{name:>10} {healthz:>14.0f} {export:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
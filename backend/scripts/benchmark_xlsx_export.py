@@ -0,0 +1,94 @@
+"""Measure memory and throughput of the streaming XLSX exporter.
+
+The script feeds synthetic declaration rows to :func:`app.core.xlsx.iter_xlsx`
+and reports, for each volume, the peak Python heap usage traced by
+``tracemalloc``, the archive size and the elapsed time. Peak memory should stay
+flat whatever the number of rows.
+
+    python scripts/benchmark_xlsx_export.py --rows 1000 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+if __package__ in {None, ""}:
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.core.xlsx import iter_xlsx
+from app.services.declarations import DECLARATIONS_EXPORT_HEADER
+
+DEFAULT_VOLUMES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def generate_rows(count: int) -> Iterator[list[str | int]]:
+    """Yield rows shaped like ``format_declaration_export_row`` output."""
+
+    yield list(DECLARATIONS_EXPORT_HEADER)
+    start = date(2024, 1, 1)
+    for index in range(count):
+        pickup = 10 + index % 40
+        delivery = pickup - index % 3
+        yield [
+            (start + timedelta(days=index % 365)).isoformat(),
+            f"Chauffeur {index % 250}",
+            f"Client {index % 40}",
+            f"Catégorie {index % 6}",
+            pickup,
+            delivery,
+            pickup - delivery,
+            f"{delivery * 2.35:.2f}",
+            f"{delivery * 0.65:.2f}",
+        ]
+
+
+def run(count: int) -> dict[str, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    for chunk in iter_xlsx(generate_rows(count), sheet_title="Declarations"):
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": count,
+        "peak_kib": peak / 1024,
+        "size_kib": size / 1024,
+        "seconds": elapsed,
+        "rows_per_second": count / elapsed if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_VOLUMES),
+        help="Row counts to benchmark",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>10} {'peak KiB':>10} {'size KiB':>10} "
+        f"{'seconds':>9} {'rows/s':>10}"
+    )
+    for count in args.rows:
+        result = run(count)
+        print(
+            f"{result['rows']:>10} {result['peak_kib']:>10.1f} "
+            f"{result['size_kib']:>10.1f} {result['seconds']:>9.2f} "
+            f"{result['rows_per_second']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
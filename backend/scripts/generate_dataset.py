@@ -0,0 +1,132 @@
+"""Generate a large synthetic dataset to test the API at production scale.
+
+Creates tenants with their drivers, clients and tariff categories (one tariff
+version per year), then years of tours and tour items with weekday and
+seasonal variations. The same options and seed always produce the same rows.
+Tours and items are loaded with ``COPY`` on PostgreSQL (psycopg) and with
+batched inserts on other databases.
+
+    python scripts/generate_dataset.py --tenants 5 --drivers 400 --years 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+if __package__ in {None, ""}:
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+from app.models.base import Base
+from benchmarks.dataset import Volume, seed_dataset
+
+
+def _engine(database_url: str | None):
+    if database_url is None:
+        from app.db.session import engine
+
+        return engine
+    kwargs = {"future": True}
+    if make_url(database_url).drivername.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    return create_engine(database_url, **kwargs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=1, help="Tenants to create")
+    parser.add_argument(
+        "--drivers", type=int, default=200, help="Drivers per tenant"
+    )
+    parser.add_argument(
+        "--clients", type=int, default=50, help="Clients per tenant"
+    )
+    parser.add_argument(
+        "--groups", type=int, default=5, help="Tariff categories per client"
+    )
+    period = parser.add_mutually_exclusive_group()
+    period.add_argument("--years", type=int, help="Years of activity")
+    period.add_argument("--days", type=int, help="Days of activity (default: 365)")
+    parser.add_argument(
+        "--activity-rate",
+        type=float,
+        default=0.8,
+        help="Probability that a driver works on a weekday",
+    )
+    parser.add_argument(
+        "--audit-rows", type=int, default=1000, help="Audit log rows per tenant"
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="Last day of activity (default: today)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--slug-prefix",
+        default="synthetic",
+        help="Prefix of the generated tenant slugs",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Target database (default: DATABASE_URL from the settings)",
+    )
+    parser.add_argument(
+        "--create-schema",
+        action="store_true",
+        help="Create missing tables from the models (databases without migrations)",
+    )
+    parser.add_argument(
+        "--skip-rollups",
+        action="store_true",
+        help="Do not rebuild the declaration rollups of the generated tenants",
+    )
+    args = parser.parse_args()
+
+    days = args.days or 365 * (args.years or 1)
+    volume = Volume(
+        tenants=args.tenants,
+        drivers_per_tenant=args.drivers,
+        clients_per_tenant=args.clients,
+        groups_per_client=args.groups,
+        days=days,
+        activity_rate=args.activity_rate,
+        audit_rows_per_tenant=args.audit_rows,
+    )
+    engine = _engine(args.database_url)
+    if args.create_schema:
+        Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+
+    def progress(message: str) -> None:
+        print(f"[{time.perf_counter() - started:8.1f}s] {message}", flush=True)
+
+    summary = seed_dataset(
+        engine,
+        volume,
+        seed=args.seed,
+        today=args.end_date,
+        slug_prefix=args.slug_prefix,
+        rollups=not args.skip_rollups,
+        progress=progress,
+    )
+
+    print(
+        f"Generated tenants {', '.join(map(str, summary.tenant_ids))} "
+        f"from {summary.start} to {summary.end}:"
+    )
+    for table, count in sorted(summary.counts.items()):
+        print(f"  {table:<26} {count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Rebuild the declaration daily rollup table from the tour items.
+
+The API keeps the rollup up to date on every declaration write. Run this
+script after loading tour items outside the API (imports, manual SQL fixes)
+or to repair a tenant whose aggregates look wrong.
+
+    python scripts/rebuild_declaration_rollups.py [--tenant-id 42]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+if __package__ in {None, ""}:
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import SessionLocal
+from app.services.rollups import rebuild_declaration_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tenant-id",
+        type=int,
+        default=None,
+        help="Only rebuild the rows of this tenant",
+    )
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        count = rebuild_declaration_rollups(db, args.tenant_id)
+        db.commit()
+
+    scope = f"tenant {args.tenant_id}" if args.tenant_id else "all tenants"
+    print(f"Rebuilt {count} rollup rows for {scope}")
+
+
+if __name__ == "__main__":
+    main()
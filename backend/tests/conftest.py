@@ -5,3 +5,66 @@ from pathlib import Path
 root = Path(__file__).resolve().parents[1]
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
+
+from collections import Counter
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db.query_stats import statement_shape
+from app.services.catalog import bump_catalog_version
+from app.services.last_seen import last_seen_tracker
+from app.services.memberships import invalidate_membership
+from app.services.monitoring import monitoring_overviews
+from app.services.tariffs import invalidate_tariff_index
+from app.services.tenants import invalidate_tenant_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_process_caches():
+    """Test modules reuse tenant ids across databases; start each test cold."""
+    invalidate_tariff_index()
+    bump_catalog_version()
+    invalidate_tenant_cache()
+    invalidate_membership()
+    monitoring_overviews.clear()
+    last_seen_tracker.clear()
+    yield
+
+
+@pytest.fixture
+def query_budget():
+    """Fail when the block runs more SQL statements than ``limit``.
+
+    Counts statements on every engine and thread, so requests sent through
+    ``TestClient`` are included::
+
+        with query_budget(4):
+            client.get("/clients", headers=headers)
+    """
+
+    @contextmanager
+    def budget(limit: int):
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+        if len(statements) > limit:
+            shapes = Counter(statement_shape(statement) for statement in statements)
+            details = "\n".join(
+                f"{count:>4} x {shape}" for shape, count in shapes.most_common(5)
+            )
+            pytest.fail(
+                f"{len(statements)} SQL statements executed, budget is {limit}:\n"
+                f"{details}"
+            )
+
+    return budget
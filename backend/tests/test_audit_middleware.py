@@ -0,0 +1,125 @@
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.middleware.audit import AuditMiddleware
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.events = []
+
+    def enqueue(self, event):
+        self.events.append(event)
+        return True
+
+
+def _stream(request):
+    def chunks():
+        for index in range(3):
+            yield f"chunk-{index};"
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def _missing(request):
+    return PlainTextResponse("nope", status_code=404)
+
+
+inner_app = Starlette(
+    routes=[Route("/stream", _stream), Route("/tours/{tour_id:int}/delivery", _missing)]
+)
+
+
+def _call(app, path, headers):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def run():
+        requested = False
+        response_complete = asyncio.Event()
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete.set()
+
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    return messages
+
+
+def test_streamed_body_passes_through_unbuffered(monkeypatch):
+    monkeypatch.setattr(settings, "dev_fake_auth", True)
+    writer = RecordingWriter()
+    app = AuditMiddleware(inner_app, writer=writer)
+
+    messages = _call(
+        app,
+        "/stream",
+        {settings.tenant_header_name: "7", "X-Dev-Role": "ADMIN", "X-Dev-Sub": "dev|a"},
+    )
+
+    bodies = [m["body"] for m in messages if m["type"] == "http.response.body"]
+    assert [body for body in bodies if body] == [b"chunk-0;", b"chunk-1;", b"chunk-2;"]
+    assert len(writer.events) == 1
+    event = writer.events[0]
+    assert (event.tenant_id, event.sub, event.entity, event.action) == (
+        7,
+        "dev|a",
+        "/stream",
+        "get",
+    )
+    assert event.status_code == 200
+    assert event.route == "/stream"
+    assert event.duration_ms >= 0
+
+
+def test_status_is_recorded_and_untenanted_requests_skipped():
+    writer = RecordingWriter()
+    app = AuditMiddleware(inner_app, writer=writer)
+
+    _call(app, "/tours/12/delivery", {settings.tenant_header_name: "7"})
+    _call(app, "/tours/12/delivery", {})
+
+    assert [event.status_code for event in writer.events] == [404]
+    assert writer.events[0].route == "/tours/:id/delivery"
+
+
+def test_unmatched_paths_are_normalized():
+    writer = RecordingWriter()
+    app = AuditMiddleware(inner_app, writer=writer)
+
+    _call(app, "/unknown/42/3f2a9c1e-77aa", {settings.tenant_header_name: "7"})
+
+    event = writer.events[0]
+    assert event.status_code == 404
+    assert event.entity == "/unknown/42/3f2a9c1e-77aa"
+    assert event.route == "/unknown/:id/:token"
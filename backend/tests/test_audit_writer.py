@@ -0,0 +1,145 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.audit import AuditLog
+from app.models.base import Base
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.services.audit import AuditEvent, AuditWriter
+
+engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(
+    bind=engine, autocommit=False, autoflush=False, future=True
+)
+
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def tenant_with_user():
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Acme", slug="acme-audit")
+        db.add(tenant)
+        db.flush()
+        user = User(
+            tenant_id=tenant.id,
+            auth0_sub="auth0|audited",
+            email="audited@example.com",
+            role="ADMIN",
+        )
+        db.add(user)
+        db.commit()
+        return tenant.id, user.id
+
+
+def _writer(**kwargs) -> AuditWriter:
+    options = {"max_queue_size": 100, "batch_size": 10, "flush_interval": 0.05}
+    options.update(kwargs)
+    return AuditWriter(TestingSessionLocal, **options)
+
+
+def test_events_are_written_in_batches(tenant_with_user):
+    tenant_id, user_id = tenant_with_user
+    inserts: list[str] = []
+
+    def record_insert(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO auditlog"):
+            inserts.append(statement)
+
+    async def scenario(writer: AuditWriter) -> None:
+        writer.start()
+        for index in range(25):
+            writer.enqueue(
+                AuditEvent(
+                    tenant_id=tenant_id,
+                    sub="auth0|audited" if index % 2 else None,
+                    entity=f"/clients/{index}",
+                    action="get",
+                    route="/clients/:id",
+                    status_code=200,
+                    duration_ms=1.5,
+                )
+            )
+        await writer.stop()
+
+    writer = _writer()
+    event.listen(engine, "before_cursor_execute", record_insert)
+    try:
+        asyncio.run(scenario(writer))
+    finally:
+        event.remove(engine, "before_cursor_execute", record_insert)
+
+    assert len(inserts) == 3
+    assert writer.metrics()["written"] == 25
+    assert writer.metrics()["queue_depth"] == 0
+    with TestingSessionLocal() as db:
+        rows = db.query(AuditLog).order_by(AuditLog.id).all()
+    assert [row.entity for row in rows] == [f"/clients/{i}" for i in range(25)]
+    assert rows[1].user_id == user_id
+    assert rows[0].user_id is None
+    assert {(row.route, row.status_code, row.duration_ms) for row in rows} == {
+        ("/clients/:id", 200, 1.5)
+    }
+
+
+def test_full_queue_drops_events_without_blocking(tenant_with_user):
+    tenant_id, _ = tenant_with_user
+    writer = _writer(max_queue_size=3)
+
+    accepted = [
+        writer.enqueue(AuditEvent(tenant_id=tenant_id, entity="/x", action="get"))
+        for _ in range(5)
+    ]
+
+    assert accepted == [True, True, True, False, False]
+    assert writer.metrics()["dropped"] == 2
+    assert writer.metrics()["queue_depth"] == 3
+
+    async def flush() -> None:
+        writer.start()
+        await writer.stop()
+
+    asyncio.run(flush())
+    assert writer.metrics()["written"] == 3
+    with TestingSessionLocal() as db:
+        assert db.query(AuditLog).count() == 3
+
+
+def test_stop_is_not_lost_when_an_event_arrives(tenant_with_user):
+    tenant_id, _ = tenant_with_user
+    writer = _writer(flush_interval=5)
+
+    async def scenario() -> None:
+        writer.start()
+        writer.enqueue(AuditEvent(tenant_id=tenant_id, entity="/first", action="get"))
+        # Let the writer take the first event and wait for the rest of the batch.
+        await asyncio.sleep(0.01)
+        # The pending get completes in the same loop step as the cancellation.
+        writer.enqueue(AuditEvent(tenant_id=tenant_id, entity="/second", action="get"))
+        await writer.stop()
+
+    # A lost cancellation leaves stop() waiting forever: run it in a thread
+    # so that the test fails instead of hanging.
+    thread = threading.Thread(target=asyncio.run, args=(scenario(),), daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive(), "stop() did not return"
+    assert writer.metrics()["written"] == 2
+    with TestingSessionLocal() as db:
+        assert {row.entity for row in db.query(AuditLog)} == {"/first", "/second"}
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import auth
+
+
+@pytest.fixture(autouse=True)
+def fake_decode(monkeypatch):
+    calls: list[str] = []
+    expirations: dict[str, float | None] = {}
+
+    def decode_token(token: str) -> dict:
+        calls.append(token)
+        claims = {"sub": f"auth0|{token}", "roles": ["ADMIN"]}
+        if expirations.get(token) is not None:
+            claims["exp"] = expirations[token]
+        return claims
+
+    monkeypatch.setattr(auth, "decode_token", decode_token)
+    auth.clear_verified_claims()
+    yield calls, expirations
+    auth.clear_verified_claims()
+
+
+def _current_user(token: str) -> dict:
+    return auth.get_current_user(
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    )
+
+
+def test_verified_claims_are_reused_until_expiry(fake_decode):
+    calls, expirations = fake_decode
+    expirations["valid"] = time.time() + 3600
+
+    first = _current_user("valid")
+    first["roles"].append("mutated")
+    first["sub"] = "changed"
+    second = _current_user("valid")
+
+    assert calls == ["valid"]
+    assert second == {
+        "sub": "auth0|valid",
+        "roles": ["ADMIN"],
+        "exp": expirations["valid"],
+    }
+
+
+def test_tokens_without_future_expiry_are_not_cached(fake_decode):
+    calls, expirations = fake_decode
+    expirations["expired"] = time.time() - 1
+    expirations["no-exp"] = None
+
+    for token in ("expired", "expired", "no-exp", "no-exp"):
+        _current_user(token)
+
+    assert calls == ["expired", "expired", "no-exp", "no-exp"]
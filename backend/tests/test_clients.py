@@ -3,7 +3,7 @@ import uuid
 from datetime import date
 from decimal import Decimal
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -19,6 +19,7 @@ from app.models.tour_item import TourItem
 from app.models.chauffeur import Chauffeur
 from app.models.user import User
 from app.core.config import settings
+from app.services.rollups import rebuild_declaration_rollups
 
 
 engine = create_engine(
@@ -364,6 +365,135 @@ def test_list_clients_include_inactive_flag(client):
     assert data == {"Client Active": True, "Client Inactive": False}
 
 
+def _add_clients_with_categories(db, tenant_id: int, start: int, count: int) -> None:
+    for index in range(start, start + count):
+        client_model = Client(tenant_id=tenant_id, name=f"Client {index:02d}")
+        db.add(client_model)
+        db.flush()
+        for order in range(3):
+            group = TariffGroup(
+                tenant_id=tenant_id,
+                client_id=client_model.id,
+                code=f"cat-{index}-{order}",
+                display_name=f"Cat {order}",
+                unit="colis",
+                order=order,
+            )
+            db.add(group)
+            db.flush()
+            db.add(
+                Tariff(
+                    tenant_id=tenant_id,
+                    tariff_group_id=group.id,
+                    price_ex_vat=Decimal("1.50") + order,
+                    margin_ex_vat=Decimal("0.50"),
+                    effective_from=date(2024, 1, 1),
+                )
+            )
+    db.commit()
+
+
+def test_list_clients_query_count_does_not_grow_with_clients(client):
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Acme", slug="acme-query-count")
+        db.add(tenant)
+        db.commit()
+        db.refresh(tenant)
+        tenant_id = tenant.id
+        admin_sub = _create_admin_user(db, tenant_id)
+        _add_clients_with_categories(db, tenant_id, 0, 2)
+
+    headers_admin = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+    statements: list[str] = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    def list_clients_query_count() -> tuple[int, list]:
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            resp = client.get("/clients/", headers=headers_admin)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+        assert resp.status_code == 200
+        return len(statements), resp.json()
+
+    # Warm the tenant caches so both measurements only differ by catalog size.
+    assert client.get("/clients/", headers=headers_admin).status_code == 200
+    with TestingSessionLocal() as db:
+        _add_clients_with_categories(db, tenant_id, 2, 1)
+
+    small_count, small_data = list_clients_query_count()
+    assert len(small_data) == 3
+
+    with TestingSessionLocal() as db:
+        _add_clients_with_categories(db, tenant_id, 3, 10)
+
+    large_count, large_data = list_clients_query_count()
+    assert len(large_data) == 13
+    assert all(len(entry["categories"]) == 3 for entry in large_data)
+    assert [
+        Decimal(category["unitPriceExVat"]) for category in large_data[-1]["categories"]
+    ] == [Decimal("1.50"), Decimal("2.50"), Decimal("3.50")]
+    assert large_count == small_count
+
+
+def test_list_clients_etag_is_revalidated_after_writes(client):
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Acme", slug="acme-etag")
+        db.add(tenant)
+        db.commit()
+        db.refresh(tenant)
+        tenant_id = tenant.id
+        admin_sub = _create_admin_user(db, tenant_id)
+        _add_clients_with_categories(db, tenant_id, 0, 1)
+
+    headers_admin = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+
+    resp = client.get("/clients/", headers=headers_admin)
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    client_id = resp.json()[0]["id"]
+    category_id = resp.json()[0]["categories"][0]["id"]
+
+    cached = client.get("/clients/", headers={**headers_admin, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    resp = client.patch(
+        f"/clients/{client_id}/categories/{category_id}",
+        json={"name": "Cat 0", "unitPriceExVat": "9.90"},
+        headers=headers_admin,
+    )
+    assert resp.status_code == 200
+
+    resp = client.get("/clients/", headers={**headers_admin, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert Decimal(resp.json()[0]["categories"][0]["unitPriceExVat"]) == Decimal(
+        "9.90"
+    )
+    etag = resp.headers["ETag"]
+
+    resp = client.patch(
+        f"/clients/{client_id}", json={"name": "Client renamed"}, headers=headers_admin
+    )
+    assert resp.status_code == 200
+    resp = client.get("/clients/", headers={**headers_admin, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()[0]["name"] == "Client renamed"
+
+
 def test_reactivate_client_restores_client_and_categories(client):
     with TestingSessionLocal() as db:
         tenant = Tenant(name="Acme", slug="acme-reactivate")
@@ -515,6 +645,9 @@ def test_client_history_returns_clients_with_declarations(client):
         )
         client_inactive.is_active = False
         tg_inactive.is_active = False
+        db.flush()
+        # Rows inserted directly bypass the API write paths.
+        rebuild_declaration_rollups(db, tenant.id)
         db.commit()
         tenant_id = tenant.id
         admin_sub = _create_admin_user(db, tenant_id)
@@ -574,6 +707,54 @@ def test_admin_cannot_switch_tenant_scope(client):
     assert resp.json()["detail"] == "User not associated with tenant"
 
 
+def test_membership_verdict_is_cached_until_user_changes(client):
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Tenant Membership", slug="tenant-membership")
+        db.add(tenant)
+        db.commit()
+        db.refresh(tenant)
+        tenant_id = tenant.id
+        driver_sub = f"auth0|driver-{uuid.uuid4().hex}"
+        db.add(
+            User(
+                tenant_id=tenant_id,
+                auth0_sub=driver_sub,
+                email=f"{uuid.uuid4().hex}@example.com",
+                role="CHAUFFEUR",
+                is_active=True,
+            )
+        )
+        db.commit()
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "CHAUFFEUR",
+        "X-Dev-Sub": driver_sub,
+    }
+    membership_lookups: list[str] = []
+
+    def record_user_lookup(conn, cursor, statement, *args):
+        if "FROM user" in statement and "auth0_sub" in statement:
+            membership_lookups.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_user_lookup)
+    try:
+        assert client.get("/clients/", headers=headers).status_code == 200
+        assert client.get("/clients/", headers=headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record_user_lookup)
+    assert len(membership_lookups) == 1
+
+    with TestingSessionLocal() as db:
+        user = db.query(User).filter(User.auth0_sub == driver_sub).one()
+        user.is_active = False
+        db.commit()
+
+    resp = client.get("/clients/", headers=headers)
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "User not associated with tenant"
+
+
 def test_global_supervision_can_bypass_tenant_membership(client):
     with TestingSessionLocal() as db:
         tenant = Tenant(name="Tenant Global", slug="tenant-global")
@@ -0,0 +1,290 @@
+import csv
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.session import get_db
+from app.main import app
+from app.models.base import Base
+from app.models.chauffeur import Chauffeur
+from app.models.client import Client
+from app.models.export import Export
+from app.models.tariff_group import TariffGroup
+from app.models.tenant import Tenant
+from app.models.tour import Tour
+from app.models.tour_item import TourItem
+from app.models.user import User
+from app.services import exports
+from app.services.declarations import DECLARATIONS_EXPORT_HEADER
+from app.services.exports import export_file_path, process_pending_exports
+
+engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(
+    bind=engine, autocommit=False, autoflush=False, future=True
+)
+
+
+@pytest.fixture(autouse=True)
+def setup_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "export_storage_dir", str(tmp_path))
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def client():
+    settings.dev_fake_auth = True
+    previous_override = app.dependency_overrides.get(get_db)
+
+    def override_get_db():
+        try:
+            db = TestingSessionLocal()
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        if previous_override is not None:
+            app.dependency_overrides[get_db] = previous_override
+        else:
+            app.dependency_overrides.pop(get_db, None)
+
+
+def _seed(db):
+    tenant = Tenant(name="Acme", slug="acme-exports")
+    other = Tenant(name="Other", slug="other-exports")
+    db.add_all([tenant, other])
+    db.flush()
+    db.add_all(
+        [
+            User(
+                tenant_id=tenant.id,
+                auth0_sub="dev|export-admin",
+                email="export-admin@example.com",
+                role="ADMIN",
+            ),
+            User(
+                tenant_id=other.id,
+                auth0_sub="dev|other-admin",
+                email="other-admin@example.com",
+                role="ADMIN",
+            ),
+        ]
+    )
+    chauffeur = Chauffeur(
+        tenant_id=tenant.id, email="export-driver@example.com", display_name="Ali"
+    )
+    client_model = Client(tenant_id=tenant.id, name="Amazon")
+    db.add_all([chauffeur, client_model])
+    db.flush()
+    tg = TariffGroup(
+        tenant_id=tenant.id,
+        client_id=client_model.id,
+        code="std",
+        display_name="Colis standards",
+        unit="colis",
+    )
+    db.add(tg)
+    db.flush()
+    for offset in range(3):
+        tour = Tour(
+            tenant_id=tenant.id,
+            driver_id=chauffeur.id,
+            client_id=client_model.id,
+            date=date(2024, 1, 31) - timedelta(days=offset),
+            status=Tour.STATUS_COMPLETED,
+        )
+        db.add(tour)
+        db.flush()
+        db.add(
+            TourItem(
+                tenant_id=tenant.id,
+                tour_id=tour.id,
+                tariff_group_id=tg.id,
+                pickup_quantity=10,
+                delivery_quantity=8,
+                unit_price_ex_vat_snapshot=Decimal("2.50"),
+                amount_ex_vat_snapshot=Decimal("20.00"),
+                unit_margin_ex_vat_snapshot=Decimal("1.00"),
+                margin_ex_vat_snapshot=Decimal("8.00"),
+            )
+        )
+    db.commit()
+    return tenant.id, other.id
+
+
+def test_export_job_lifecycle(client):
+    with TestingSessionLocal() as db:
+        tenant_id, _ = _seed(db)
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": "dev|export-admin",
+    }
+    payload = {"format": "csv", "dateFrom": "2024-01-01", "dateTo": "2024-01-31"}
+
+    created = client.post("/exports", json=payload, headers=headers)
+    assert created.status_code == 202
+    body = created.json()
+    assert body["status"] == Export.STATUS_PENDING
+    assert body["downloadUrl"] is None
+    export_id = body["id"]
+
+    not_ready = client.get(f"/exports/{export_id}/download", headers=headers)
+    assert not_ready.status_code == 409
+
+    assert process_pending_exports(TestingSessionLocal) == 1
+    assert process_pending_exports(TestingSessionLocal) == 0
+
+    polled = client.get(f"/exports/{export_id}", headers=headers)
+    assert polled.status_code == 200
+    assert polled.json()["status"] == Export.STATUS_COMPLETED
+    assert polled.json()["downloadUrl"] == f"/exports/{export_id}/download"
+
+    download = client.get(f"/exports/{export_id}/download", headers=headers)
+    assert download.status_code == 200
+    assert download.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(StringIO(download.text), delimiter=";"))
+    assert rows[0] == DECLARATIONS_EXPORT_HEADER
+    assert [row[0] for row in rows[1:]] == ["2024-01-31", "2024-01-30", "2024-01-29"]
+
+
+def test_export_job_is_scoped_to_tenant(client):
+    with TestingSessionLocal() as db:
+        tenant_id, other_tenant_id = _seed(db)
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": "dev|export-admin",
+    }
+    payload = {"format": "xlsx", "dateFrom": "2024-01-01", "dateTo": "2024-01-31"}
+    export_id = client.post("/exports", json=payload, headers=headers).json()["id"]
+
+    other_headers = {
+        "X-Tenant-Id": str(other_tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": "dev|other-admin",
+    }
+    assert client.get(f"/exports/{export_id}", headers=other_headers).status_code == 404
+
+    invalid = client.post(
+        "/exports",
+        json={"format": "csv", "dateFrom": "2024-02-01", "dateTo": "2024-01-01"},
+        headers=headers,
+    )
+    assert invalid.status_code == 400
+
+
+def _headers(tenant_id):
+    return {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": "dev|export-admin",
+    }
+
+
+def test_xlsx_export_can_be_downloaded(client):
+    with TestingSessionLocal() as db:
+        tenant_id, _ = _seed(db)
+    headers = _headers(tenant_id)
+    payload = {"format": "xlsx", "dateFrom": "2024-01-01", "dateTo": "2024-01-31"}
+    export_id = client.post("/exports", json=payload, headers=headers).json()["id"]
+
+    assert process_pending_exports(TestingSessionLocal) == 1
+
+    download = client.get(f"/exports/{export_id}/download", headers=headers)
+    assert download.status_code == 200
+    assert download.headers["content-type"] == (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    assert "declarations-2024-01-01-2024-01-31.xlsx" in (
+        download.headers["content-disposition"]
+    )
+    with zipfile.ZipFile(BytesIO(download.content)) as archive:
+        assert archive.testzip() is None
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row ") == 4
+    assert "Colis standards" in sheet
+    assert "2024-01-29" in sheet
+
+
+def test_failed_export_is_marked_and_partial_file_removed(client, monkeypatch):
+    with TestingSessionLocal() as db:
+        tenant_id, _ = _seed(db)
+    headers = _headers(tenant_id)
+    payload = {"format": "csv", "dateFrom": "2024-01-01", "dateTo": "2024-01-31"}
+    export_id = client.post("/exports", json=payload, headers=headers).json()["id"]
+
+    def failing_csv(declarations):
+        yield "Date;Chauffeur\n"
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(exports, "stream_declarations_csv", failing_csv)
+
+    assert process_pending_exports(TestingSessionLocal) == 1
+
+    polled = client.get(f"/exports/{export_id}", headers=headers).json()
+    assert polled["status"] == Export.STATUS_FAILED
+    assert polled["error"] == "No space left on device"
+    assert polled["downloadUrl"] is None
+    with TestingSessionLocal() as db:
+        path = export_file_path(db.get(Export, export_id))
+    assert list(path.parent.iterdir()) == []
+    download = client.get(f"/exports/{export_id}/download", headers=headers)
+    assert download.status_code == 409
+
+
+def test_stale_running_export_is_reclaimed(client, monkeypatch):
+    monkeypatch.setattr(settings, "export_job_timeout_seconds", 600)
+    with TestingSessionLocal() as db:
+        tenant_id, _ = _seed(db)
+        now = datetime.utcnow()
+        stale, active = (
+            Export(
+                tenant_id=tenant_id,
+                type=Export.TYPE_DECLARATIONS,
+                format=Export.FORMAT_CSV,
+                status=Export.STATUS_RUNNING,
+                periode_debut=date(2024, 1, 1),
+                periode_fin=date(2024, 1, 31),
+                started_at=started_at,
+            )
+            for started_at in (now - timedelta(hours=1), now - timedelta(minutes=1))
+        )
+        db.add_all([stale, active])
+        db.commit()
+        stale_id, active_id = stale.id, active.id
+
+    assert process_pending_exports(TestingSessionLocal) == 1
+    assert process_pending_exports(TestingSessionLocal) == 0
+
+    with TestingSessionLocal() as db:
+        stale = db.get(Export, stale_id)
+        active = db.get(Export, active_id)
+        assert stale.status == Export.STATUS_COMPLETED
+        assert stale.started_at > now
+        assert active.status == Export.STATUS_RUNNING
+    download = client.get(
+        f"/exports/{stale_id}/download", headers=_headers(tenant_id)
+    )
+    assert download.status_code == 200
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.auth import JWKSCache
+
+
+class StubJWKSServer:
+    """Serve a mutable JWKS document on localhost and count the fetches."""
+
+    def __init__(self, kids, delay: float = 0.0) -> None:
+        self.kids = list(kids)
+        self.delay = delay
+        self.hits = 0
+        self.status = 200
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(stub.delay)
+                body = json.dumps(
+                    {"keys": [{"kid": kid, "kty": "RSA"} for kid in stub.kids]}
+                ).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/.well-known/jwks.json"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def jwks_server():
+    server = StubJWKSServer(["key-1"])
+    yield server
+    server.close()
+
+
+def _cache(server, **kwargs) -> JWKSCache:
+    options = {"ttl": 60, "refresh_ahead": 10, "min_refresh_interval": 30}
+    options.update(kwargs)
+    return JWKSCache(url=server.url, timeout=2, **options)
+
+
+def test_keys_are_cached(jwks_server):
+    cache = _cache(jwks_server)
+
+    assert cache.get_key("key-1")["kid"] == "key-1"
+    assert cache.get_key("key-1")["kid"] == "key-1"
+    assert jwks_server.hits == 1
+
+
+def test_concurrent_refreshes_are_coalesced(jwks_server):
+    jwks_server.delay = 0.2
+    cache = _cache(jwks_server)
+    results = []
+
+    def lookup():
+        results.append(cache.get_key("key-1"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert jwks_server.hits == 1
+    assert all(result["kid"] == "key-1" for result in results)
+
+
+def test_unknown_kids_are_rate_limited(jwks_server):
+    cache = _cache(jwks_server)
+    cache.get_key("key-1")
+
+    for index in range(20):
+        assert cache.get_key(f"random-{index}") is None
+    # The keys were fetched less than min_refresh_interval ago.
+    assert jwks_server.hits == 1
+
+
+def test_rotated_key_is_fetched_once_interval_elapsed(jwks_server):
+    cache = _cache(jwks_server, min_refresh_interval=0.1)
+    assert cache.get_key("key-2") is None
+
+    jwks_server.kids.append("key-2")
+    assert cache.get_key("key-2") is None
+    time.sleep(0.15)
+    assert cache.get_key("key-2")["kid"] == "key-2"
+
+
+def test_keys_are_refreshed_in_background_before_expiry(jwks_server):
+    cache = _cache(jwks_server, ttl=0.5, refresh_ahead=0.4, min_refresh_interval=0)
+    cache.get_key("key-1")
+    time.sleep(0.15)
+
+    # Inside the refresh window the cached key is served immediately.
+    assert cache.get_key("key-1")["kid"] == "key-1"
+    deadline = time.monotonic() + 2
+    while jwks_server.hits < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert jwks_server.hits == 2
+
+
+def test_failed_refresh_keeps_previous_keys(jwks_server):
+    cache = _cache(jwks_server, ttl=0.1, refresh_ahead=0, min_refresh_interval=0)
+    cache.get_key("key-1")
+
+    jwks_server.status = 500
+    time.sleep(0.15)
+    assert cache.get_key("key-1")["kid"] == "key-1"
+    assert jwks_server.hits == 2
+
+
+def test_warm_up_loads_keys_before_first_request(jwks_server):
+    cache = _cache(jwks_server)
+    cache.warm_up()
+
+    assert cache.get_key("key-1")["kid"] == "key-1"
+    assert jwks_server.hits == 1
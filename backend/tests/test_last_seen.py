@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models.chauffeur import Chauffeur
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.services.last_seen import LastSeenTracker
+
+engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(
+    bind=engine, autocommit=False, autoflush=False, future=True
+)
+
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def driver_ids():
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Acme", slug="acme-last-seen")
+        db.add(tenant)
+        db.flush()
+        ids = []
+        for index in range(3):
+            user = User(
+                tenant_id=tenant.id,
+                auth0_sub=f"auth0|driver-{index}",
+                email=f"driver-{index}@example.com",
+                role="CHAUFFEUR",
+            )
+            db.add(user)
+            db.flush()
+            chauffeur = Chauffeur(
+                tenant_id=tenant.id,
+                user_id=user.id,
+                email=f"driver-{index}@example.com",
+                display_name=f"Driver {index}",
+            )
+            db.add(chauffeur)
+            db.flush()
+            ids.append(chauffeur.id)
+        db.commit()
+        return ids
+
+
+def _last_seen(driver_id):
+    with TestingSessionLocal() as db:
+        return db.get(Chauffeur, driver_id).last_seen_at
+
+
+def test_heartbeats_are_coalesced_into_one_update(driver_ids):
+    tracker = LastSeenTracker(flush_interval=60)
+    start = datetime(2024, 5, 1, 8, 0)
+    updates: list[str] = []
+
+    def record_update(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE chauffeur"):
+            updates.append(statement)
+
+    with TestingSessionLocal() as db:
+        for minute in range(10):
+            for driver_id in driver_ids:
+                tracker.touch(db, driver_id, start + timedelta(minutes=minute))
+    assert tracker.pending == 3
+    assert _last_seen(driver_ids[0]) is None
+
+    event.listen(engine, "before_cursor_execute", record_update)
+    try:
+        assert tracker.flush() == 3
+    finally:
+        event.remove(engine, "before_cursor_execute", record_update)
+
+    assert len(updates) == 1
+    assert tracker.pending == 0
+    assert {_last_seen(driver_id) for driver_id in driver_ids} == {
+        start + timedelta(minutes=9)
+    }
+
+
+def test_flush_never_moves_last_seen_backwards(driver_ids):
+    tracker = LastSeenTracker(flush_interval=60)
+    recent = datetime(2024, 5, 1, 9, 0)
+    with TestingSessionLocal() as db:
+        db.get(Chauffeur, driver_ids[0]).last_seen_at = recent
+        db.commit()
+        tracker.touch(db, driver_ids[0], recent - timedelta(minutes=5))
+
+    tracker.flush()
+
+    assert _last_seen(driver_ids[0]) == recent
+
+
+def test_failed_flush_keeps_heartbeats(driver_ids):
+    tracker = LastSeenTracker(flush_interval=60)
+    seen_at = datetime(2024, 5, 1, 9, 0)
+    with TestingSessionLocal() as db:
+        tracker.touch(db, driver_ids[0], seen_at)
+    Base.metadata.drop_all(bind=engine)
+
+    assert tracker.flush() == 0
+    assert tracker.failed == 1
+    assert tracker.pending == 1
+
+    Base.metadata.create_all(bind=engine)
+
+
+def test_stop_flushes_pending_heartbeats(driver_ids):
+    tracker = LastSeenTracker(flush_interval=60)
+    seen_at = datetime(2024, 5, 1, 9, 0)
+
+    async def scenario():
+        tracker.start()
+        with TestingSessionLocal() as db:
+            tracker.touch(db, driver_ids[1], seen_at)
+        await tracker.stop()
+
+    asyncio.run(scenario())
+
+    assert _last_seen(driver_ids[1]) == seen_at
+    assert tracker.written == 1
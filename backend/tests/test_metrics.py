@@ -0,0 +1,92 @@
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import get_db
+from app.main import app
+from app.models.base import Base
+from app.models.tenant import Tenant
+
+engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(
+    bind=engine, autocommit=False, autoflush=False, future=True
+)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+settings.dev_fake_auth = True
+
+
+def _sample(name, **labels):
+    return registry.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_counted_per_route_template_and_status():
+    client = TestClient(app)
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Metrics", slug="metrics")
+        db.add(tenant)
+        db.commit()
+        tenant_id = tenant.id
+    headers = {"X-Tenant-Id": str(tenant_id), "X-Dev-Role": "ADMIN"}
+    labels = {"method": "GET", "route": "/exports/:id", "status": "404"}
+    requests_before = _sample("http_requests_total", **labels)
+    queries_before = _sample(
+        "db_queries_per_request_sum", method="GET", route="/exports/:id"
+    )
+    unmatched_before = _sample(
+        "http_requests_total", method="GET", route="unmatched", status="404"
+    )
+
+    assert client.get("/exports/999999", headers=headers).status_code == 404
+    assert client.get("/exports/888888", headers=headers).status_code == 404
+    assert client.get("/no/such/path/42").status_code == 404
+
+    assert _sample("http_requests_total", **labels) == requests_before + 2
+    assert _sample("http_request_duration_seconds_count", **labels) >= 2
+    assert (
+        _sample("db_queries_per_request_sum", method="GET", route="/exports/:id")
+        > queries_before
+    )
+    assert (
+        _sample("http_requests_total", method="GET", route="unmatched", status="404")
+        == unmatched_before + 1
+    )
+    assert _sample("http_requests_in_progress") == 0
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    client = TestClient(app)
+    client.get("/healthz")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    families = {family.name for family in text_string_to_metric_families(response.text)}
+    assert {
+        "http_requests",
+        "http_request_duration_seconds",
+        "http_requests_in_progress",
+        "db_queries_per_request",
+        "threadpool_threads_in_use",
+        "threadpool_threads_capacity",
+    } <= families
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -13,6 +13,7 @@ from app.models.base import Base
 from app.models.chauffeur import Chauffeur
 from app.models.tenant import Tenant, TenantSubscription
 from app.models.user import User
+from app.services.monitoring import monitoring_overviews
 
 
 def override_get_db():
@@ -138,6 +139,143 @@ def test_monitoring_overview_provides_aggregated_metrics():
     assert any(event["actor_role"] == "ANONYMOUS" for event in payload["recent_events"])
 
 
+def test_monitoring_overview_groups_requests_by_route():
+    client = TestClient(app)
+
+    with TestingSessionLocal() as db:
+        tenant = create_tenant(db, "monitor-routes", 5)
+        tenant_id = tenant.id
+        now = datetime.utcnow()
+        db.add_all(
+            [
+                AuditLog(
+                    tenant_id=tenant_id,
+                    entity=f"/tours/{index}",
+                    entity_id=0,
+                    action="get",
+                    route="/tours/:id",
+                    status_code=500 if index == 0 else 200,
+                    duration_ms=10.0 * (index + 1),
+                    created_at=now - timedelta(minutes=index),
+                )
+                for index in range(3)
+            ]
+            + [
+                AuditLog(
+                    tenant_id=tenant_id,
+                    entity="/clients",
+                    entity_id=0,
+                    action="get",
+                    route="/clients",
+                    status_code=200,
+                    duration_ms=4.0,
+                    created_at=now,
+                ),
+                AuditLog(
+                    tenant_id=tenant_id,
+                    entity="/clients",
+                    entity_id=0,
+                    action="get",
+                    route="/clients",
+                    status_code=200,
+                    duration_ms=4.0,
+                    created_at=now - timedelta(days=2),
+                ),
+            ]
+        )
+        db.commit()
+
+    headers = {"X-Tenant-Id": str(tenant_id), "X-Dev-Role": "GLOBAL_SUPERVISION"}
+
+    response = client.get("/monitoring/overview", headers=headers)
+    assert response.status_code == 200
+
+    assert response.json()["endpoints"] == [
+        {
+            "route": "/tours/:id",
+            "action": "get",
+            "request_count": 3,
+            "error_count": 1,
+            "average_duration_ms": 20.0,
+        },
+        {
+            "route": "/clients",
+            "action": "get",
+            "request_count": 1,
+            "error_count": 0,
+            "average_duration_ms": 4.0,
+        },
+    ]
+
+
+def test_monitoring_overview_is_served_stale_while_revalidating(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(monitoring_overviews, "fresh_for", 0)
+
+    with TestingSessionLocal() as db:
+        tenant = create_tenant(db, "monitor-swr", 5)
+        tenant_id = tenant.id
+        db.add(
+            User(
+                tenant_id=tenant_id,
+                auth0_sub="auth0|swr-admin",
+                email="swr-admin@example.com",
+                role="ADMIN",
+            )
+        )
+        db.add(
+            Chauffeur(
+                tenant_id=tenant_id,
+                email="first@example.com",
+                display_name="First",
+                is_active=True,
+            )
+        )
+        db.commit()
+
+    headers = {"X-Tenant-Id": str(tenant_id), "X-Dev-Role": "GLOBAL_SUPERVISION"}
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args):
+        if "FROM chauffeur" in statement or "FROM user" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        first = client.get("/monitoring/overview", headers=headers).json()
+        # One conditional aggregate per summary.
+        assert len(statements) == 2
+
+        with TestingSessionLocal() as db:
+            db.add(
+                Chauffeur(
+                    tenant_id=tenant_id,
+                    email="second@example.com",
+                    display_name="Second",
+                    is_active=False,
+                )
+            )
+            db.commit()
+
+        stale = client.get("/monitoring/overview", headers=headers).json()
+        monitoring_overviews.wait_for_refreshes(timeout=5)
+        refreshed = client.get("/monitoring/overview", headers=headers).json()
+        monitoring_overviews.wait_for_refreshes(timeout=5)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert first["admins"] == {
+        "total": 1,
+        "active": 1,
+        "inactive": 0,
+        "last_activity_at": None,
+    }
+    assert first["chauffeurs"]["total"] == 1
+    assert stale["chauffeurs"]["total"] == 1
+    assert refreshed["chauffeurs"]["total"] == 2
+    assert refreshed["chauffeurs"]["inactive"] == 1
+
+
 def test_monitoring_overview_is_forbidden_for_admin_role():
     client = TestClient(app)
 
@@ -0,0 +1,101 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.db.query_stats import statement_shape
+from app.main import app
+from app.middleware.query_stats import QueryStatsMiddleware
+
+engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+def _lazy_loads(request):
+    # One statement per "row", like a lazy relationship accessed in a loop.
+    with engine.connect() as conn:
+        for value in range(12):
+            conn.execute(text("SELECT :value"), {"value": value})
+        conn.execute(text("SELECT 1 WHERE 1 IN (:a, :b)"), {"a": 1, "b": 2})
+    return PlainTextResponse("ok")
+
+
+loop_app = QueryStatsMiddleware(Starlette(routes=[Route("/loop", _lazy_loads)]))
+
+
+def test_statement_shape_collapses_placeholder_lists():
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?, ?)") == (
+        "SELECT a FROM t WHERE id IN (?)"
+    )
+    assert statement_shape(
+        "SELECT a FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s)"
+    ) == "SELECT a FROM t WHERE id IN (?)"
+
+
+def test_server_timing_is_disabled_by_default():
+    response = TestClient(loop_app).get("/loop")
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+
+def test_server_timing_reports_statement_count(monkeypatch):
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+    client = TestClient(loop_app)
+
+    response = client.get("/loop")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert timing.endswith('desc="13 queries"')
+
+
+def test_server_timing_is_added_to_application_responses(monkeypatch):
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+    response = TestClient(app).get("/healthz")
+
+    assert response.headers["server-timing"].endswith('desc="0 queries"')
+
+
+def test_repeated_statements_are_reported_in_debug_mode(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "sql_debug", True)
+    monkeypatch.setattr(settings, "sql_repeated_statement_threshold", 10)
+    client = TestClient(loop_app)
+
+    with caplog.at_level(logging.WARNING, logger="sql"):
+        client.get("/loop")
+
+    warnings = [record.getMessage() for record in caplog.records]
+    assert len(warnings) == 1
+    assert "executed 12 times in GET /loop: SELECT ?" in warnings[0]
+
+
+def test_no_warning_outside_debug_mode(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "sql_debug", False)
+
+    with caplog.at_level(logging.WARNING, logger="sql"):
+        TestClient(loop_app).get("/loop")
+
+    assert not caplog.records
+
+
+def test_query_budget_fixture(query_budget):
+    client = TestClient(loop_app)
+
+    with query_budget(13) as statements:
+        client.get("/loop")
+    assert len(statements) == 13
+
+    with pytest.raises(pytest.fail.Exception, match="13 SQL statements executed"):
+        with query_budget(5):
+            client.get("/loop")
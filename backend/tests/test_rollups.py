@@ -0,0 +1,169 @@
+import os
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models.chauffeur import Chauffeur
+from app.models.client import Client
+from app.models.declaration_rollup import DeclarationDailyRollup
+from app.models.tariff_group import TariffGroup
+from app.models.tenant import Tenant
+from app.models.tour import Tour
+from app.models.tour_item import TourItem
+from app.services.rollups import (
+    refresh_declaration_rollups,
+    rollup_slice,
+    slice_lock_key,
+)
+
+# Concurrent refreshes only race on a real server; point this at a
+# disposable PostgreSQL database to run them.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+sqlite_engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+@pytest.fixture
+def engine():
+    Base.metadata.create_all(bind=sqlite_engine)
+    yield sqlite_engine
+    Base.metadata.drop_all(bind=sqlite_engine)
+
+
+@pytest.fixture
+def postgres_engine():
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(POSTGRES_URL, future=True)
+    _reset_schema(engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    _reset_schema(engine)
+    engine.dispose()
+
+
+def _reset_schema(engine):
+    # tenant and tenant_subscriptions reference each other, which drop_all
+    # cannot order on PostgreSQL.
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+
+
+def _seed_tour(session_factory):
+    with session_factory() as db:
+        tenant = Tenant(name="Acme", slug="acme-rollups")
+        db.add(tenant)
+        db.flush()
+        chauffeur = Chauffeur(
+            tenant_id=tenant.id, email="rollup-driver@example.com", display_name="Ali"
+        )
+        client = Client(tenant_id=tenant.id, name="Amazon")
+        db.add_all([chauffeur, client])
+        db.flush()
+        tg = TariffGroup(
+            tenant_id=tenant.id,
+            client_id=client.id,
+            code="std",
+            display_name="Colis standards",
+            unit="colis",
+        )
+        tour = Tour(
+            tenant_id=tenant.id,
+            driver_id=chauffeur.id,
+            client_id=client.id,
+            date=date(2024, 5, 2),
+        )
+        db.add_all([tg, tour])
+        db.commit()
+        return tenant.id, tour.id, tg.id
+
+
+def _add_item(db, tenant_id, tour_id, tg_id, quantity):
+    db.add(
+        TourItem(
+            tenant_id=tenant_id,
+            tour_id=tour_id,
+            tariff_group_id=tg_id,
+            pickup_quantity=quantity,
+            amount_ex_vat_snapshot=Decimal("2.50") * quantity,
+        )
+    )
+    db.flush()
+
+
+def _rollups(session_factory, tenant_id):
+    with session_factory() as db:
+        return [
+            (row.item_count, row.pickup_quantity, row.amount_ex_vat)
+            for row in db.query(DeclarationDailyRollup).filter(
+                DeclarationDailyRollup.tenant_id == tenant_id
+            )
+        ]
+
+
+def test_slice_lock_key_is_stable_and_fits_int4():
+    key = slice_lock_key((date(2024, 5, 2), 7, 42))
+
+    assert key == slice_lock_key((date(2024, 5, 2), 7, 42))
+    assert key != slice_lock_key((date(2024, 5, 2), 42, 7))
+    assert all(
+        -(2**31) <= slice_lock_key((date(2024, 5, day), client, driver)) < 2**31
+        for day in range(1, 32)
+        for client in range(20)
+        for driver in range(20)
+    )
+
+
+def test_successive_writers_rebuild_one_slice(engine):
+    session_factory = sessionmaker(bind=engine, autoflush=False, future=True)
+    tenant_id, tour_id, tg_id = _seed_tour(session_factory)
+
+    for quantity in (3, 5):
+        with session_factory() as db:
+            _add_item(db, tenant_id, tour_id, tg_id, quantity)
+            tour = db.get(Tour, tour_id)
+            refresh_declaration_rollups(db, tenant_id, [rollup_slice(tour)])
+            db.commit()
+
+    assert _rollups(session_factory, tenant_id) == [(2, 8, Decimal("20.00"))]
+
+
+def test_concurrent_writers_on_one_slice_are_serialized(postgres_engine):
+    session_factory = sessionmaker(bind=postgres_engine, autoflush=False, future=True)
+    tenant_id, tour_id, tg_id = _seed_tour(session_factory)
+    # Both transactions have flushed their item before either refreshes the
+    # slice: without a lock, both delete nothing and both insert the group.
+    flushed = threading.Barrier(2, timeout=10)
+    errors: list[Exception] = []
+
+    def writer(quantity):
+        try:
+            with session_factory() as db:
+                _add_item(db, tenant_id, tour_id, tg_id, quantity)
+                tour = db.get(Tour, tour_id)
+                flushed.wait()
+                refresh_declaration_rollups(db, tenant_id, [rollup_slice(tour)])
+                db.commit()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(q,)) for q in (3, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert _rollups(session_factory, tenant_id) == [(2, 8, Decimal("20.00"))]
@@ -0,0 +1,149 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models.client import Client
+from app.models.tariff import Tariff
+from app.models.tariff_group import TariffGroup
+from app.models.tenant import Tenant
+from app.services.tariffs import (
+    TariffIndex,
+    TariffVersion,
+    get_tariff_index,
+    invalidate_tariff_index,
+)
+
+engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(
+    bind=engine, autocommit=False, autoflush=False, future=True
+)
+
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    invalidate_tariff_index()
+    yield
+    invalidate_tariff_index()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _version(id, start, end=None, price="1.00"):
+    return TariffVersion(
+        id=id,
+        tariff_group_id=1,
+        price_ex_vat=Decimal(price),
+        margin_ex_vat=Decimal("0"),
+        vat_rate=Decimal("0.20"),
+        effective_from=start,
+        effective_to=end,
+    )
+
+
+def test_resolve_matches_effective_period():
+    index = TariffIndex(
+        [
+            _version(3, date(2024, 3, 1)),
+            _version(1, date(2024, 1, 1), date(2024, 1, 31)),
+            _version(2, date(2024, 2, 1), date(2024, 2, 10)),
+        ]
+    )
+
+    assert index.resolve(1, date(2023, 12, 31)) is None
+    assert index.resolve(1, date(2024, 1, 15)).id == 1
+    assert index.resolve(1, date(2024, 2, 10)).id == 2
+    assert index.resolve(1, date(2024, 2, 20)) is None
+    assert index.resolve(1, date(2024, 6, 1)).id == 3
+    assert index.resolve(2, date(2024, 6, 1)) is None
+
+
+def test_resolve_falls_back_to_overlapping_earlier_version():
+    index = TariffIndex(
+        [
+            _version(1, date(2024, 1, 1)),
+            _version(2, date(2024, 2, 1), date(2024, 2, 5)),
+        ]
+    )
+
+    assert index.resolve(1, date(2024, 2, 3)).id == 2
+    assert index.resolve(1, date(2024, 2, 6)).id == 1
+
+
+def _count_selects(statements):
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    return before_cursor_execute
+
+
+def test_index_is_cached_and_invalidated_on_tariff_commit():
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Acme", slug="acme")
+        db.add(tenant)
+        db.flush()
+        client = Client(tenant_id=tenant.id, name="Amazon")
+        db.add(client)
+        db.flush()
+        group = TariffGroup(
+            tenant_id=tenant.id,
+            client_id=client.id,
+            code="std",
+            display_name="Standard",
+            unit="colis",
+            order=1,
+        )
+        db.add(group)
+        db.flush()
+        tariff = Tariff(
+            tenant_id=tenant.id,
+            tariff_group_id=group.id,
+            price_ex_vat=Decimal("2.00"),
+            margin_ex_vat=Decimal("0.50"),
+            effective_from=date(2024, 1, 1),
+        )
+        db.add(tariff)
+        db.commit()
+        tenant_id, group_id, tariff_id = tenant.id, group.id, tariff.id
+
+    statements: list[str] = []
+    listener = _count_selects(statements)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with TestingSessionLocal() as db:
+            first = get_tariff_index(db, tenant_id)
+            assert get_tariff_index(db, tenant_id) is first
+            assert first.resolve(group_id, date(2024, 5, 1)).price_ex_vat == Decimal(
+                "2.00"
+            )
+        assert len(statements) == 1
+
+        with TestingSessionLocal() as db:
+            db.get(Tariff, tariff_id).price_ex_vat = Decimal("2.50")
+            db.flush()
+            # Uncommitted changes are resolved for this session only.
+            pending = get_tariff_index(db, tenant_id)
+            assert pending is not first
+            assert pending.resolve(group_id, date(2024, 5, 1)).price_ex_vat == Decimal(
+                "2.50"
+            )
+            db.commit()
+
+        with TestingSessionLocal() as db:
+            refreshed = get_tariff_index(db, tenant_id)
+            assert refreshed is not first
+            assert refreshed.resolve(
+                group_id, date(2024, 5, 1)
+            ).price_ex_vat == Decimal("2.50")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
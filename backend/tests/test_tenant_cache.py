@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models.tenant import Tenant
+from app.services.tenants import resolve_tenant_slug, tenant_exists
+
+engine = create_engine(
+    "sqlite://",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(
+    bind=engine, autocommit=False, autoflush=False, future=True
+)
+
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def statements():
+    collected: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        collected.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield collected
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_slug_and_existence_are_cached(statements):
+    with TestingSessionLocal() as db:
+        tenant = Tenant(name="Acme", slug="Acme-Corp")
+        db.add(tenant)
+        db.commit()
+        tenant_id = tenant.id
+
+    with TestingSessionLocal() as db:
+        statements.clear()
+        assert resolve_tenant_slug(db, "acme-corp") == tenant_id
+        assert resolve_tenant_slug(db, "ACME-CORP") == tenant_id
+        # The slug lookup already proved the tenant exists.
+        assert tenant_exists(db, tenant_id) is True
+        assert resolve_tenant_slug(db, "unknown") is None
+        assert resolve_tenant_slug(db, "unknown") is None
+        assert tenant_exists(db, tenant_id + 1) is False
+        assert tenant_exists(db, tenant_id + 1) is False
+    assert len(statements) == 3
+
+
+def test_tenant_writes_invalidate_cache():
+    with TestingSessionLocal() as db:
+        assert resolve_tenant_slug(db, "late") is None
+        assert tenant_exists(db, 1) is False
+
+        tenant = Tenant(name="Late", slug="late")
+        db.add(tenant)
+        db.commit()
+        tenant_id = tenant.id
+        assert resolve_tenant_slug(db, "late") == tenant_id
+        assert tenant_exists(db, tenant_id) is True
+
+        tenant.slug = "renamed"
+        db.commit()
+        assert resolve_tenant_slug(db, "late") is None
+        assert resolve_tenant_slug(db, "renamed") == tenant_id
+
+        db.delete(tenant)
+        db.commit()
+        assert tenant_exists(db, tenant_id) is False
@@ -11,6 +11,7 @@ from app.models.tenant import Tenant
 from app.models.user import User
 from app.models.chauffeur import Chauffeur
 from app.core.config import settings
+from app.services.last_seen import last_seen_tracker
 
 
 engine = create_engine(
@@ -87,7 +88,10 @@ def test_driver_request_updates_last_seen_timestamp(client):
 
     response = client.get("/tours/pending", headers=headers)
     assert response.status_code == 200
+    assert last_seen_tracker.pending == 1
 
+    # Heartbeats are written in bulk by the periodic flush.
+    assert last_seen_tracker.flush() == 1
     with TestingSessionLocal() as db:
         updated = db.get(Chauffeur, chauffeur_id)
         assert updated is not None
@@ -1,6 +1,12 @@
+import csv
+import json
+import subprocess
+import sys
+import zipfile
 from datetime import date, timedelta
 from decimal import Decimal
-from io import BytesIO
+from io import BytesIO, StringIO
+from xml.etree import ElementTree
 
 import pytest
 from fastapi.testclient import TestClient
@@ -8,15 +14,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from openpyxl import load_workbook
-
-from app.api.reports import DECLARATIONS_EXPORT_HEADER
+from app.services import declarations
+from app.services.declarations import DECLARATIONS_EXPORT_HEADER
 from app.core.config import settings
 from app.db.session import get_db
 from app.main import app
 from app.models.base import Base
 from app.models.chauffeur import Chauffeur
 from app.models.client import Client
+from app.models.declaration_rollup import DeclarationDailyRollup
 from app.models.tariff import Tariff
 from app.models.tariff_group import TariffGroup
 from app.models.tour import Tour
@@ -177,6 +183,88 @@ def test_create_pickup_and_close_tour(client):
     assert delivery_data["status"] == "COMPLETED"
 
 
+def test_create_pickup_batches_category_lookups(client, query_budget):
+    with TestingSessionLocal() as db:
+        tenant_id, _, client_id, tg_id, _ = _seed(db)
+        group_ids = [tg_id]
+        for index in range(14):
+            group = TariffGroup(
+                tenant_id=tenant_id,
+                client_id=client_id,
+                code=f"tg_{index}",
+                display_name=f"Catégorie {index:02d}",
+                unit="colis",
+            )
+            db.add(group)
+            db.flush()
+            db.add(
+                Tariff(
+                    tenant_id=tenant_id,
+                    tariff_group_id=group.id,
+                    price_ex_vat=Decimal("1.5"),
+                    margin_ex_vat=Decimal("0.25"),
+                    vat_rate=Decimal("0.20"),
+                    effective_from=date.today() - timedelta(days=30),
+                )
+            )
+            group_ids.append(group.id)
+        db.commit()
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "CHAUFFEUR",
+        "X-Dev-Sub": "dev|driver1",
+    }
+    payload = {
+        "date": date.today().isoformat(),
+        "clientId": client_id,
+        "items": [
+            {"tariffGroupId": group_id, "pickupQuantity": quantity}
+            for quantity, group_id in enumerate(group_ids, start=1)
+        ],
+    }
+
+    assert client.get("/tours/pending", headers=headers).json() == []
+
+    # Driver, client, categories, tariff index, tour, items, rollup slice.
+    with query_budget(9):
+        resp = client.post("/tours/pickup", json=payload, headers=headers)
+
+    assert resp.status_code == 201
+    created = resp.json()
+    assert len(created["items"]) == 15
+    assert created["totals"]["pickupQty"] == sum(range(1, 16))
+    assert created["items"][0]["unitPriceExVat"] == "1.50"
+    pending = client.get("/tours/pending", headers=headers).json()
+    assert pending == [created]
+
+
+def test_create_pickup_validates_before_writing(client):
+    with TestingSessionLocal() as db:
+        tenant_id, _, client_id, tg_id, _ = _seed(db)
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "CHAUFFEUR",
+        "X-Dev-Sub": "dev|driver1",
+    }
+    payload = {
+        "date": date.today().isoformat(),
+        "clientId": client_id,
+        "items": [
+            {"tariffGroupId": tg_id, "pickupQuantity": 2},
+            {"tariffGroupId": tg_id + 100, "pickupQuantity": 1},
+        ],
+    }
+
+    resp = client.post("/tours/pickup", json=payload, headers=headers)
+
+    assert resp.status_code == 404
+    with TestingSessionLocal() as db:
+        assert db.query(Tour).count() == 0
+        assert db.query(TourItem).count() == 0
+
+
 def test_create_pickup_rejects_tariff_group_from_other_client(client):
     with TestingSessionLocal() as db:
         tenant_id, chauffeur_id, client_id, tg_id, _ = _seed(db)
@@ -214,6 +302,44 @@ def test_create_pickup_rejects_tariff_group_from_other_client(client):
     assert response.json()["detail"] == "Tariff group not available for this client"
 
 
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+XLSX_CONTENT_TYPES = {
+    "xl/workbook.xml": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"
+    ),
+    "xl/worksheets/sheet1.xml": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+    ),
+    "xl/styles.xml": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"
+    ),
+}
+
+# The openpyxl package in backend/ is a test stub shadowing the real one, so the
+# streamed workbook is read back in a fresh interpreter that does not see it.
+_READ_XLSX_SCRIPT = """
+import io, json, sys
+from openpyxl import load_workbook
+
+workbook = load_workbook(io.BytesIO(sys.stdin.buffer.read()), read_only=True)
+worksheet = workbook.active
+rows = [list(row) for row in worksheet.iter_rows(values_only=True)]
+json.dump({"title": worksheet.title, "rows": rows}, sys.stdout, default=str)
+"""
+
+
+def _read_xlsx(content: bytes):
+    result = subprocess.run(
+        [sys.executable, "-I", "-c", _READ_XLSX_SCRIPT],
+        input=content,
+        capture_output=True,
+        cwd="/",
+        check=True,
+    )
+    workbook = json.loads(result.stdout)
+    return workbook["title"], workbook["rows"]
+
+
 def test_export_declarations_excel_returns_expected_header(client):
     with TestingSessionLocal() as db:
         tenant_id, _, _, _, admin_sub = _seed(db)
@@ -232,12 +358,120 @@ def test_export_declarations_excel_returns_expected_header(client):
         == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
-    workbook = load_workbook(BytesIO(response.content))
-    worksheet = workbook.active
-    first_row = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True))
-    workbook.close()
+    with zipfile.ZipFile(BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        assert set(archive.namelist()) == set(XLSX_CONTENT_TYPES) | {
+            "[Content_Types].xml",
+            "_rels/.rels",
+            "xl/_rels/workbook.xml.rels",
+        }
+        content_types = ElementTree.fromstring(archive.read("[Content_Types].xml"))
+        # Declared ZIP64 (version 4.5) so the streamed sheet can exceed 2 GiB.
+        assert archive.getinfo("xl/worksheets/sheet1.xml").extract_version >= 45
+    overrides = {
+        element.get("PartName"): element.get("ContentType")
+        for element in content_types.iter(f"{{{CONTENT_TYPES_NS}}}Override")
+    }
+    assert overrides == {
+        f"/{name}": content_type for name, content_type in XLSX_CONTENT_TYPES.items()
+    }
+
+    _, rows = _read_xlsx(response.content)
+
+    assert rows[0] == DECLARATIONS_EXPORT_HEADER
+
+
+def test_export_declarations_excel_contains_declarations(client):
+    with TestingSessionLocal() as db:
+        tenant_id, _, client_id, tg_id, admin_sub = _seed(db)
+
+    headers_driver = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "CHAUFFEUR",
+        "X-Dev-Sub": "dev|driver1",
+    }
+    pickup_payload = {
+        "date": date.today().isoformat(),
+        "clientId": client_id,
+        "items": [{"tariffGroupId": tg_id, "pickupQuantity": 4}],
+    }
+    assert (
+        client.post("/tours/pickup", json=pickup_payload, headers=headers_driver)
+        .status_code
+        == 201
+    )
+
+    headers_admin = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+    response = client.get("/reports/declarations/export.xlsx", headers=headers_admin)
 
-    assert list(first_row) == DECLARATIONS_EXPORT_HEADER
+    assert response.status_code == 200
+    title, rows = _read_xlsx(response.content)
+
+    assert title == "Declarations"
+    assert len(rows) == 2
+    assert rows[1] == [
+        date.today().isoformat(),
+        "Ali",
+        "Amazon",
+        "Colis standards",
+        4,
+        0,
+        4,
+        "0.00",
+        "0.00",
+    ]
+
+
+def test_export_declarations_csv_streams_every_row(client, monkeypatch):
+    monkeypatch.setattr(declarations, "DECLARATIONS_STREAM_BATCH_SIZE", 2)
+    with TestingSessionLocal() as db:
+        tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
+        for offset in range(5):
+            tour = Tour(
+                tenant_id=tenant_id,
+                driver_id=chauffeur_id,
+                client_id=client_id,
+                date=date.today() - timedelta(days=offset),
+                status=Tour.STATUS_COMPLETED,
+            )
+            db.add(tour)
+            db.flush()
+            db.add(
+                TourItem(
+                    tenant_id=tenant_id,
+                    tour_id=tour.id,
+                    tariff_group_id=tg_id,
+                    pickup_quantity=offset + 1,
+                    delivery_quantity=offset,
+                    unit_price_ex_vat_snapshot=Decimal("3.00"),
+                    amount_ex_vat_snapshot=Decimal("3.00") * offset,
+                    unit_margin_ex_vat_snapshot=Decimal("1.20"),
+                    margin_ex_vat_snapshot=Decimal("1.20") * offset,
+                )
+            )
+        db.commit()
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+
+    response = client.get("/reports/declarations/export.csv", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(StringIO(response.text), delimiter=";"))
+    assert rows[0] == DECLARATIONS_EXPORT_HEADER
+    assert len(rows) == 6
+    assert [row[0] for row in rows[1:]] == [
+        (date.today() - timedelta(days=offset)).isoformat() for offset in range(5)
+    ]
+    assert rows[-1][4:] == ["5", "4", "1", "12.00", "4.80"]
 
 
 def test_report_declarations(client):
@@ -287,6 +521,177 @@ def test_report_declarations(client):
     assert data[0]["status"] == "COMPLETED"
 
 
+def test_report_declarations_keyset_pagination(client):
+    with TestingSessionLocal() as db:
+        tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
+        second_tg = TariffGroup(
+            tenant_id=tenant_id,
+            client_id=client_id,
+            code="tg_XL",
+            display_name="Colis volumineux",
+            unit="colis",
+            order=2,
+        )
+        db.add(second_tg)
+        db.flush()
+        for offset in range(4):
+            tour = Tour(
+                tenant_id=tenant_id,
+                driver_id=chauffeur_id,
+                client_id=client_id,
+                date=date.today() - timedelta(days=offset // 2),
+                status=Tour.STATUS_COMPLETED,
+            )
+            db.add(tour)
+            db.flush()
+            if offset == 3:
+                continue
+            for group_id in (tg_id, second_tg.id):
+                db.add(
+                    TourItem(
+                        tenant_id=tenant_id,
+                        tour_id=tour.id,
+                        tariff_group_id=group_id,
+                        pickup_quantity=1,
+                        delivery_quantity=1,
+                    )
+                )
+        db.commit()
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+
+    full = client.get("/reports/declarations", headers=headers)
+    assert full.status_code == 200
+    assert "X-Next-Cursor" not in full.headers
+    expected = [(row["tourId"], row["tourItemId"]) for row in full.json()]
+    assert len(expected) == 7
+
+    collected = []
+    params = {"limit": 3}
+    while True:
+        page = client.get("/reports/declarations", headers=headers, params=params)
+        assert page.status_code == 200
+        assert len(page.json()) <= 3
+        collected.extend((row["tourId"], row["tourItemId"]) for row in page.json())
+        next_cursor = page.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        params = {"limit": 3, "cursor": next_cursor}
+
+    assert collected == expected
+
+    invalid = client.get(
+        "/reports/declarations",
+        headers=headers,
+        params={"limit": 3, "cursor": "not-a-cursor"},
+    )
+    assert invalid.status_code == 400
+
+
+def test_report_declarations_aggregate(client):
+    with TestingSessionLocal() as db:
+        tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
+        second_tg = TariffGroup(
+            tenant_id=tenant_id,
+            client_id=client_id,
+            code="tg_XL",
+            display_name="Colis volumineux",
+            unit="colis",
+            order=2,
+        )
+        db.add(second_tg)
+        db.flush()
+        # 2024-01-31 and 2024-02-01 share the ISO week starting 2024-01-29.
+        for tour_date, group_id, pickup, delivery, amount, margin in (
+            (date(2024, 1, 31), tg_id, 10, 8, "24.00", "9.60"),
+            (date(2024, 1, 31), second_tg.id, 3, 3, "15.00", "4.50"),
+            (date(2024, 2, 1), tg_id, 5, 5, "15.00", "6.00"),
+        ):
+            tour = Tour(
+                tenant_id=tenant_id,
+                driver_id=chauffeur_id,
+                client_id=client_id,
+                date=tour_date,
+                status=Tour.STATUS_COMPLETED,
+            )
+            db.add(tour)
+            db.flush()
+            db.add(
+                TourItem(
+                    tenant_id=tenant_id,
+                    tour_id=tour.id,
+                    tariff_group_id=group_id,
+                    pickup_quantity=pickup,
+                    delivery_quantity=delivery,
+                    amount_ex_vat_snapshot=Decimal(amount),
+                    margin_ex_vat_snapshot=Decimal(margin),
+                )
+            )
+        db.commit()
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+    url = "/reports/declarations/aggregate"
+
+    total = client.get(url, headers=headers)
+    assert total.status_code == 200
+    assert total.json() == [
+        {
+            "periodStart": None,
+            "clientId": None,
+            "clientName": None,
+            "driverId": None,
+            "driverName": None,
+            "tariffGroupId": None,
+            "tariffGroupDisplayName": None,
+            "declarationCount": 3,
+            "pickupQuantity": 18,
+            "deliveryQuantity": 16,
+            "differenceQuantity": 2,
+            "estimatedAmountEur": "54.00",
+            "marginAmountEur": "20.10",
+        }
+    ]
+
+    by_month = client.get(
+        url, headers=headers, params={"group_by": ["month", "client"]}
+    ).json()
+    assert [
+        (row["periodStart"], row["clientName"], row["declarationCount"])
+        for row in by_month
+    ] == [("2024-02-01", "Amazon", 1), ("2024-01-01", "Amazon", 2)]
+    assert by_month[1]["estimatedAmountEur"] == "39.00"
+
+    by_week = client.get(url, headers=headers, params={"group_by": "week"}).json()
+    assert [(row["periodStart"], row["pickupQuantity"]) for row in by_week] == [
+        ("2024-01-29", 18)
+    ]
+
+    by_group = client.get(
+        url,
+        headers=headers,
+        params={"group_by": ["tariff_group", "driver"], "date_to": "2024-01-31"},
+    ).json()
+    assert [
+        (row["tariffGroupDisplayName"], row["driverName"], row["marginAmountEur"])
+        for row in by_group
+    ] == [("Colis standards", "Ali", "9.60"), ("Colis volumineux", "Ali", "4.50")]
+
+    invalid = client.get(url, headers=headers, params={"group_by": "year"})
+    assert invalid.status_code == 400
+    two_buckets = client.get(
+        url, headers=headers, params={"group_by": ["day", "week"]}
+    )
+    assert two_buckets.status_code == 400
+
+
 def test_report_declarations_includes_in_progress(client):
     with TestingSessionLocal() as db:
         tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
@@ -351,6 +756,82 @@ def test_report_declarations_includes_in_progress_without_items(client):
     assert data[0]["status"] == "IN_PROGRESS"
 
 
+def test_pending_tours_load_in_a_fixed_number_of_queries(client, query_budget):
+    with TestingSessionLocal() as db:
+        tenant_id, chauffeur_id, client_id, tg_id, _ = _seed(db)
+        airbags = TariffGroup(
+            tenant_id=tenant_id,
+            client_id=client_id,
+            code="tg_AIR",
+            display_name="Airbags",
+            unit="colis",
+        )
+        db.add(airbags)
+        db.flush()
+        for offset in range(5):
+            tour = Tour(
+                tenant_id=tenant_id,
+                driver_id=chauffeur_id,
+                client_id=client_id,
+                date=date.today() - timedelta(days=offset),
+                status=Tour.STATUS_IN_PROGRESS,
+            )
+            db.add(tour)
+            db.flush()
+            db.add_all(
+                [
+                    TourItem(
+                        tenant_id=tenant_id,
+                        tour_id=tour.id,
+                        tariff_group_id=tg_id,
+                        pickup_quantity=4,
+                        unit_price_ex_vat_snapshot=Decimal("3.00"),
+                    ),
+                    TourItem(
+                        tenant_id=tenant_id,
+                        tour_id=tour.id,
+                        tariff_group_id=airbags.id,
+                        pickup_quantity=offset,
+                    ),
+                ]
+            )
+        db.add(
+            Tour(
+                tenant_id=tenant_id,
+                driver_id=chauffeur_id,
+                client_id=client_id,
+                date=date.today(),
+                status=Tour.STATUS_COMPLETED,
+            )
+        )
+        db.commit()
+
+    headers = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "CHAUFFEUR",
+        "X-Dev-Sub": "dev|driver1",
+    }
+    client.get("/tours/pending", headers=headers)
+
+    # Driver lookup (user, driver), tours, items.
+    with query_budget(4):
+        resp = client.get("/tours/pending", headers=headers)
+
+    assert resp.status_code == 200
+    tours = resp.json()
+    assert [tour["date"] for tour in tours] == sorted(tour["date"] for tour in tours)
+    assert len(tours) == 5
+    oldest = tours[0]
+    assert oldest["driver"] == {"id": chauffeur_id, "name": "Ali"}
+    assert oldest["client"] == {"id": client_id, "name": "Amazon"}
+    assert [item["displayName"] for item in oldest["items"]] == [
+        "Airbags",
+        "Colis standards",
+    ]
+    assert oldest["items"][1]["unitPriceExVat"] == "3.00"
+    assert oldest["totals"]["pickupQty"] == 8
+
+
 def test_activity_summary_returns_expected_metrics(client):
     with TestingSessionLocal() as db:
         tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
@@ -432,6 +913,73 @@ def test_activity_summary_returns_expected_metrics(client):
     assert card["totalDelivery"] == 0
 
 
+def test_activity_summary_counts_returns_per_tour(client, query_budget):
+    with TestingSessionLocal() as db:
+        tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
+        other_group = TariffGroup(
+            tenant_id=tenant_id,
+            client_id=client_id,
+            code="xl",
+            display_name="XL",
+            unit="colis",
+        )
+        db.add(other_group)
+        db.flush()
+
+        for index in range(12):
+            status = Tour.STATUS_COMPLETED if index < 8 else Tour.STATUS_IN_PROGRESS
+            tour = Tour(
+                tenant_id=tenant_id,
+                driver_id=chauffeur_id,
+                client_id=client_id,
+                date=date.today(),
+                status=status,
+            )
+            db.add(tour)
+            db.flush()
+            # Per tour: 14 picked up, 13 delivered, one return despite the
+            # over-delivered second item.
+            db.add_all(
+                [
+                    TourItem(
+                        tenant_id=tenant_id,
+                        tour_id=tour.id,
+                        tariff_group_id=tg_id,
+                        pickup_quantity=10,
+                        delivery_quantity=7 if status == Tour.STATUS_COMPLETED else 0,
+                    ),
+                    TourItem(
+                        tenant_id=tenant_id,
+                        tour_id=tour.id,
+                        tariff_group_id=other_group.id,
+                        pickup_quantity=4,
+                        delivery_quantity=6 if status == Tour.STATUS_COMPLETED else 0,
+                    ),
+                ]
+            )
+        db.commit()
+
+    headers_admin = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+    client.get("/tours/activity-summary", headers=headers_admin)
+
+    with query_budget(2):
+        resp = client.get("/tours/activity-summary", headers=headers_admin)
+
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["closedToursCount"] == 8
+    assert payload["returnCount"] == 8
+    cards = payload["inProgressTours"]
+    tour_ids = [card["tourId"] for card in cards]
+    assert tour_ids == sorted(tour_ids)
+    assert len(cards) == 4
+    assert {(card["totalPickup"], card["totalDelivery"]) for card in cards} == {(14, 0)}
+
+
 def test_activity_summary_respects_date_filters(client):
     with TestingSessionLocal() as db:
         tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
@@ -688,3 +1236,110 @@ def test_admin_deletes_declaration(client):
     after_delete = client.get("/reports/declarations", headers=headers_admin)
     assert after_delete.status_code == 200
     assert after_delete.json() == []
+
+
+def _rollup_rows(tenant_id):
+    with TestingSessionLocal() as db:
+        return [
+            (
+                row.tariff_group_id,
+                row.item_count,
+                row.pickup_quantity,
+                row.delivery_quantity,
+                row.amount_ex_vat,
+                row.margin_ex_vat,
+            )
+            for row in db.query(DeclarationDailyRollup)
+            .filter(DeclarationDailyRollup.tenant_id == tenant_id)
+            .order_by(DeclarationDailyRollup.tariff_group_id)
+        ]
+
+
+def test_declaration_rollup_follows_write_paths(client):
+    with TestingSessionLocal() as db:
+        tenant_id, chauffeur_id, client_id, tg_id, admin_sub = _seed(db)
+        second_tg = TariffGroup(
+            tenant_id=tenant_id,
+            client_id=client_id,
+            code="tg_XL",
+            display_name="Colis volumineux",
+            unit="colis",
+            order=2,
+        )
+        db.add(second_tg)
+        db.commit()
+        second_tg_id = second_tg.id
+
+    headers_driver = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "CHAUFFEUR",
+        "X-Dev-Sub": "dev|driver1",
+    }
+    headers_admin = {
+        "X-Tenant-Id": str(tenant_id),
+        "X-Dev-Role": "ADMIN",
+        "X-Dev-Sub": admin_sub,
+    }
+    today = date.today().isoformat()
+
+    pickup = client.post(
+        "/tours/pickup",
+        json={
+            "date": today,
+            "clientId": client_id,
+            "items": [{"tariffGroupId": tg_id, "pickupQuantity": 5}],
+        },
+        headers=headers_driver,
+    )
+    assert _rollup_rows(tenant_id) == [
+        (tg_id, 1, 5, 0, Decimal("0.00"), Decimal("0.00"))
+    ]
+
+    client.put(
+        f"/tours/{pickup.json()['tourId']}/delivery",
+        json={"items": [{"tariffGroupId": tg_id, "deliveryQuantity": 4}]},
+        headers=headers_driver,
+    )
+    assert _rollup_rows(tenant_id) == [
+        (tg_id, 1, 5, 4, Decimal("12.00"), Decimal("4.80"))
+    ]
+
+    created = client.post(
+        "/reports/declarations",
+        json={
+            "date": today,
+            "driverId": chauffeur_id,
+            "clientId": client_id,
+            "tariffGroupId": second_tg_id,
+            "pickupQuantity": 3,
+            "deliveryQuantity": 3,
+            "estimatedAmountEur": "9.00",
+        },
+        headers=headers_admin,
+    )
+    assert created.status_code == 201
+    tour_item_id = created.json()["tourItemId"]
+    assert _rollup_rows(tenant_id) == [
+        (tg_id, 1, 5, 4, Decimal("12.00"), Decimal("4.80")),
+        (second_tg_id, 1, 3, 3, Decimal("9.00"), Decimal("0.00")),
+    ]
+
+    client.put(
+        f"/reports/declarations/{tour_item_id}",
+        json={"deliveryQuantity": 2},
+        headers=headers_admin,
+    )
+    assert _rollup_rows(tenant_id)[1] == (
+        second_tg_id,
+        1,
+        3,
+        2,
+        Decimal("0.00"),
+        Decimal("0.00"),
+    )
+
+    client.delete(f"/reports/declarations/{tour_item_id}", headers=headers_admin)
+    assert _rollup_rows(tenant_id) == [
+        (tg_id, 1, 5, 4, Decimal("12.00"), Decimal("4.80"))
+    ]
+